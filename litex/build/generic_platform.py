@@ -302,6 +302,7 @@ class GenericPlatform:
         self.sources = []
         self.verilog_include_paths = []
         self.output_dir = None
+        self.verilog_cache_dir = None
         self.finalized = False
         self.use_default_clk = False
 
@@ -408,10 +409,16 @@ class GenericPlatform:
         return named_sc, named_pc
 
     def get_verilog(self, fragment, **kwargs):
-        return verilog.convert(
+        kwargs.setdefault("cache_dir", self.verilog_cache_dir)
+        v_output = verilog.convert(
             fragment,
             self.constraint_manager.get_io_signals(),
             create_clock_domains=False, **kwargs)
+        # Separate Verilog modules (written with the main file).
+        for filename in v_output.data_files.keys():
+            if filename.endswith(".v"):
+                self.add_source(filename)
+        return v_output
 
     def get_edif(self, fragment, cell_library, vendor, device, **kwargs):
         return edif.convert(
@@ -5,6 +5,9 @@
 
 #include <stdint.h>
 #include <stdbool.h>
+#include <stdlib.h>
+#include <string.h>
+#include "error.h"
 #include "pads.h"
 
 struct interface_s {
@@ -21,6 +24,14 @@ struct module_s {
   struct module_s *next;
 };
 
+/* Checkpoint data of a session, written by save and read back by restore. */
+struct checkpoint_s {
+  char *data;
+  size_t size;
+  size_t alloc;
+  size_t offset;
+};
+
 struct ext_module_s {
   char *name;
   int (*start)(void *);
@@ -28,6 +39,18 @@ struct ext_module_s {
   int (*add_pads)(void *, struct pad_list_s *);
   int (*close)(void*);
   int (*tick)(void*, uint64_t);
+  /* Optional: time (in ps) of the next tick needed by the session after time_ps. The core jumps
+     to the earliest one instead of stepping by the timebase; sessions without next_tick are ticked
+     on each timebase step. */
+  uint64_t (*next_tick)(void*, uint64_t);
+  /* Optional: save/restore the state of the session to/from a checkpoint (see
+     litex_sim_checkpoint_write/read). Sessions without them restart from their initial state
+     when the simulation is restored. */
+  int (*save)(void*, struct checkpoint_s *);
+  int (*restore)(void*, struct checkpoint_s *);
+  /* Optional: whether the session exchanged data with the host (or has some pending) since the
+     last call. The core polls the host I/O more often while a session is busy. */
+  int (*busy)(void*);
 };
 
 struct ext_module_list_s {
@@ -55,4 +78,36 @@ inline bool clk_neg_edge(struct clk_edge_t *edge, int new_clk) {
   return is_edge;
 }
 
+/* next_tick of the sessions only acting on clock edges (ticked with the clocks). */
+static inline uint64_t clk_edges_next_tick(void *sess, uint64_t time_ps) {
+  return UINT64_MAX;
+}
+
+static inline int litex_sim_checkpoint_write(struct checkpoint_s *ckpt, const void *data, size_t size) {
+  char *new_data;
+  size_t new_alloc;
+
+  if(ckpt->size + size > ckpt->alloc) {
+    new_alloc = ckpt->alloc ? ckpt->alloc : 4096;
+    while(ckpt->size + size > new_alloc)
+      new_alloc *= 2;
+    new_data = (char *)realloc(ckpt->data, new_alloc);
+    if(!new_data)
+      return RC_NOENMEM;
+    ckpt->data = new_data;
+    ckpt->alloc = new_alloc;
+  }
+  memcpy(ckpt->data + ckpt->size, data, size);
+  ckpt->size += size;
+  return RC_OK;
+}
+
+static inline int litex_sim_checkpoint_read(struct checkpoint_s *ckpt, void *data, size_t size) {
+  if(ckpt->offset + size > ckpt->size)
+    return RC_ERROR;
+  memcpy(data, ckpt->data + ckpt->offset, size);
+  ckpt->offset += size;
+  return RC_OK;
+}
+
 #endif
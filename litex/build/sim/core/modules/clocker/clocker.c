@@ -10,6 +10,8 @@ struct session_s {
   char *name;
   uint32_t freq_hz;
   uint16_t phase_deg;
+  uint64_t period_ps;
+  uint64_t phase_shift_ps;
 };
 
 static int litex_sim_module_pads_get( struct pad_s *pads, char *name, void **signal)
@@ -80,6 +82,9 @@ static int clocker_parse_args(struct session_s *s, const char *args)
     fprintf(stderr, "[clocker] \"phase_deg\" must be in range [0, 360)\n");
     goto out;
   }
+
+  s->period_ps = 1000000000000ull / s->freq_hz;
+  s->phase_shift_ps = s->period_ps * s->phase_deg / 360;
 out:
   if(args_json) json_object_put(args_json);
   return ret;
@@ -109,7 +114,7 @@ static int clocker_new(void **sess, char *args)
   }
   memset(s, 0, sizeof(struct session_s));
 
-  clocker_parse_args(s, args);
+  ret = clocker_parse_args(s, args);
 out:
   *sess=(void*)s;
   return ret;
@@ -139,17 +144,17 @@ out:
   return ret;
 }
 
+// phase-shifted time relative to start of current period
+static uint64_t clocker_rel_time(struct session_s *s, uint64_t time_ps)
+{
+  return (time_ps + s->period_ps - s->phase_shift_ps) % s->period_ps;
+}
+
 static int clocker_tick(void *sess, uint64_t time_ps)
 {
-  static const uint64_t ps_in_sec = 1000000000000ull;
   struct session_s *s = (struct session_s*) sess;
 
-  uint64_t period_ps = ps_in_sec / s->freq_hz;
-  uint64_t phase_shift_ps = period_ps * s->phase_deg / 360;
-
-  // phase-shifted time relative to start of current period
-  uint64_t rel_time_ps = (time_ps - phase_shift_ps) % period_ps;
-  if (rel_time_ps < (period_ps/2)) {
+  if (clocker_rel_time(s, time_ps) < (s->period_ps/2)) {
     *s->clk = 1;
   } else {
     *s->clk = 0;
@@ -158,13 +163,27 @@ static int clocker_tick(void *sess, uint64_t time_ps)
   return 0;
 }
 
+static uint64_t clocker_next_tick(void *sess, uint64_t time_ps)
+{
+  struct session_s *s = (struct session_s*) sess;
+  uint64_t rel_time_ps = clocker_rel_time(s, time_ps);
+
+  // next edge
+  if (rel_time_ps < (s->period_ps/2)) {
+    return time_ps + (s->period_ps/2) - rel_time_ps;
+  } else {
+    return time_ps + s->period_ps - rel_time_ps;
+  }
+}
+
 static struct ext_module_s ext_mod = {
   "clocker",
   clocker_start,
   clocker_new,
   clocker_add_pads,
   NULL,
-  clocker_tick
+  clocker_tick,
+  clocker_next_tick
 };
 
 int litex_sim_ext_module_init(int (*register_module)(struct ext_module_s *))
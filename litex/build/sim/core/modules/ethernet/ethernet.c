@@ -31,6 +31,8 @@ struct session_s {
   char inbuf[2000];
   int inlen;
   int insent;
+  struct clk_edge_t edge;
+  int active;
   struct eth_packet_s *ethpack;
   struct event *ev;
 };
@@ -202,12 +204,11 @@ out:
 
 static int ethernet_tick(void *sess, uint64_t time_ps)
 {
-  static struct clk_edge_t edge;
   char c;
   struct session_s *s = (struct session_s*)sess;
   struct eth_packet_s *pep;
 
-  if(!clk_pos_edge(&edge, *s->sys_clk)) {
+  if(!clk_pos_edge(&s->edge, *s->sys_clk)) {
     return RC_OK;
   }
 
@@ -219,6 +220,7 @@ static int ethernet_tick(void *sess, uint64_t time_ps)
     if(s->datalen) {
       tapcfg_write(s->tapcfg, s->databuf, s->datalen);
       s->datalen=0;
+      s->active = 1;
     }
   }
 
@@ -242,13 +244,58 @@ static int ethernet_tick(void *sess, uint64_t time_ps)
   return RC_OK;
 }
 
+static int ethernet_busy(void *sess)
+{
+  struct session_s *s = (struct session_s*)sess;
+  int busy = s->active || s->datalen || s->inlen || s->ethpack;
+
+  s->active = 0;
+  return busy;
+}
+
+static int ethernet_save(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*)sess;
+
+  /* Frames being sent/received. Queued received frames are dropped, as frames lost on the
+     network would be. */
+  if((RC_OK != litex_sim_checkpoint_write(ckpt, &s->edge, sizeof(s->edge))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->datalen, sizeof(s->datalen))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, s->databuf, s->datalen)) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->inlen, sizeof(s->inlen))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->insent, sizeof(s->insent))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, s->inbuf, s->inlen)))
+    return RC_NOENMEM;
+  return RC_OK;
+}
+
+static int ethernet_restore(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*)sess;
+
+  if((RC_OK != litex_sim_checkpoint_read(ckpt, &s->edge, sizeof(s->edge))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->datalen, sizeof(s->datalen))) ||
+     (s->datalen < 0) || (s->datalen > sizeof(s->databuf)) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, s->databuf, s->datalen)) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->inlen, sizeof(s->inlen))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->insent, sizeof(s->insent))) ||
+     (s->inlen < 0) || (s->inlen > sizeof(s->inbuf)) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, s->inbuf, s->inlen)))
+    return RC_ERROR;
+  return RC_OK;
+}
+
 static struct ext_module_s ext_mod = {
   "ethernet",
   ethernet_start,
   ethernet_new,
   ethernet_add_pads,
   NULL,
-  ethernet_tick
+  ethernet_tick,
+  clk_edges_next_tick,
+  ethernet_save,
+  ethernet_restore,
+  ethernet_busy
 };
 
 int litex_sim_ext_module_init(int (*register_module)(struct ext_module_s *))
@@ -21,6 +21,7 @@ struct session_s {
 	int data_start;
 	int datalen;
 	int cntticks;
+	int active;
 	int fd;
 };
 
@@ -233,6 +234,7 @@ static int jtagremote_tick(void *sess, uint64_t time_ps)
 		  *s->tdi = (c - '0')  & 1;
 	  }
 	  if(c == 'R'){
+		  s->active = 1;
 		  val = *s->tdo + '0';
 		  if(-1 == write(s->fd, &val, 1)) {
 			  eprintf("Error writing on socket\n");
@@ -248,13 +250,26 @@ out:
   return ret;
 }
 
+static int jtagremote_busy(void *sess)
+{
+  struct session_s *s = (struct session_s*)sess;
+  int busy = s->active || s->datalen;
+
+  s->active = 0;
+  return busy;
+}
+
 static struct ext_module_s ext_mod = {
   "jtagremote",
   jtagremote_start,
   jtagremote_new,
   jtagremote_add_pads,
   NULL,
-  jtagremote_tick
+  jtagremote_tick,
+  clk_edges_next_tick,
+  NULL,
+  NULL,
+  jtagremote_busy
 };
 
 int litex_sim_ext_module_init(int (*register_module)(struct ext_module_s *))
@@ -22,6 +22,8 @@ struct session_s {
   char databuf[2048];
   int data_start;
   int datalen;
+  struct clk_edge_t edge;
+  int active;
 };
 
 struct event_base *base;
@@ -146,15 +148,15 @@ out:
 }
 
 static int serial2console_tick(void *sess, uint64_t time_ps) {
-  static struct clk_edge_t edge;
   struct session_s *s = (struct session_s*)sess;
 
-  if(!clk_pos_edge(&edge, *s->sys_clk)) {
+  if(!clk_pos_edge(&s->edge, *s->sys_clk)) {
     return RC_OK;
   }
 
   *s->tx_ready = 1;
   if(*s->tx_valid) {
+    s->active = 1;
     printf("%c", *s->tx);
     fflush(stdout);
   }
@@ -170,13 +172,53 @@ static int serial2console_tick(void *sess, uint64_t time_ps) {
   return RC_OK;
 }
 
+static int serial2console_busy(void *sess)
+{
+  struct session_s *s = (struct session_s*)sess;
+  int busy = s->active || s->datalen;
+
+  s->active = 0;
+  return busy;
+}
+
+static int serial2console_save(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*)sess;
+
+  /* Received data not yet sent to the design */
+  if((RC_OK != litex_sim_checkpoint_write(ckpt, &s->edge, sizeof(s->edge))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->data_start, sizeof(s->data_start))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->datalen, sizeof(s->datalen))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, s->databuf, sizeof(s->databuf))))
+    return RC_NOENMEM;
+  return RC_OK;
+}
+
+static int serial2console_restore(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*)sess;
+
+  if((RC_OK != litex_sim_checkpoint_read(ckpt, &s->edge, sizeof(s->edge))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->data_start, sizeof(s->data_start))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->datalen, sizeof(s->datalen))) ||
+     (s->data_start < 0) || (s->data_start >= sizeof(s->databuf)) ||
+     (s->datalen < 0) || (s->datalen > sizeof(s->databuf)) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, s->databuf, sizeof(s->databuf))))
+    return RC_ERROR;
+  return RC_OK;
+}
+
 static struct ext_module_s ext_mod = {
   "serial2console",
   serial2console_start,
   serial2console_new,
   serial2console_add_pads,
   NULL,
-  serial2console_tick
+  serial2console_tick,
+  clk_edges_next_tick,
+  serial2console_save,
+  serial2console_restore,
+  serial2console_busy
 };
 
 int litex_sim_ext_module_init(int (*register_module) (struct ext_module_s *))
@@ -22,6 +22,8 @@ struct session_s {
   char databuf[2048];
   int data_start;
   int datalen;
+  struct clk_edge_t edge;
+  int active;
   int fd;
 };
 
@@ -232,17 +234,17 @@ out:
 }
 static int serial2tcp_tick(void *sess, uint64_t time_ps)
 {
-  static struct clk_edge_t edge;
   char c;
   int ret = RC_OK;
 
   struct session_s *s = (struct session_s*)sess;
-  if(!clk_pos_edge(&edge, *s->sys_clk)) {
+  if(!clk_pos_edge(&s->edge, *s->sys_clk)) {
     return RC_OK;
   }
 
   *s->tx_ready = 1;
   if(s->fd && *s->tx_valid) {
+    s->active = 1;
     c = *s->tx;
     if(-1 ==write(s->fd, &c, 1)) {
       eprintf("Error writing on socket\n");
@@ -266,13 +268,53 @@ out:
   return ret;
 }
 
+static int serial2tcp_busy(void *sess)
+{
+  struct session_s *s = (struct session_s*)sess;
+  int busy = s->active || s->datalen;
+
+  s->active = 0;
+  return busy;
+}
+
+static int serial2tcp_save(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*)sess;
+
+  /* Received data not yet sent to the design */
+  if((RC_OK != litex_sim_checkpoint_write(ckpt, &s->edge, sizeof(s->edge))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->data_start, sizeof(s->data_start))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->datalen, sizeof(s->datalen))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, s->databuf, sizeof(s->databuf))))
+    return RC_NOENMEM;
+  return RC_OK;
+}
+
+static int serial2tcp_restore(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*)sess;
+
+  if((RC_OK != litex_sim_checkpoint_read(ckpt, &s->edge, sizeof(s->edge))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->data_start, sizeof(s->data_start))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->datalen, sizeof(s->datalen))) ||
+     (s->data_start < 0) || (s->data_start >= sizeof(s->databuf)) ||
+     (s->datalen < 0) || (s->datalen > sizeof(s->databuf)) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, s->databuf, sizeof(s->databuf))))
+    return RC_ERROR;
+  return RC_OK;
+}
+
 static struct ext_module_s ext_mod = {
   "serial2tcp",
   serial2tcp_start,
   serial2tcp_new,
   serial2tcp_add_pads,
   NULL,
-  serial2tcp_tick
+  serial2tcp_tick,
+  clk_edges_next_tick,
+  serial2tcp_save,
+  serial2tcp_restore,
+  serial2tcp_busy
 };
 
 int litex_sim_ext_module_init(int (*register_module)(struct ext_module_s *))
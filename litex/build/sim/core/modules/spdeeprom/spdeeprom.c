@@ -59,6 +59,7 @@ struct session_s {
   unsigned int bit_counter;
   unsigned int devaddr;
   unsigned int addr;
+  struct clk_edge_t edge;
 };
 
 // Module interface
@@ -66,6 +67,8 @@ static int spdeeprom_start();
 static int spdeeprom_new(void **sess, char *args);
 static int spdeeprom_add_pads(void *sess, struct pad_list_s *plist);
 static int spdeeprom_tick(void *sess, uint64_t time_ps);
+static int spdeeprom_save(void *sess, struct checkpoint_s *ckpt);
+static int spdeeprom_restore(void *sess, struct checkpoint_s *ckpt);
 // EEPROM simulation
 static void fsm_tick(struct session_s *s);
 static enum SerialState state_serial_next(struct session_s *s);
@@ -81,7 +84,10 @@ static struct ext_module_s ext_mod = {
   spdeeprom_new,
   spdeeprom_add_pads,
   NULL,
-  spdeeprom_tick
+  spdeeprom_tick,
+  clk_edges_next_tick,
+  spdeeprom_save,
+  spdeeprom_restore
 };
 
 int litex_sim_ext_module_init(int (*register_module)(struct ext_module_s *))
@@ -164,14 +170,13 @@ out:
 
 static int spdeeprom_tick(void *sess, uint64_t time_ps)
 {
-  static struct clk_edge_t edge;
   struct session_s *s = (struct session_s*) sess;
 
   if (s->sda_in == 0 || s->sda_out == 0 || s->scl == 0) {
       return RC_OK;
   }
 
-  if(!clk_pos_edge(&edge, *s->sys_clk)) {
+  if(!clk_pos_edge(&s->edge, *s->sys_clk)) {
     return RC_OK;
   }
 
@@ -180,6 +185,41 @@ static int spdeeprom_tick(void *sess, uint64_t time_ps)
   return RC_OK;
 }
 
+static int spdeeprom_save(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*) sess;
+
+  // memory contents (may have been written) and FSM state
+  if((RC_OK != litex_sim_checkpoint_write(ckpt, s->mem, sizeof(s->mem))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->state_transaction, sizeof(s->state_transaction))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->state_serial, sizeof(s->state_serial))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->byte_in, sizeof(s->byte_in))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->byte_out, sizeof(s->byte_out))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->bit_counter, sizeof(s->bit_counter))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->devaddr, sizeof(s->devaddr))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->addr, sizeof(s->addr))) ||
+     (RC_OK != litex_sim_checkpoint_write(ckpt, &s->edge, sizeof(s->edge))))
+    return RC_NOENMEM;
+  return RC_OK;
+}
+
+static int spdeeprom_restore(void *sess, struct checkpoint_s *ckpt)
+{
+  struct session_s *s = (struct session_s*) sess;
+
+  if((RC_OK != litex_sim_checkpoint_read(ckpt, s->mem, sizeof(s->mem))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->state_transaction, sizeof(s->state_transaction))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->state_serial, sizeof(s->state_serial))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->byte_in, sizeof(s->byte_in))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->byte_out, sizeof(s->byte_out))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->bit_counter, sizeof(s->bit_counter))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->devaddr, sizeof(s->devaddr))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->addr, sizeof(s->addr))) ||
+     (RC_OK != litex_sim_checkpoint_read(ckpt, &s->edge, sizeof(s->edge))))
+    return RC_ERROR;
+  return RC_OK;
+}
+
 /*** Simulation ***********************************************************************************/
 
 #ifdef DEBUG_SPD_EEPROM
@@ -36,6 +36,13 @@ uint64_t sim_time_ps = 0;
 struct session_list_s *sesslist=NULL;
 struct event_base *base=NULL;
 
+/* Checkpoints (+checkpoint-save=FILE, +checkpoint-save-time=PS, +checkpoint-exit,
+   +checkpoint-restore=FILE) */
+char *checkpoint_save_file=NULL;
+uint64_t checkpoint_save_time=UINT64_MAX;
+char checkpoint_exit=0;
+char *checkpoint_restore_file=NULL;
+
 static int litex_sim_initialize_all(void **sim, void *base)
 {
   struct module_s *ml=NULL;
@@ -167,6 +174,246 @@ int litex_sim_sort_session()
   return RC_OK;
 }
 
+static uint64_t litex_sim_next_time(void)
+{
+  struct session_list_s *s;
+  uint64_t next = UINT64_MAX;
+  uint64_t t;
+
+  for(s = sesslist; s; s=s->next)
+  {
+    if(!s->module->next_tick)
+    {
+      return sim_time_ps + timebase_ps;
+    }
+    t = s->module->next_tick(s->session, sim_time_ps);
+    if(t < next)
+    {
+      next = t;
+    }
+  }
+
+  /* Next timebase step at or after the earliest tick */
+  if((next <= sim_time_ps) || (next == UINT64_MAX))
+  {
+    return sim_time_ps + timebase_ps;
+  }
+  return next + (timebase_ps - next % timebase_ps) % timebase_ps;
+}
+
+static void litex_sim_parse_checkpoint_args(int argc, char *argv[])
+{
+  int i;
+
+  for(i = 1; i < argc; i++)
+  {
+    if(!strncmp(argv[i], "+checkpoint-save=", 17))
+      checkpoint_save_file = argv[i] + 17;
+    else if(!strncmp(argv[i], "+checkpoint-save-time=", 22))
+      checkpoint_save_time = strtoull(argv[i] + 22, NULL, 0);
+    else if(!strcmp(argv[i], "+checkpoint-exit"))
+      checkpoint_exit = 1;
+    else if(!strncmp(argv[i], "+checkpoint-restore=", 20))
+      checkpoint_restore_file = argv[i] + 20;
+  }
+}
+
+/* Sessions are saved in order, each one as: name length, name, data size, data. */
+static int litex_sim_save_checkpoint(void *vsim, char *filename)
+{
+  struct session_list_s *s;
+  struct checkpoint_s ckpt;
+  struct checkpoint_s sess_ckpt;
+  uint32_t len;
+  uint64_t size;
+  int ret = RC_OK;
+
+  memset(&ckpt, 0, sizeof(ckpt));
+  for(s = sesslist; s; s=s->next)
+  {
+    memset(&sess_ckpt, 0, sizeof(sess_ckpt));
+    if(s->module->save)
+    {
+      ret = s->module->save(s->session, &sess_ckpt);
+      if(RC_OK != ret)
+      {
+        eprintf("Can't save session of module %s\n", s->module->name);
+        free(sess_ckpt.data);
+        goto out;
+      }
+    }
+    len = strlen(s->module->name);
+    size = sess_ckpt.size;
+    if((RC_OK != (ret = litex_sim_checkpoint_write(&ckpt, &len, sizeof(len)))) ||
+       (RC_OK != (ret = litex_sim_checkpoint_write(&ckpt, s->module->name, len))) ||
+       (RC_OK != (ret = litex_sim_checkpoint_write(&ckpt, &size, sizeof(size)))) ||
+       (RC_OK != (ret = litex_sim_checkpoint_write(&ckpt, sess_ckpt.data, sess_ckpt.size))))
+    {
+      free(sess_ckpt.data);
+      goto out;
+    }
+    free(sess_ckpt.data);
+  }
+
+  ret = litex_sim_save(vsim, filename, sim_time_ps, ckpt.data, ckpt.size);
+  if(RC_OK == ret)
+  {
+    printf("\n[checkpoint] saved %s at %llu ps\n", filename, (unsigned long long)sim_time_ps);
+    fflush(stdout);
+  }
+out:
+  free(ckpt.data);
+  return ret;
+}
+
+static int litex_sim_restore_checkpoint(void *vsim, char *filename)
+{
+  struct session_list_s *s;
+  struct checkpoint_s ckpt;
+  struct checkpoint_s sess_ckpt;
+  void *data=NULL;
+  size_t data_size;
+  char name[256];
+  uint32_t len;
+  uint64_t size;
+  int ret = RC_OK;
+
+  ret = litex_sim_restore(vsim, filename, &sim_time_ps, &data, &data_size);
+  if(RC_OK != ret)
+  {
+    goto out;
+  }
+
+  memset(&ckpt, 0, sizeof(ckpt));
+  ckpt.data = (char *)data;
+  ckpt.size = data_size;
+  for(s = sesslist; s; s=s->next)
+  {
+    if((RC_OK != litex_sim_checkpoint_read(&ckpt, &len, sizeof(len))) ||
+       (len >= sizeof(name)) ||
+       (RC_OK != litex_sim_checkpoint_read(&ckpt, name, len)) ||
+       (RC_OK != litex_sim_checkpoint_read(&ckpt, &size, sizeof(size))) ||
+       (ckpt.offset + size > ckpt.size))
+    {
+      eprintf("Invalid checkpoint %s\n", filename);
+      ret = RC_ERROR;
+      goto out;
+    }
+    name[len] = 0;
+    if(strcmp(name, s->module->name))
+    {
+      eprintf("Checkpoint %s does not match the configuration (module %s instead of %s)\n",
+        filename, name, s->module->name);
+      ret = RC_ERROR;
+      goto out;
+    }
+    if(s->module->restore)
+    {
+      memset(&sess_ckpt, 0, sizeof(sess_ckpt));
+      sess_ckpt.data = ckpt.data + ckpt.offset;
+      sess_ckpt.size = size;
+      ret = s->module->restore(s->session, &sess_ckpt);
+      if(RC_OK != ret)
+      {
+        eprintf("Can't restore session of module %s\n", s->module->name);
+        goto out;
+      }
+    }
+    ckpt.offset += size;
+  }
+  if(s || (ckpt.offset != ckpt.size))
+  {
+    eprintf("Checkpoint %s does not match the configuration\n", filename);
+    ret = RC_ERROR;
+    goto out;
+  }
+
+  printf("[checkpoint] restored %s at %llu ps\n", filename, (unsigned long long)sim_time_ps);
+  fflush(stdout);
+out:
+  free(data);
+  return ret;
+}
+
+static int litex_sim_checkpoint(void *vsim)
+{
+  static int last_requested = 0;
+  int requested = litex_sim_checkpoint_requested();
+  int save = 0;
+
+  /* On the rising edge of the sim_checkpoint pad or at the save time (once) */
+  if(requested && !last_requested)
+  {
+    save = 1;
+  }
+  last_requested = requested;
+  if(sim_time_ps >= checkpoint_save_time)
+  {
+    checkpoint_save_time = UINT64_MAX;
+    save = 1;
+  }
+  if(!save)
+  {
+    return RC_OK;
+  }
+
+  if(!checkpoint_save_file)
+  {
+    eprintf("Checkpoint requested without checkpoint file (+checkpoint-save=FILE)\n");
+    return RC_OK;
+  }
+  if(RC_OK != litex_sim_save_checkpoint(vsim, checkpoint_save_file))
+  {
+    return RC_ERROR;
+  }
+  return checkpoint_exit ? RC_ERROR : RC_OK;
+}
+
+/* Number of steps evaluated between two polls of the host I/O: small while a session is busy
+   (low latency for the TCP/TAP/console peers), growing while idle (throughput), and bounded so
+   that a batch does not take more than BATCH_MAX_US of wall time. */
+#define BATCH_MIN_STEPS 256
+#define BATCH_MAX_STEPS (1 << 20)
+#define BATCH_MAX_US 10000
+static unsigned int batch_steps = 1000;
+
+static int litex_sim_sessions_busy(void)
+{
+  struct session_list_s *s;
+  int busy = 0;
+
+  /* Call all of them: busy clears the activity of the session. */
+  for(s = sesslist; s; s=s->next)
+  {
+    if(s->module->busy && s->module->busy(s->session))
+      busy = 1;
+  }
+  return busy;
+}
+
+static void litex_sim_adapt_batch(struct timeval *start)
+{
+  struct timeval end;
+  struct timeval elapsed;
+
+  evutil_gettimeofday(&end, NULL);
+  evutil_timersub(&end, start, &elapsed);
+
+  if(litex_sim_sessions_busy())
+  {
+    batch_steps = BATCH_MIN_STEPS;
+  }
+  else if((elapsed.tv_sec == 0) && (elapsed.tv_usec < BATCH_MAX_US/2))
+  {
+    if(batch_steps < BATCH_MAX_STEPS)
+      batch_steps *= 2;
+  }
+  else if(batch_steps > BATCH_MIN_STEPS)
+  {
+    batch_steps /= 2;
+  }
+}
+
 struct event *ev;
 
 static void cb(int sock, short which, void *arg)
@@ -174,11 +421,13 @@ static void cb(int sock, short which, void *arg)
   struct session_list_s *s;
   void *vsim=arg;
   struct timeval tv;
+  struct timeval start;
   tv.tv_sec = 0;
   tv.tv_usec = 0;
-  int i;
+  unsigned int i;
 
-  for(i = 0; i < 1000; i++)
+  evutil_gettimeofday(&start, NULL);
+  for(i = 0; i < batch_steps; i++)
   {
     for(s = sesslist; s; s=s->next)
     {
@@ -195,13 +444,20 @@ static void cb(int sock, short which, void *arg)
         s->module->tick(s->session, sim_time_ps);
     }
 
-    sim_time_ps += timebase_ps;
+    sim_time_ps = litex_sim_next_time();
+
+    /* Saved between two evaluations: a restored simulation resumes at sim_time_ps. */
+    if (RC_OK != litex_sim_checkpoint(vsim)) {
+        event_base_loopbreak(base);
+        break;
+    }
 
     if (litex_sim_got_finish()) {
         event_base_loopbreak(base);
         break;
     }
   }
+  litex_sim_adapt_batch(&start);
 
   if (!evtimer_pending(ev, NULL)) {
     event_del(ev);
@@ -231,6 +487,7 @@ int main(int argc, char *argv[])
   }
 
   litex_sim_init_cmdargs(argc, argv);
+  litex_sim_parse_checkpoint_args(argc, argv);
   if(RC_OK != (ret = litex_sim_initialize_all(&vsim, base)))
   {
     goto out;
@@ -241,6 +498,14 @@ int main(int argc, char *argv[])
     goto out;
   }
 
+  if(checkpoint_restore_file)
+  {
+    if(RC_OK != (ret = litex_sim_restore_checkpoint(vsim, checkpoint_restore_file)))
+    {
+      goto out;
+    }
+  }
+
   tv.tv_sec = 0;
   tv.tv_usec = 0;
   ev = event_new(base, -1, EV_PERSIST, cb, vsim);
@@ -6,6 +6,10 @@
 #include <stdint.h>
 #include "Vsim.h"
 #include "verilated.h"
+#ifdef SIM_SAVABLE
+#include "verilated_save.h"
+#endif
+#include "error.h"
 #ifdef TRACE_FST
 #include "verilated_fst_c.h"
 #else
@@ -81,6 +85,78 @@ extern "C" int litex_sim_got_finish()
   return Verilated::gotFinish();
 }
 
+/* Checkpoint file: magic, time (ps), size and data of the sessions of the external modules, then
+   the state of the Verilated model. */
+static const char checkpoint_magic[8] = {'L', 'X', 'S', 'I', 'M', 'C', 'K', '1'};
+
+#ifdef SIM_SAVABLE
+extern "C" int litex_sim_save(void *vsim, const char *filename, uint64_t time_ps, const void *data, size_t size)
+{
+  Vsim *sim = (Vsim*)vsim;
+  VerilatedSave os;
+  uint64_t data_size = size;
+
+  os.open(filename);
+  if(!os.isOpen()) {
+    eprintf("Can't open checkpoint file %s\n", filename);
+    return RC_ERROR;
+  }
+  os.write(checkpoint_magic, sizeof(checkpoint_magic));
+  os.write(&time_ps, sizeof(time_ps));
+  os.write(&data_size, sizeof(data_size));
+  os.write(data, size);
+  os << *sim;
+  os.close();
+  return RC_OK;
+}
+
+extern "C" int litex_sim_restore(void *vsim, const char *filename, uint64_t *time_ps, void **data, size_t *size)
+{
+  Vsim *sim = (Vsim*)vsim;
+  VerilatedRestore is;
+  char magic[sizeof(checkpoint_magic)];
+  uint64_t data_size;
+
+  is.open(filename);
+  if(!is.isOpen()) {
+    eprintf("Can't open checkpoint file %s\n", filename);
+    return RC_ERROR;
+  }
+  is.read(magic, sizeof(magic));
+  if(memcmp(magic, checkpoint_magic, sizeof(magic))) {
+    eprintf("%s is not a checkpoint file\n", filename);
+    is.close();
+    return RC_ERROR;
+  }
+  is.read(time_ps, sizeof(*time_ps));
+  is.read(&data_size, sizeof(data_size));
+  *data = malloc(data_size ? data_size : 1);
+  if(!*data) {
+    is.close();
+    return RC_NOENMEM;
+  }
+  is.read(*data, data_size);
+  *size = data_size;
+  /* Checks that the checkpoint was saved from the same model. */
+  is >> *sim;
+  is.close();
+  main_time = *time_ps;
+  return RC_OK;
+}
+#else
+extern "C" int litex_sim_save(void *vsim, const char *filename, uint64_t time_ps, const void *data, size_t size)
+{
+  eprintf("Simulation built without checkpoint support (savable)\n");
+  return RC_ERROR;
+}
+
+extern "C" int litex_sim_restore(void *vsim, const char *filename, uint64_t *time_ps, void **data, size_t *size)
+{
+  eprintf("Simulation built without checkpoint support (savable)\n");
+  return RC_ERROR;
+}
+#endif
+
 #if VM_COVERAGE
 extern "C" void litex_sim_coverage_dump()
 {
@@ -19,6 +19,8 @@ class SimPlatform(GenericPlatform):
     def __init__(self, device, io, name="sim", toolchain="verilator", **kwargs):
         if "sim_trace" not in (iface[0] for iface in io):
             io.append(("sim_trace", 0, Pins(1)))
+        if "sim_checkpoint" not in (iface[0] for iface in io):
+            io.append(("sim_checkpoint", 0, Pins(1)))
         GenericPlatform.__init__(self, device, io, name=name, **kwargs)
         self.sim_requested = []
         if toolchain == "verilator":
@@ -57,9 +59,11 @@ class SimPlatform(GenericPlatform):
         module.submodules.sim_trace = SimTrace(self.trace, reset=reset)
         module.submodules.sim_marker = SimMarker()
         module.submodules.sim_finish = SimFinish()
+        module.submodules.sim_checkpoint = SimCheckpoint(self.request("sim_checkpoint"))
         module.add_csr("sim_trace")
         module.add_csr("sim_marker")
         module.add_csr("sim_finish")
+        module.add_csr("sim_checkpoint")
         self.trace = None
 
 # Sim debug modules --------------------------------------------------------------------------------
@@ -88,3 +92,16 @@ class SimFinish(Module, AutoCSR):
         # set from software
         self.finish = CSR()
         self.sync += If(self.finish.re, Finish())
+
+class SimCheckpoint(Module, AutoCSR):
+    """Save a simulation checkpoint from software
+
+    The checkpoint is saved to the file given to the simulation (+checkpoint-save=FILE, or
+    checkpoint_save of SimVerilatorToolchain.build) between two evaluations. Requires a simulation
+    built with checkpoint support.
+    """
+    def __init__(self, pin):
+        # set from software
+        self.save = CSR()
+        # used by simulator to save the checkpoint
+        self.sync += pin.eq(self.save.re)
@@ -76,12 +76,28 @@ def _generate_sim_cpp(platform, trace=False, trace_start=0, trace_end=-1):
 extern "C" void litex_sim_init_tracer(void *vsim, long start, long end);
 extern "C" void litex_sim_tracer_dump();
 
+static Vsim *g_vsim = nullptr;
+
 extern "C" void litex_sim_dump()
 {
 """
     if trace:
         content += """\
     litex_sim_tracer_dump();
+"""
+    content += """\
+}
+
+extern "C" int litex_sim_checkpoint_requested()
+{
+"""
+    if any(name == "sim_checkpoint" for name, index, siglist in platform.sim_requested):
+        content += """\
+    return g_vsim->sim_checkpoint;
+"""
+    else:
+        content += """\
+    return 0;
 """
     content  += """\
 }}
@@ -91,6 +107,7 @@ extern "C" void litex_sim_init(void **out)
     Vsim *sim;
 
     sim = new Vsim;
+    g_vsim = sim;
 
     litex_sim_init_tracer(sim, {}, {});
 
@@ -123,20 +140,21 @@ def _generate_sim_config(config):
     tools.write_to_file("sim_config.js", content)
 
 
-def _build_sim(build_name, sources, threads, coverage, opt_level="O3", trace_fst=False):
+def _build_sim(build_name, sources, threads, coverage, opt_level="O3", trace_fst=False, savable=False):
     makefile = os.path.join(core_directory, 'Makefile')
     cc_srcs = []
     for filename, language, library in sources:
         cc_srcs.append("--cc " + filename + " ")
     build_script_contents = """\
 rm -rf obj_dir/
-make -C . -f {} {} {} {} {} {}
+make -C . -f {} {} {} {} {} {} {}
 """.format(makefile,
     "CC_SRCS=\"{}\"".format("".join(cc_srcs)),
     "THREADS={}".format(threads) if int(threads) > 1 else "",
     "COVERAGE=1" if coverage else "",
     "OPT_LEVEL={}".format(opt_level),
     "TRACE_FST=1" if trace_fst else "",
+    "SAVABLE=1" if savable else "",
     )
     build_script_file = "build_" + build_name + ".sh"
     tools.write_to_file(build_script_file, build_script_contents, force_unix=True)
@@ -155,9 +173,9 @@ def _compile_sim(build_name, verbose):
     if verbose:
         print(output)
 
-def _run_sim(build_name, as_root=False):
+def _run_sim(build_name, as_root=False, plusargs=[]):
     run_script_contents = "sudo " if as_root else ""
-    run_script_contents += "obj_dir/Vsim"
+    run_script_contents += " ".join(["obj_dir/Vsim"] + plusargs)
     run_script_file = "run_" + build_name + ".sh"
     tools.write_to_file(run_script_file, run_script_contents, force_unix=True)
     if sys.platform != "win32":
@@ -189,7 +207,18 @@ class SimVerilatorToolchain:
             trace_fst    = False,
             trace_start  = 0,
             trace_end    = -1,
-            regular_comb = False):
+            regular_comb = False,
+            savable      = False,
+            checkpoint_save      = None,
+            checkpoint_save_time = None,
+            checkpoint_exit      = False,
+            checkpoint_restore   = None):
+
+        # Checkpoints require a savable model, which Verilator does not support with threads
+        if checkpoint_save is not None or checkpoint_restore is not None:
+            savable = True
+        if savable and int(threads) > 1:
+            raise ValueError("Simulation checkpoints are not supported with threads")
 
         # Create build directory
         os.makedirs(build_dir, exist_ok=True)
@@ -223,7 +252,7 @@ class SimVerilatorToolchain:
                 _generate_sim_config(sim_config)
 
             # Build
-            _build_sim(build_name, platform.sources, threads, coverage, opt_level, trace_fst)
+            _build_sim(build_name, platform.sources, threads, coverage, opt_level, trace_fst, savable)
 
         # Run
         if run:
@@ -238,7 +267,16 @@ class SimVerilatorToolchain:
                 run_as_root = True
             if sim_config.has_module("xgmii_ethernet"):
                 run_as_root = True
-            _run_sim(build_name, as_root=run_as_root)
+            plusargs = []
+            if checkpoint_save is not None:
+                plusargs.append("+checkpoint-save=" + os.path.abspath(os.path.join(cwd, checkpoint_save)))
+                if checkpoint_save_time is not None:
+                    plusargs.append("+checkpoint-save-time={}".format(int(checkpoint_save_time)))
+                if checkpoint_exit:
+                    plusargs.append("+checkpoint-exit")
+            if checkpoint_restore is not None:
+                plusargs.append("+checkpoint-restore=" + os.path.abspath(os.path.join(cwd, checkpoint_restore)))
+            _run_sim(build_name, as_root=run_as_root, plusargs=plusargs)
 
         os.chdir(cwd)
 
@@ -0,0 +1,232 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import pickle
+import hashlib
+import inspect
+import tempfile
+
+from migen.fhdl import structure, specials, tools, namer
+from migen.fhdl.structure import Signal, Constant
+from migen.fhdl.module import Module
+from migen.fhdl.namer import Namespace
+
+from litex.build.tools import generated_banner
+
+# Fingerprint --------------------------------------------------------------------------------------
+
+_cache_version = 2
+
+class _Fingerprint:
+    """Structural fingerprint of a fragment
+
+    Serializes the statements, specials, clock domains and IOs of a fragment and hashes them.
+    Signals are identified by their order of first appearance (so that the fingerprint does not
+    depend on the other designs elaborated in the same process) and their relative order of
+    creation (that the namer and the printers use). The source files of the classes of the specials
+    (and of their overrides) are part of the fingerprint, so that changes to their emit_verilog
+    invalidate the cache.
+    """
+    def __init__(self):
+        self.tokens  = []
+        self.signals = []
+        self.ids     = dict() # id(object) -> index, for signals and shared objects.
+        self.objects = []     # Keep the objects alive while their ids are used.
+        self.classes = dict()
+        self.files   = set()
+
+    def add_class(self, cls):
+        try:
+            token = self.classes[cls]
+        except KeyError:
+            token = self.classes[cls] = cls.__module__ + "." + cls.__qualname__
+            try:
+                self.files.add(inspect.getsourcefile(cls))
+            except TypeError:
+                pass
+        self.tokens.append(token)
+
+    def add(self, obj):
+        tokens = self.tokens
+        if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+            tokens.append(repr(obj))
+        elif isinstance(obj, Signal):
+            try:
+                tokens.append("S{}".format(self.ids[id(obj)]))
+            except KeyError:
+                self.ids[id(obj)] = len(self.signals)
+                self.signals.append(obj)
+                tokens.append("Signal(")
+                self.add_vars(obj, exclude={"duid", "type", "direction"})
+                tokens.append(")")
+        elif isinstance(obj, Constant):
+            tokens.append("C({},{},{})".format(obj.value, obj.nbits, obj.signed))
+        elif isinstance(obj, (list, tuple)):
+            tokens.append("[")
+            for e in obj:
+                self.add(e)
+            tokens.append("]")
+        elif isinstance(obj, dict):
+            tokens.append("{")
+            for k, v in obj.items():
+                self.add(k)
+                tokens.append(":")
+                self.add(v)
+            tokens.append("}")
+        elif isinstance(obj, (set, frozenset)):
+            tokens.append("(")
+            for e in sorted(obj, key=lambda e: (e.duid, "") if hasattr(e, "duid") else (-1, repr(e))):
+                self.add(e)
+            tokens.append(")")
+        elif isinstance(obj, type):
+            self.add_class(obj)
+        elif inspect.isroutine(obj):
+            tokens.append(getattr(obj, "__qualname__", repr(obj)))
+        elif isinstance(obj, Module):
+            # Modules referenced by specials: their logic is part of the fragment.
+            self.add_class(type(obj))
+        else:
+            try:
+                tokens.append("O{}".format(self.ids[id(obj)]))
+            except KeyError:
+                self.ids[id(obj)] = len(self.objects)
+                self.objects.append(obj)
+                self.add_class(type(obj))
+                tokens.append("(")
+                self.add_vars(obj, exclude={"duid"})
+                tokens.append(")")
+
+    def add_vars(self, obj, exclude):
+        for k, v in sorted(vars(obj).items()):
+            if k not in exclude:
+                self.tokens.append(k)
+                self.add(v)
+
+    def digest(self):
+        # Relative creation order of the signals.
+        order = sorted(range(len(self.signals)), key=lambda i: self.signals[i].duid)
+        self.tokens.append(repr(order))
+        h = hashlib.sha256()
+        h.update("\n".join(self.tokens).encode())
+        for filename in sorted(f for f in self.files if f is not None):
+            with open(filename, "rb") as f:
+                h.update(f.read())
+        return h.hexdigest()
+
+# Banners ------------------------------------------------------------------------------------------
+
+_banner_rule = "//" + "-"*80
+
+def _strip_banner(source):
+    # Remove the generated banner (revisions, date) of a source, return (banner, source).
+    lines = source.split("\n", 3)
+    if (len(lines) == 4 and lines[0] == _banner_rule and lines[2] == _banner_rule and
+        lines[1].startswith("// Auto-generated by")):
+        return True, lines[3]
+    return False, source
+
+def _add_banner(banner, source):
+    # Prepend a fresh generated banner to a source stripped by _strip_banner.
+    return generated_banner("//") + source if banner else source
+
+# Verilog Cache ------------------------------------------------------------------------------------
+
+class VerilogCache:
+    """Verilog conversion cache
+
+    Stores the outputs of `convert` in `directory`, keyed by the fingerprint of the fragment (before
+    lowering) and of the conversion parameters. A hit restores the sources, the data files, the
+    namespace (for the signals of the fragment) and the directions/types of the IOs without
+    lowering and printing the fragment again. The generated banners are stored stripped and
+    regenerated on a hit (so that they give the current revisions and date).
+    """
+    def __init__(self, directory, max_entries=64):
+        self.directory   = directory
+        self.max_entries = max_entries
+
+    def fingerprint(self, f, ios, **kwargs):
+        fp = _Fingerprint()
+        fp.add(_cache_version)
+        # Sources of the conversion.
+        fp.files.add(os.path.join(os.path.dirname(__file__), "verilog.py"))
+        fp.files.update(m.__file__ for m in [structure, specials, tools, namer])
+        for k, v in sorted(kwargs.items()):
+            fp.tokens.append(k)
+            fp.add(v)
+        fp.tokens.append("ios")
+        fp.add(sorted(ios, key=lambda x: x.duid))
+        fp.tokens.append("clock_domains")
+        fp.add(list(f.clock_domains))
+        fp.tokens.append("comb")
+        fp.add(f.comb)
+        fp.tokens.append("sync")
+        fp.add(sorted(f.sync.items(), key=lambda x: x[0]))
+        fp.tokens.append("specials")
+        fp.add(f.specials)
+        return fp.digest(), fp.signals
+
+    def _filename(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def load(self, key, signals, ios, f, r):
+        # Fill the ConvOutput r from the cache, return False on a miss.
+        try:
+            with open(self._filename(key), "rb") as file:
+                entry = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+        os.utime(self._filename(key))
+
+        # Namespace, in the state it was after the conversion.
+        ns = Namespace(dict())
+        ns.counts = entry["counts"]
+        for n, (name, number) in entry["names"].items():
+            if name is not None:
+                ns.pnd[signals[n]] = name
+            if number is not None:
+                ns.sigs[signals[n]] = number
+        ns.clock_domains = f.clock_domains
+
+        index = {id(s): n for n, s in enumerate(signals)}
+        for io in ios:
+            io.type, io.direction = entry["ios"][index[id(io)]]
+
+        r.ns = ns
+        r.set_main_source(_add_banner(*entry["main_source"]))
+        for filename, content in entry["data_files"].items():
+            r.data_files[filename] = _add_banner(*content) if isinstance(content, tuple) else content
+        return True
+
+    def store(self, key, signals, ios, r):
+        names = dict()
+        for n, s in enumerate(signals):
+            name   = r.ns.pnd.get(s, None)
+            number = r.ns.sigs.get(s, None)
+            if name is not None or number is not None:
+                names[n] = (name, number)
+        entry = {
+            "main_source" : _strip_banner(r.main_source),
+            "data_files"  : {k: _strip_banner(v) if isinstance(v, str) else v
+                for k, v in r.data_files.items()},
+            "names"       : names,
+            "counts"      : dict(r.ns.counts),
+            "ios"         : {n: (s.type, s.direction) for n, s in enumerate(signals) if s in ios},
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(entry, file)
+        os.replace(tmpname, self._filename(key))
+        self._prune()
+
+    def _prune(self):
+        # Only keep the max_entries most recently used entries.
+        entries = [os.path.join(self.directory, e) for e in os.listdir(self.directory)
+            if e.endswith(".pickle")]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for entry in entries[self.max_entries:]:
+            os.remove(entry)
@@ -0,0 +1,216 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen.fhdl.structure import _Fragment, SPECIAL_INPUT, SPECIAL_OUTPUT, SPECIAL_INOUT
+from migen.fhdl.module import Module
+from migen.fhdl.specials import Special
+from migen.fhdl.decorators import ModuleTransformer
+from migen.fhdl.tools import list_signals, list_targets, list_special_ios, list_clock_domains
+from migen.fhdl.tools import rename_clock_domain
+
+# Verilog Module Instance --------------------------------------------------------------------------
+
+class _Port:
+    def __init__(self, signal, direction):
+        self.signal    = signal
+        self.direction = direction
+
+
+class VerilogModuleInstance(Special):
+    """Instance of a separate Verilog module
+
+    Holds the fragment of a module separated with `VerilogModule`. The ports (signals of the
+    fragment also used by the rest of the design, and the clocks/resets of the clock domains it
+    uses) are resolved by `resolve_verilog_modules` at conversion. The fragment is then converted
+    to its own Verilog module (data file `<name>.v`, named after the parent module) and the instance
+    of this module is emitted in the parent.
+    """
+    def __init__(self, fragment, name):
+        Special.__init__(self)
+        self.fragment      = fragment
+        self.name_override = name
+        self.ports         = []
+        self.clock_domains = []
+        self.parameters    = dict()
+
+    def iter_expressions(self):
+        for port in self.ports:
+            yield port, "signal", port.direction
+
+    def rename_clock_domain(self, old, new):
+        rename_clock_domain(self.fragment, old, new)
+
+    def list_clock_domains(self):
+        return list_clock_domains(self.fragment)
+
+    def _nested(self):
+        return [s for s in self.fragment.specials if isinstance(s, VerilogModuleInstance)]
+
+    def _signals(self):
+        # All the signals of the fragment, including the ones of the nested modules.
+        r = list_signals(self.fragment) | list_special_ios(self.fragment, True, True, True)
+        for module in self._nested():
+            r |= module._signals()
+        return r
+
+    def _outputs(self):
+        r = set(list_targets(self.fragment)) | list_special_ios(self.fragment, False, True, False)
+        for module in self._nested():
+            r |= module._outputs()
+        return r
+
+    def _inouts(self):
+        r = list_special_ios(self.fragment, False, False, True)
+        for module in self._nested():
+            r |= module._inouts()
+        return r
+
+    @staticmethod
+    def emit_verilog(instance, ns, add_data_file):
+        from litex.gen.fhdl.verilog import convert
+
+        parameters = dict(instance.parameters)
+        name       = parameters.pop("name") + "_" + ns.get_name(instance)
+        fragment   = _Fragment(
+            comb          = instance.fragment.comb,
+            sync          = instance.fragment.sync,
+            specials      = instance.fragment.specials,
+            clock_domains = instance.clock_domains)
+        # The conversion names the ports after their name_override: get the names in the parent
+        # first and restore the name_overrides after.
+        signals        = [port.signal for port in instance.ports]
+        names          = list(map(ns.get_name, signals))
+        name_overrides = [s.name_override for s in signals]
+        v = convert(fragment, set(signals), name=name, create_clock_domains=False, **parameters)
+        port_names = list(map(v.ns.get_name, signals))
+        for s, name_override in zip(signals, name_overrides):
+            s.name_override = name_override
+
+        # Data files of the module (memory initializations, nested modules), renamed if they clash
+        # with the ones of the parent.
+        source = v.main_source
+        for filename, content in v.data_files.items():
+            new_filename = add_data_file(filename, content)
+            if new_filename != filename:
+                source = source.replace("\"" + filename + "\"", "\"" + new_filename + "\"")
+        add_data_file(name + ".v", source)
+
+        r = name + " " + ns.get_name(instance) + "(\n"
+        r += ",\n".join("\t.{}({})".format(p, n) for p, n in zip(port_names, names))
+        r += "\n);\n\n"
+        return r
+
+
+def resolve_verilog_modules(f, ios, **parameters):
+    """Resolve the ports of the separate Verilog modules of fragment f
+
+    `parameters` are the conversion parameters of f, also used for the modules.
+    """
+    modules = [s for s in f.specials if isinstance(s, VerilogModuleInstance)]
+    if not modules:
+        return
+    others = [s for s in f.specials if not isinstance(s, VerilogModuleInstance)]
+
+    # Signals used/driven by the rest of the design.
+    rest_signals = set(list_signals(f)) | set(ios)
+    rest_outputs = set(list_targets(f))
+    for special in others:
+        rest_signals |= special.list_ios(True, True, True)
+        rest_outputs |= special.list_ios(False, True, False)
+    signals = {module: module._signals() for module in modules}
+    outputs = {module: module._outputs() for module in modules}
+
+    for module in modules:
+        outside_signals = set(rest_signals)
+        outside_outputs = set(rest_outputs)
+        for other in modules:
+            if other is not module:
+                outside_signals |= signals[other]
+                outside_outputs |= outputs[other]
+        conflicts = outputs[module] & outside_outputs
+        if conflicts:
+            raise ValueError("Signal(s) {} driven both inside and outside of module {}".format(
+                ", ".join(sorted(str(s.backtrace[-1][0]) for s in conflicts)), module.name_override))
+
+        ports = signals[module] & outside_signals
+        module.clock_domains = []
+        for cd_name in sorted(module.list_clock_domains()):
+            cd = f.clock_domains[cd_name]
+            module.clock_domains.append(cd)
+            ports.add(cd.clk)
+            if cd.rst is not None:
+                ports.add(cd.rst)
+
+        inouts = module._inouts()
+        module.ports = []
+        for signal in sorted(ports, key=lambda s: s.duid):
+            if signal in inouts:
+                direction = SPECIAL_INOUT
+            elif signal in outputs[module]:
+                direction = SPECIAL_OUTPUT
+            else:
+                direction = SPECIAL_INPUT
+            module.ports.append(_Port(signal, direction))
+        module.parameters = parameters
+
+# Verilog Module -----------------------------------------------------------------------------------
+
+class VerilogModule(ModuleTransformer):
+    """Emit a module (and its submodules) as a separate Verilog module
+
+    The logic of the module is replaced by an instance of a Verilog module, with the signals shared
+    with the rest of the design as ports. Usage: `self.submodules.cpu = VerilogModule("cpu")(cpu)`.
+
+    Clock domains stay defined in the parent. Control inserters (ResetInserter/CEInserter) applied
+    to a parent do not reach the logic of the separated module, and platform constraints can only
+    reference its ports.
+    """
+    def __init__(self, name=None):
+        self.name = name
+
+    def transform_fragment(self, i, f):
+        name     = self.name or i.__class__.__name__.lower()
+        instance = VerilogModuleInstance(_Fragment(f.comb, f.sync, f.specials), name)
+        f.comb     = []
+        f.sync     = dict()
+        f.specials = {instance}
+
+
+def separate_submodules(module, names):
+    """Emit the submodules `names` (dotted paths) of module as separate Verilog modules
+
+    Submodules created in module.do_finalize (ex: SoC bus interconnect) are separated once it
+    has been called.
+    """
+    def lookup(name):
+        submodule = module
+        for attr in name.split("."):
+            submodule = getattr(submodule, attr)
+        return submodule
+
+    def separate(names):
+        remaining = []
+        for name in names:
+            try:
+                submodule = lookup(name)
+            except AttributeError:
+                remaining.append(name)
+                continue
+            if not isinstance(submodule, Module):
+                raise TypeError("{} is not a Module".format(name))
+            if submodule.get_fragment_called:
+                raise ValueError("{} is already finalized".format(name))
+            VerilogModule(name.replace(".", "_"))(submodule)
+        return remaining
+
+    remaining = separate(names)
+    if remaining:
+        do_finalize = module.do_finalize
+        def separating_do_finalize(*args, **kwargs):
+            do_finalize(*args, **kwargs)
+            for name in separate(remaining):
+                raise AttributeError("Unknown submodule {}".format(name))
+        module.do_finalize = separating_do_finalize
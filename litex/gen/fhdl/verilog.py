@@ -21,9 +21,11 @@ from migen.fhdl.structure import *
 from migen.fhdl.structure import _Operator, _Slice, _Assign, _Fragment
 from migen.fhdl.tools import *
 from migen.fhdl.namer import build_namespace
-from migen.fhdl.conv_output import ConvOutput
+from migen.fhdl.conv_output import ConvOutput as _ConvOutput
 
-from litex.build.tools import generated_banner
+from litex.build.tools import generated_banner, write_to_file
+from litex.gen.fhdl.cache import VerilogCache
+from litex.gen.fhdl.hierarchy import resolve_verilog_modules
 
 
 _reserved_keywords = {
@@ -132,9 +134,53 @@ def _printexpr(ns, node):
 (_AT_BLOCKING, _AT_NONBLOCKING, _AT_SIGNAL) = range(3)
 
 
-def _printnode(ns, at, level, node, target_filter=None):
-    if target_filter is not None and target_filter not in list_targets(node):
-        return ""
+class _TargetsCache:
+    # Targets of the nodes of statement trees, computed once (by node) for all the target filters
+    # applied on the trees.
+    def __init__(self):
+        self.targets  = dict()
+        self.children = dict()
+
+    def list_targets(self, node):
+        try:
+            return self.targets[id(node)]
+        except KeyError:
+            pass
+        if isinstance(node, _Assign):
+            r = list_targets(node)
+        elif isinstance(node, If):
+            r = self.list_targets(node.t) | self.list_targets(node.f)
+        elif isinstance(node, Case):
+            r = set()
+            for statements in node.cases.values():
+                r |= self.list_targets(statements)
+        elif isinstance(node, collections.abc.Iterable):
+            r = set()
+            for n in node:
+                r |= self.list_targets(n)
+        else:
+            r = set()
+        self.targets[id(node)] = r
+        return r
+
+    def filter(self, statements, target):
+        # Statements of the list assigning target.
+        try:
+            children = self.children[id(statements)]
+        except KeyError:
+            children = collections.defaultdict(list)
+            for n in statements:
+                for t in self.list_targets(n):
+                    children[t].append(n)
+            self.children[id(statements)] = children
+        return children.get(target, [])
+
+
+def _printnode(out, ns, at, level, node, target_filter=None, targets=None):
+    # Append the Verilog of node to out, only keeping the statements assigning target_filter
+    # when set (targets is then the _TargetsCache of the statements).
+    if target_filter is not None and target_filter not in targets.list_targets(node):
+        return
     elif isinstance(node, _Assign):
         if at == _AT_BLOCKING:
             assignment = " = "
@@ -144,34 +190,33 @@ def _printnode(ns, at, level, node, target_filter=None):
             assignment = " = "
         else:
             assignment = " <= "
-        return "\t"*level + _printexpr(ns, node.l)[0] + assignment + _printexpr(ns, node.r)[0] + ";\n"
+        out.append("\t"*level + _printexpr(ns, node.l)[0] + assignment + _printexpr(ns, node.r)[0] + ";\n")
     elif isinstance(node, collections.abc.Iterable):
-        return "".join(_printnode(ns, at, level, n, target_filter) for n in node)
+        if target_filter is not None:
+            node = targets.filter(node, target_filter)
+        for n in node:
+            _printnode(out, ns, at, level, n, target_filter, targets)
     elif isinstance(node, If):
-        r = "\t"*level + "if (" + _printexpr(ns, node.cond)[0] + ") begin\n"
-        r += _printnode(ns, at, level + 1, node.t, target_filter)
+        out.append("\t"*level + "if (" + _printexpr(ns, node.cond)[0] + ") begin\n")
+        _printnode(out, ns, at, level + 1, node.t, target_filter, targets)
         if node.f:
-            r += "\t"*level + "end else begin\n"
-            r += _printnode(ns, at, level + 1, node.f, target_filter)
-        r += "\t"*level + "end\n"
-        return r
+            out.append("\t"*level + "end else begin\n")
+            _printnode(out, ns, at, level + 1, node.f, target_filter, targets)
+        out.append("\t"*level + "end\n")
     elif isinstance(node, Case):
         if node.cases:
-            r = "\t"*level + "case (" + _printexpr(ns, node.test)[0] + ")\n"
+            out.append("\t"*level + "case (" + _printexpr(ns, node.test)[0] + ")\n")
             css = [(k, v) for k, v in node.cases.items() if isinstance(k, Constant)]
             css = sorted(css, key=lambda x: x[0].value)
             for choice, statements in css:
-                r += "\t"*(level + 1) + _printexpr(ns, choice)[0] + ": begin\n"
-                r += _printnode(ns, at, level + 2, statements, target_filter)
-                r += "\t"*(level + 1) + "end\n"
+                out.append("\t"*(level + 1) + _printexpr(ns, choice)[0] + ": begin\n")
+                _printnode(out, ns, at, level + 2, statements, target_filter, targets)
+                out.append("\t"*(level + 1) + "end\n")
             if "default" in node.cases:
-                r += "\t"*(level + 1) + "default: begin\n"
-                r += _printnode(ns, at, level + 2, node.cases["default"], target_filter)
-                r += "\t"*(level + 1) + "end\n"
-            r += "\t"*level + "endcase\n"
-            return r
-        else:
-            return ""
+                out.append("\t"*(level + 1) + "default: begin\n")
+                _printnode(out, ns, at, level + 2, node.cases["default"], target_filter, targets)
+                out.append("\t"*(level + 1) + "end\n")
+            out.append("\t"*level + "endcase\n")
     elif isinstance(node, Display):
         s = "\"" + node.s + "\""
         for arg in node.args:
@@ -180,24 +225,22 @@ def _printnode(ns, at, level, node, target_filter=None):
                 s += ns.get_name(arg)
             else:
                 s += str(arg)
-        return "\t"*level + "$display(" + s + ");\n"
+        out.append("\t"*level + "$display(" + s + ");\n")
     elif isinstance(node, Finish):
-        return "\t"*level + "$finish;\n"
+        out.append("\t"*level + "$finish;\n")
     else:
         raise TypeError("Node of unrecognized type: "+str(type(node)))
 
 
-def _list_comb_wires(f):
+def _list_comb_wires(groups):
     r = set()
-    groups = group_by_targets(f.comb)
     for g in groups:
         if len(g[1]) == 1 and isinstance(g[1][0], _Assign):
             r |= g[0]
     return r
 
 def _printattr(attr, attr_translate):
-    r = ""
-    firsta = True
+    r = []
     for attr in sorted(attr,
                        key=lambda x: ("", x) if isinstance(x, str) else x):
         if isinstance(attr, tuple):
@@ -209,67 +252,61 @@ def _printattr(attr, attr_translate):
             if at is None:
                 continue
             attr_name, attr_value = at
-        if not firsta:
-            r += ", "
-        firsta = False
         const_expr = "\"" + attr_value + "\"" if not isinstance(attr_value, int) else str(attr_value)
-        r += attr_name + " = " + const_expr
+        r.append(attr_name + " = " + const_expr)
     if r:
-        r = "(* " + r + " *)"
-    return r
+        return "(* " + ", ".join(r) + " *)"
+    return ""
 
 
-def _printheader(f, ios, name, ns, attr_translate,
-                 reg_initialization):
-    sigs = list_signals(f) | list_special_ios(f, True, True, True)
+def _printheader(out, f, ios, name, ns, attr_translate,
+                 reg_initialization, sigs, groups):
     special_outs = list_special_ios(f, False, True, True)
     inouts = list_special_ios(f, False, False, True)
     targets = list_targets(f) | special_outs
-    wires = _list_comb_wires(f) | special_outs
-    r = "module " + name + "(\n"
-    firstp = True
+    wires = _list_comb_wires(groups) | special_outs
+    out.append("module " + name + "(\n")
+    ports = []
     for sig in sorted(ios, key=lambda x: x.duid):
-        if not firstp:
-            r += ",\n"
-        firstp = False
+        port = ""
         attr = _printattr(sig.attr, attr_translate)
         if attr:
-            r += "\t" + attr
+            port += "\t" + attr
         sig.type = "wire"
         if sig in inouts:
             sig.direction = "inout"
-            r += "\tinout wire " + _printsig(ns, sig)
+            port += "\tinout wire " + _printsig(ns, sig)
         elif sig in targets:
             sig.direction = "output"
             if sig in wires:
-                r += "\toutput wire " + _printsig(ns, sig)
+                port += "\toutput wire " + _printsig(ns, sig)
             else:
                 sig.type = "reg"
-                r += "\toutput reg " + _printsig(ns, sig)
+                port += "\toutput reg " + _printsig(ns, sig)
         else:
             sig.direction = "input"
-            r += "\tinput wire " + _printsig(ns, sig)
-    r += "\n);\n\n"
+            port += "\tinput wire " + _printsig(ns, sig)
+        ports.append(port)
+    out.append(",\n".join(ports))
+    out.append("\n);\n\n")
     for sig in sorted(sigs - ios, key=lambda x: x.duid):
         attr = _printattr(sig.attr, attr_translate)
         if attr:
-            r += attr + " "
+            out.append(attr + " ")
         if sig in wires:
-            r += "wire " + _printsig(ns, sig) + ";\n"
+            out.append("wire " + _printsig(ns, sig) + ";\n")
         else:
             if reg_initialization:
-                r += "reg " + _printsig(ns, sig) + " = " + _printexpr(ns, sig.reset)[0] + ";\n"
+                out.append("reg " + _printsig(ns, sig) + " = " + _printexpr(ns, sig.reset)[0] + ";\n")
             else:
-                r += "reg " + _printsig(ns, sig) + ";\n"
-    r += "\n"
-    return r
+                out.append("reg " + _printsig(ns, sig) + ";\n")
+    out.append("\n")
 
 
-def _printcomb_simulation(f, ns,
+def _printcomb_simulation(out, f, ns,
             display_run,
             dummy_signal,
             blocking_assign):
-    r = ""
     if f.comb:
         if dummy_signal:
             # Generate a dummy event to get the simulator
@@ -277,11 +314,10 @@ def _printcomb_simulation(f, ns,
             syn_off = "// synthesis translate_off\n"
             syn_on = "// synthesis translate_on\n"
             dummy_s = Signal(name_override="dummy_s")
-            r += syn_off
-            r += "reg " + _printsig(ns, dummy_s) + ";\n"
-            r += "initial " + ns.get_name(dummy_s) + " <= 1'd0;\n"
-            r += syn_on
-
+            out.append(syn_off)
+            out.append("reg " + _printsig(ns, dummy_s) + ";\n")
+            out.append("initial " + ns.get_name(dummy_s) + " <= 1'd0;\n")
+            out.append(syn_on)
 
         from collections import defaultdict
 
@@ -292,81 +328,82 @@ def _printcomb_simulation(f, ns,
             for t in targets:
                 target_stmt_map[t].append(statement)
 
-        groups = group_by_targets(f.comb)
+        targets = _TargetsCache()
 
         for n, (t, stmts) in enumerate(target_stmt_map.items()):
             assert isinstance(t, Signal)
             if len(stmts) == 1 and isinstance(stmts[0], _Assign):
-                r += "assign " + _printnode(ns, _AT_BLOCKING, 0, stmts[0])
+                out.append("assign ")
+                _printnode(out, ns, _AT_BLOCKING, 0, stmts[0])
             else:
                 if dummy_signal:
                     dummy_d = Signal(name_override="dummy_d")
-                    r += "\n" + syn_off
-                    r += "reg " + _printsig(ns, dummy_d) + ";\n"
-                    r += syn_on
+                    out.append("\n" + syn_off)
+                    out.append("reg " + _printsig(ns, dummy_d) + ";\n")
+                    out.append(syn_on)
 
-                r += "always @(*) begin\n"
+                out.append("always @(*) begin\n")
                 if display_run:
-                    r += "\t$display(\"Running comb block #" + str(n) + "\");\n"
+                    out.append("\t$display(\"Running comb block #" + str(n) + "\");\n")
                 if blocking_assign:
-                    r += "\t" + ns.get_name(t) + " = " + _printexpr(ns, t.reset)[0] + ";\n"
-                    r += _printnode(ns, _AT_BLOCKING, 1, stmts, t)
+                    out.append("\t" + ns.get_name(t) + " = " + _printexpr(ns, t.reset)[0] + ";\n")
+                    _printnode(out, ns, _AT_BLOCKING, 1, stmts, t, targets)
                 else:
-                    r += "\t" + ns.get_name(t) + " <= " + _printexpr(ns, t.reset)[0] + ";\n"
-                    r += _printnode(ns, _AT_NONBLOCKING, 1, stmts, t)
+                    out.append("\t" + ns.get_name(t) + " <= " + _printexpr(ns, t.reset)[0] + ";\n")
+                    _printnode(out, ns, _AT_NONBLOCKING, 1, stmts, t, targets)
                 if dummy_signal:
-                    r += syn_off
-                    r += "\t" + ns.get_name(dummy_d) + " = " + ns.get_name(dummy_s) + ";\n"
-                    r += syn_on
-                r += "end\n"
-    r += "\n"
-    return r
+                    out.append(syn_off)
+                    out.append("\t" + ns.get_name(dummy_d) + " = " + ns.get_name(dummy_s) + ";\n")
+                    out.append(syn_on)
+                out.append("end\n")
+    out.append("\n")
 
 
-def _printcomb_regular(f, ns, blocking_assign):
-    r = ""
+def _printcomb_regular(out, f, ns, blocking_assign, groups):
     if f.comb:
-        groups = group_by_targets(f.comb)
-
         for n, g in enumerate(groups):
             if len(g[1]) == 1 and isinstance(g[1][0], _Assign):
-                r += "assign " + _printnode(ns, _AT_BLOCKING, 0, g[1][0])
+                out.append("assign ")
+                _printnode(out, ns, _AT_BLOCKING, 0, g[1][0])
             else:
-                r += "always @(*) begin\n"
+                out.append("always @(*) begin\n")
                 if blocking_assign:
                     for t in g[0]:
-                        r += "\t" + ns.get_name(t) + " = " + _printexpr(ns, t.reset)[0] + ";\n"
-                    r += _printnode(ns, _AT_BLOCKING, 1, g[1])
+                        out.append("\t" + ns.get_name(t) + " = " + _printexpr(ns, t.reset)[0] + ";\n")
+                    _printnode(out, ns, _AT_BLOCKING, 1, g[1])
                 else:
                     for t in g[0]:
-                        r += "\t" + ns.get_name(t) + " <= " + _printexpr(ns, t.reset)[0] + ";\n"
-                    r += _printnode(ns, _AT_NONBLOCKING, 1, g[1])
-                r += "end\n"
-    r += "\n"
-    return r
+                        out.append("\t" + ns.get_name(t) + " <= " + _printexpr(ns, t.reset)[0] + ";\n")
+                    _printnode(out, ns, _AT_NONBLOCKING, 1, g[1])
+                out.append("end\n")
+    out.append("\n")
 
 
-def _printsync(f, ns):
-    r = ""
+def _printsync(out, f, ns):
     for k, v in sorted(f.sync.items(), key=itemgetter(0)):
-        r += "always @(posedge " + ns.get_name(f.clock_domains[k].clk) + ") begin\n"
-        r += _printnode(ns, _AT_SIGNAL, 1, v)
-        r += "end\n\n"
-    return r
+        out.append("always @(posedge " + ns.get_name(f.clock_domains[k].clk) + ") begin\n")
+        _printnode(out, ns, _AT_SIGNAL, 1, v)
+        out.append("end\n\n")
 
 
-def _printspecials(overrides, specials, ns, add_data_file, attr_translate):
-    r = ""
+def _printspecials(out, overrides, specials, ns, add_data_file, attr_translate):
     for special in sorted(specials, key=lambda x: x.duid):
         if hasattr(special, "attr"):
             attr = _printattr(special.attr, attr_translate)
             if attr:
-                r += attr + " "
+                out.append(attr + " ")
         pr = call_special_classmethod(overrides, special, "emit_verilog", ns, add_data_file)
         if pr is None:
             raise NotImplementedError("Special " + str(special) + " failed to implement emit_verilog")
-        r += pr
-    return r
+        out.append(pr)
+
+
+class ConvOutput(_ConvOutput):
+    def write(self, main_filename):
+        # Only rewrite the files that changed (keep the timestamps of the others for the tools).
+        write_to_file(main_filename, self.main_source)
+        for filename, content in self.data_files.items():
+            write_to_file(filename, content)
 
 
 class DummyAttrTranslate:
@@ -382,7 +419,8 @@ def convert(f, ios=None, name="top",
   reg_initialization=True,
   dummy_signal=True,
   blocking_assign=False,
-  regular_comb=True):
+  regular_comb=True,
+  cache_dir=None):
     r = ConvOutput()
     if not isinstance(f, _Fragment):
         f = f.get_fragment()
@@ -403,38 +441,73 @@ def convert(f, ios=None, name="top",
                     msg += f"- {f.name}\n"
                 raise Exception(msg)
 
+    for io in sorted(ios, key=lambda x: x.duid):
+        if io.name_override is None:
+            io_name = io.backtrace[-1][0]
+            if io_name:
+                io.name_override = io_name
+
+    # Resolve the ports of the separate Verilog modules.
+    resolve_verilog_modules(f, ios,
+        name                 = name,
+        special_overrides    = special_overrides,
+        attr_translate       = attr_translate,
+        display_run          = display_run,
+        reg_initialization   = reg_initialization,
+        dummy_signal         = dummy_signal,
+        blocking_assign      = blocking_assign,
+        regular_comb         = regular_comb,
+        cache_dir            = cache_dir)
+
+    # Reuse the output of a previous conversion of the same fragment.
+    if cache_dir is not None:
+        cache = VerilogCache(cache_dir)
+        cache_key, cache_signals = cache.fingerprint(f, ios,
+            name                 = name,
+            special_overrides    = special_overrides,
+            attr_translate       = attr_translate,
+            display_run          = display_run,
+            reg_initialization   = reg_initialization,
+            dummy_signal         = dummy_signal,
+            blocking_assign      = blocking_assign,
+            regular_comb         = regular_comb)
+        if cache.load(cache_key, cache_signals, ios, f, r):
+            return r
+
     f = lower_complex_slices(f)
     insert_resets(f)
     f = lower_basics(f)
     f, lowered_specials = lower_specials(special_overrides, f)
     f = lower_basics(f)
 
-    for io in sorted(ios, key=lambda x: x.duid):
-        if io.name_override is None:
-            io_name = io.backtrace[-1][0]
-            if io_name:
-                io.name_override = io_name
-    ns = build_namespace(list_signals(f) \
-        | list_special_ios(f, True, True, True) \
-        | ios, _reserved_keywords)
+    # Signals and comb groups, computed once for the namespace, the header and the comb logic.
+    sigs   = list_signals(f) | list_special_ios(f, True, True, True)
+    groups = group_by_targets(f.comb)
+    ns = build_namespace(sigs | ios, _reserved_keywords)
     ns.clock_domains = f.clock_domains
     r.ns = ns
 
-    src = generated_banner("//")
-    src += _printheader(f, ios, name, ns, attr_translate,
-                        reg_initialization=reg_initialization)
+    # The source is built in a list of strings, joined at the end.
+    src = [generated_banner("//")]
+    _printheader(src, f, ios, name, ns, attr_translate,
+                 reg_initialization=reg_initialization,
+                 sigs=sigs, groups=groups)
     if regular_comb:
-        src += _printcomb_regular(f, ns,
-                      blocking_assign=blocking_assign)
+        _printcomb_regular(src, f, ns,
+                      blocking_assign=blocking_assign,
+                      groups=groups)
     else:
-        src += _printcomb_simulation(f, ns,
+        _printcomb_simulation(src, f, ns,
                       display_run=display_run,
                       dummy_signal=dummy_signal,
                       blocking_assign=blocking_assign)
-    src += _printsync(f, ns)
-    src += _printspecials(special_overrides, f.specials - lowered_specials,
+    _printsync(src, f, ns)
+    _printspecials(src, special_overrides, f.specials - lowered_specials,
         ns, r.add_data_file, attr_translate)
-    src += "endmodule\n"
-    r.set_main_source(src)
+    src.append("endmodule\n")
+    r.set_main_source("".join(src))
+
+    if cache_dir is not None:
+        cache.store(cache_key, cache_signals, ios, r)
 
     return r
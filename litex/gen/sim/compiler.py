@@ -0,0 +1,360 @@
+#
+# This file is part of LiteX.
+#
+# This file is Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import collections
+
+from migen.fhdl.structure import *
+from migen.fhdl.structure import _Operator, _Slice, _ArrayProxy, _Assign
+from migen.fhdl.bitcontainer import value_bits_sign
+from migen.fhdl.specials import _MemoryLocation
+
+# Statement Compiler -------------------------------------------------------------------------------
+
+# The compiler turns a list of FHDL statements into a Python function with exactly the same effect
+# as Evaluator.execute on that list: expressions are evaluated on the committed signal values and
+# assignments are recorded (truncated) in the Evaluator's modifications. The AST is walked only
+# once, at compile time, instead of on every execution. With a CompactEvaluator, signals are
+# accessed directly through their slots.
+#
+# Constructs the compiler does not know about raise NotImplementedError at compile time; the caller
+# is then expected to fall back to the interpreter for the whole statement list.
+
+_binops = {
+    "+":   "+",
+    "-":   "-",
+    "*":   "*",
+    ">>>": ">>",
+    "<<<": "<<",
+    "&":   "&",
+    "^":   "^",
+    "|":   "|",
+    "<":   "<",
+    "<=":  "<=",
+    "==":  "==",
+    "!=":  "!=",
+    ">":   ">",
+    ">=":  ">=",
+}
+
+# Above these limits, intermediate results are spilled to locals to keep the generated source
+# within the nesting limits of the Python parser/compiler.
+_max_expr_depth = 16
+_max_cat_terms  = 32
+
+# Above this number of choices, a Case is dispatched through a dict of functions instead of an
+# if/elif chain.
+_max_case_chain = 8
+
+
+def _truncate_code(code, nbits, signed):
+    mask = 2**nbits - 1
+    if signed and nbits:
+        half = 2**(nbits - 1)
+        return "((({}) + {}) & {}) - {}".format(code, half, mask, half)
+    else:
+        return "({}) & {}".format(code, mask)
+
+
+def _uniform_signals(choices):
+    # True when all choices are plain Signals of the same shape (typical of Arrays/Memories).
+    if not all(isinstance(c, Signal) and not c.variable for c in choices):
+        return False
+    return len(set((c.nbits, c.signed) for c in choices)) == 1
+
+
+class _Function:
+    def __init__(self, name):
+        self.name   = name
+        self.lines  = []
+        self.ntemps = 0
+
+    def temp(self):
+        self.ntemps += 1
+        return "t{}".format(self.ntemps)
+
+
+class StatementCompiler:
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.compact   = evaluator.compact
+        self.globals   = {"_ev": evaluator}
+        if self.compact:
+            self.globals["_values"]      = evaluator.values
+            self.globals["_next_values"] = evaluator.next_values
+        else:
+            self.globals["_sv"] = evaluator.signal_values
+            self.globals["_md"] = evaluator.modifications
+        self.refs      = {}
+        self.nfuncs    = 0
+        self.functions = []
+        self.tail      = []
+        self.depth     = 0
+
+    # Helpers --------------------------------------------------------------------------------------
+
+    def _ref(self, obj):
+        key = id(obj)
+        try:
+            return self.refs[key][1]
+        except KeyError:
+            name = "_o{}".format(len(self.refs))
+            self.refs[key]     = (obj, name) # Keep obj alive so that its id stays unique.
+            self.globals[name] = obj
+            return name
+
+    def _emit(self, fn, indent, line):
+        fn.lines.append("    "*indent + line)
+
+    def _spill(self, fn, indent, code):
+        t = fn.temp()
+        self._emit(fn, indent, "{} = {}".format(t, code))
+        return t
+
+    # Expressions ----------------------------------------------------------------------------------
+
+    def _signal(self, node, postcommit):
+        if self.compact:
+            # Pending values equal committed values for signals not modified since the last commit.
+            return "{}[{}]".format("n" if postcommit else "v", self.evaluator.slot(node))
+        name  = self._ref(node)
+        reset = node.reset.value
+        if postcommit:
+            return "(md[{n}] if {n} in md else get({n}, {r}))".format(n=name, r=reset)
+        else:
+            return "get({}, {})".format(name, reset)
+
+    def _write(self, fn, indent, target, value):
+        # Write value to target, an expression giving a Signal (or slot in compact mode).
+        if self.compact:
+            self._emit(fn, indent, "n[{}] = {}".format(target, value))
+            self._emit(fn, indent, "push({})".format(target))
+        else:
+            self._emit(fn, indent, "md[{}] = {}".format(target, value))
+
+    def _choice(self, fn, indent, choices, index, postcommit):
+        # Read choices[index] (index is a local holding a Python int).
+        if _uniform_signals(choices) and self.compact:
+            slots = self._ref(tuple(self.evaluator.slot(c) for c in choices))
+            return "{}[{}[{}]]".format("n" if postcommit else "v", slots, index)
+        if _uniform_signals(choices) and not postcommit:
+            signals = self._ref(tuple(choices))
+            resets  = self._ref(tuple(c.reset.value for c in choices))
+            return "get({s}[{i}], {r}[{i}])".format(s=signals, r=resets, i=index)
+        t = fn.temp()
+        n = len(choices)
+        self._emit(fn, indent, "if {} < 0:".format(index))
+        self._emit(fn, indent + 1, "{} += {}".format(index, n))
+        for i, choice in enumerate(choices):
+            self._emit(fn, indent, "{} {} == {}:".format("if" if i == 0 else "elif", index, i))
+            code = self.expr(fn, indent + 1, choice, postcommit)
+            self._emit(fn, indent + 1, "{} = {}".format(t, code))
+        self._emit(fn, indent, "else:")
+        self._emit(fn, indent + 1, "raise IndexError(\"list index out of range\")")
+        return t
+
+    def expr(self, fn, indent, node, postcommit=False):
+        self.depth += 1
+        try:
+            code = self._expr(fn, indent, node, postcommit)
+        finally:
+            self.depth -= 1
+        if self.depth and not (self.depth % _max_expr_depth) and not isinstance(node, (Constant, Signal)):
+            code = self._spill(fn, indent, code)
+        return code
+
+    def _expr(self, fn, indent, node, postcommit):
+        if isinstance(node, Constant):
+            return repr(node.value)
+        elif isinstance(node, Signal):
+            return self._signal(node, postcommit)
+        elif isinstance(node, _Operator):
+            operands = [self.expr(fn, indent, o, postcommit) for o in node.operands]
+            if node.op == "-" and len(operands) == 1:
+                return "(-{})".format(*operands)
+            elif node.op == "~":
+                return "(~{})".format(*operands)
+            elif node.op == "m":
+                return "({1} if {0} else {2})".format(*operands)
+            elif node.op in _binops and len(operands) == 2:
+                return "({} {} {})".format(operands[0], _binops[node.op], operands[1])
+            else:
+                raise NotImplementedError(node.op)
+        elif isinstance(node, _Slice):
+            v = self.expr(fn, indent, node.value, postcommit)
+            return "(({} >> {}) & {})".format(v, node.start, 2**(node.stop - node.start) - 1)
+        elif isinstance(node, Cat):
+            terms = []
+            shift = 0
+            for element in node.l:
+                nbits = len(element)
+                # make value always positive
+                term = "({} & {})".format(self.expr(fn, indent, element, postcommit), 2**nbits - 1)
+                if shift:
+                    term = "({} << {})".format(term, shift)
+                terms.append(term)
+                shift += nbits
+                if len(terms) >= _max_cat_terms:
+                    terms = [self._spill(fn, indent, " | ".join(terms))]
+            return "({})".format(" | ".join(terms)) if terms else "0"
+        elif isinstance(node, Replicate):
+            nbits = len(node.v)
+            if not nbits or not node.n:
+                return "0"
+            v = self.expr(fn, indent, node.v, postcommit)
+            k = sum(1 << i*nbits for i in range(node.n))
+            return "(({} & {}) * {})".format(v, 2**nbits - 1, k)
+        elif isinstance(node, _ArrayProxy):
+            key = self.expr(fn, indent, node.key, postcommit)
+            idx = self._spill(fn, indent, "min({}, {})".format(len(node.choices) - 1, key))
+            return self._choice(fn, indent, node.choices, idx, postcommit)
+        elif isinstance(node, _MemoryLocation):
+            array = self.evaluator.replaced_memories[node.memory]
+            idx   = self._spill(fn, indent, self.expr(fn, indent, node.index, postcommit))
+            return self._choice(fn, indent, array, idx, postcommit)
+        elif isinstance(node, ClockSignal):
+            return self._signal(self.evaluator.clock_domains[node.cd].clk, postcommit)
+        elif isinstance(node, ResetSignal):
+            rst = self.evaluator.clock_domains[node.cd].rst
+            if rst is None:
+                if node.allow_reset_less:
+                    return "0"
+                else:
+                    # Let the interpreter raise the error if/when this is actually evaluated.
+                    raise NotImplementedError(node)
+            return self._signal(rst, postcommit)
+        else:
+            raise NotImplementedError(node)
+
+    # Assignments ----------------------------------------------------------------------------------
+
+    def assign(self, fn, indent, node, value):
+        if isinstance(node, Signal):
+            if node.variable:
+                raise NotImplementedError(node)
+            target = self.evaluator.slot(node) if self.compact else self._ref(node)
+            self._write(fn, indent, target, _truncate_code(value, node.nbits, node.signed))
+        elif isinstance(node, Cat):
+            if len(node.l) > 1:
+                value = self._spill(fn, indent, value)
+            shift = 0
+            for element in node.l:
+                nbits = len(element)
+                self.assign(fn, indent, element, "({} >> {}) & {}".format(value, shift, 2**nbits - 1))
+                shift += nbits
+        elif isinstance(node, _Slice):
+            full = self._spill(fn, indent, self.expr(fn, indent, node.value, True))
+            # clear bits assigned to by the slice and set them to the new value
+            self._emit(fn, indent, "{f} = ({f} & {m}) | ((({v}) & {w}) << {s})".format(
+                f = full,
+                m = ~((2**node.stop - 1) - (2**node.start - 1)),
+                v = value,
+                w = 2**(node.stop - node.start) - 1,
+                s = node.start))
+            self.assign(fn, indent, node.value, full)
+        elif isinstance(node, (_ArrayProxy, _MemoryLocation)):
+            if isinstance(node, _ArrayProxy):
+                choices = node.choices
+                key     = self.expr(fn, indent, node.key)
+                idx     = self._spill(fn, indent, "min({}, {})".format(len(choices) - 1, key))
+            else:
+                choices = self.evaluator.replaced_memories[node.memory]
+                idx     = self._spill(fn, indent, self.expr(fn, indent, node.index))
+            if _uniform_signals(choices):
+                if self.compact:
+                    targets = self._ref(tuple(self.evaluator.slot(c) for c in choices))
+                else:
+                    targets = self._ref(tuple(choices))
+                target = self._spill(fn, indent, "{}[{}]".format(targets, idx))
+                self._write(fn, indent, target, _truncate_code(value, choices[0].nbits, choices[0].signed))
+            else:
+                value = self._spill(fn, indent, value)
+                self._emit(fn, indent, "if {} < 0:".format(idx))
+                self._emit(fn, indent + 1, "{} += {}".format(idx, len(choices)))
+                for i, choice in enumerate(choices):
+                    self._emit(fn, indent, "{} {} == {}:".format("if" if i == 0 else "elif", idx, i))
+                    self.assign(fn, indent + 1, choice, value)
+                self._emit(fn, indent, "else:")
+                self._emit(fn, indent + 1, "raise IndexError(\"list index out of range\")")
+        else:
+            raise NotImplementedError(node)
+
+    # Statements -----------------------------------------------------------------------------------
+
+    def _block(self, fn, indent, statements):
+        n = len(fn.lines)
+        self.statements(fn, indent, statements)
+        if len(fn.lines) == n:
+            self._emit(fn, indent, "pass")
+
+    def statements(self, fn, indent, statements):
+        for s in statements:
+            if isinstance(s, _Assign):
+                self.assign(fn, indent, s.l, self.expr(fn, indent, s.r))
+            elif isinstance(s, If):
+                cond = self.expr(fn, indent, s.cond)
+                self._emit(fn, indent, "if {} & {}:".format(cond, 2**len(s.cond) - 1))
+                self._block(fn, indent + 1, s.t)
+                if s.f:
+                    self._emit(fn, indent, "else:")
+                    self._block(fn, indent + 1, s.f)
+            elif isinstance(s, Case):
+                nbits, signed = value_bits_sign(s.test)
+                test  = self._spill(fn, indent, _truncate_code(self.expr(fn, indent, s.test), nbits, signed))
+                cases = collections.OrderedDict()
+                for k, v in s.cases.items():
+                    if isinstance(k, Constant) and k.value not in cases:
+                        cases[k.value] = v
+                default = s.cases.get("default", None)
+                if len(cases) > _max_case_chain:
+                    dispatch = "_d{}".format(self.nfuncs)
+                    fallback = self.function(default if default is not None else [])
+                    self.tail.append("{} = {{{}}}".format(dispatch,
+                        ", ".join("{}: {}".format(k, self.function(v)) for k, v in cases.items())))
+                    self._emit(fn, indent, "{}.get({}, {})()".format(dispatch, test, fallback))
+                else:
+                    keyword = "if"
+                    for k, v in cases.items():
+                        self._emit(fn, indent, "{} {} == {}:".format(keyword, test, k))
+                        self._block(fn, indent + 1, v)
+                        keyword = "elif"
+                    if default is not None:
+                        if keyword == "if":
+                            self.statements(fn, indent, default)
+                        else:
+                            self._emit(fn, indent, "else:")
+                            self._block(fn, indent + 1, default)
+            elif isinstance(s, collections.abc.Iterable):
+                self.statements(fn, indent, s)
+            elif isinstance(s, Display):
+                self._emit(fn, indent, "_ev.execute([{}])".format(self._ref(s)))
+            else:
+                raise NotImplementedError(s)
+
+    # Functions ------------------------------------------------------------------------------------
+
+    def function(self, statements):
+        fn = _Function("_f{}".format(self.nfuncs))
+        self.nfuncs += 1
+        self._emit(fn, 0, "def {}():".format(fn.name))
+        if self.compact:
+            self._emit(fn, 1, "v    = _values")
+            self._emit(fn, 1, "n    = _next_values")
+            self._emit(fn, 1, "push = _ev.dirty.append")
+        else:
+            self._emit(fn, 1, "get = _sv.get")
+            self._emit(fn, 1, "md  = _md")
+        self._block(fn, 1, statements)
+        self.functions.append(fn)
+        return fn.name
+
+    def compile(self, statements):
+        self.functions = []
+        self.tail      = []
+        name   = self.function(statements)
+        source = "\n\n".join("\n".join(fn.lines) for fn in self.functions)
+        source += "\n\n" + "\n".join(self.tail) + "\n"
+        exec(compile(source, "<litex.gen.sim:{}>".format(name), "exec"), self.globals)
+        return self.globals[name]
@@ -9,24 +9,30 @@
 # This file is Copyright (c) 2018 Robin Ole Heinemann <robin.ole.heinemann@t-online.de>
 # SPDX-License-Identifier: BSD-2-Clause
 
+import os
 import operator
 import collections
 import inspect
-from functools import wraps
+import heapq
+import multiprocessing
+from functools import wraps, partial
 
 from migen.fhdl.structure import *
 from migen.fhdl.structure import (_Value, _Statement,
                                   _Operator, _Slice, _ArrayProxy,
                                   _Assign, _Fragment)
 from migen.fhdl.bitcontainer import value_bits_sign
-from migen.fhdl.tools import (list_targets, list_signals,
+from migen.fhdl.tools import (list_targets, list_signals, group_by_targets,
                               insert_resets, lower_specials)
+from migen.fhdl.visit import NodeVisitor
 from migen.fhdl.simplify import MemoryToArray
 from migen.fhdl.specials import _MemoryLocation
 from migen.fhdl.module import Module
 from migen.genlib.resetsync import AsyncResetSynchronizer
 
 from litex.gen.sim.vcd import VCDWriter, DummyVCDWriter
+from litex.gen.sim.lxw import LXWWriter
+from litex.gen.sim.compiler import StatementCompiler
 
 
 class ClockState:
@@ -70,6 +76,14 @@ class TimeManager:
                 cs.time_before_trans += cs.half_period
         return dt, rising, falling
 
+    def snapshot(self):
+        return [(cs.high, cs.time_before_trans) for cs in self.clocks.values()]
+
+    def restore(self, snapshot):
+        for cs, (high, time_before_trans) in zip(self.clocks.values(), snapshot):
+            cs.high              = high
+            cs.time_before_trans = time_before_trans
+
 
 str2op = {
     "~": operator.invert,
@@ -101,11 +115,32 @@ def _truncate(value, nbits, signed):
 
 
 class Evaluator:
+    compact = False
+
     def __init__(self, clock_domains, replaced_memories):
         self.clock_domains = clock_domains
         self.replaced_memories = replaced_memories
         self.signal_values = dict()
         self.modifications = dict()
+        self.compiler      = None
+        self.compiled      = dict()
+
+    def compile(self, statements):
+        # Return a function with the same effect as execute(statements), compiled once and cached.
+        # Statements that can not be compiled are executed by the interpreter.
+        try:
+            return self.compiled[id(statements)][1]
+        except KeyError:
+            pass
+        if self.compiler is None:
+            self.compiler = StatementCompiler(self)
+        try:
+            function = self.compiler.compile(statements)
+        except (NotImplementedError, SyntaxError, RecursionError, MemoryError):
+            function = lambda: self.execute(statements)
+        # Keep a reference to statements so that its id stays unique.
+        self.compiled[id(statements)] = (statements, function)
+        return function
 
     def commit(self):
         r = set()
@@ -116,6 +151,24 @@ class Evaluator:
         self.modifications.clear()
         return r
 
+    # State is restored in place since compiled functions hold references to the containers.
+    def snapshot(self):
+        return dict(self.signal_values), dict(self.modifications)
+
+    def restore(self, snapshot):
+        signal_values, modifications = snapshot
+        self.signal_values.clear()
+        self.signal_values.update(signal_values)
+        self.modifications.clear()
+        self.modifications.update(modifications)
+
+    # Signals are identified by themselves in commit() results.
+    def key(self, signal):
+        return signal
+
+    def changes(self, keys):
+        return ((signal, self.signal_values[signal]) for signal in keys)
+
     def eval(self, node, postcommit=False):
         if isinstance(node, Constant):
             return node.value
@@ -231,15 +284,191 @@ class Evaluator:
                 args = []
                 for arg in s.args:
                     assert isinstance(arg, _Value)
-                    try:
-                        args.append(self.signal_values[arg])
-                    except: # not yet evaluated
-                        args.append(arg.reset.value)
+                    args.append(self.eval(arg))
                 print(s.s %(*args,))
             else:
                 raise NotImplementedError
 
 
+class CompactEvaluator(Evaluator):
+    # Signal values are stored in preallocated lists, at the slot given to each signal at
+    # elaboration time (signals first seen later get a slot on demand). Pending values are stored
+    # in a second list, equal to the first one except for the slots recorded in the dirty list:
+    # commit() only walks the dirty list, swaps it with an empty one and returns the modified slots.
+    compact = True
+
+    def __init__(self, clock_domains, replaced_memories, signals=[]):
+        Evaluator.__init__(self, clock_domains, replaced_memories)
+        self.slots       = dict()
+        self.signals     = []
+        self.values      = []
+        self.next_values = []
+        self.dirty       = []
+        self.free_dirty  = []
+        for signal in signals:
+            self.slot(signal)
+
+    def slot(self, signal):
+        try:
+            return self.slots[signal]
+        except KeyError:
+            slot = len(self.signals)
+            self.slots[signal] = slot
+            self.signals.append(signal)
+            self.values.append(signal.reset.value)
+            self.next_values.append(signal.reset.value)
+            return slot
+
+    key = slot
+
+    def snapshot(self):
+        return list(self.values), list(self.next_values), list(self.dirty)
+
+    def restore(self, snapshot):
+        values, next_values, dirty = snapshot
+        # Signals given a slot after the snapshot return to their reset value.
+        resets = [signal.reset.value for signal in self.signals[len(values):]]
+        self.values[:]      = values + resets
+        self.next_values[:] = next_values + resets
+        self.dirty[:]       = dirty
+
+    def changes(self, keys):
+        return ((self.signals[slot], self.values[slot]) for slot in keys)
+
+    def commit(self):
+        values      = self.values
+        next_values = self.next_values
+        dirty       = self.dirty
+        self.dirty, self.free_dirty = self.free_dirty, dirty
+        r = []
+        for slot in dirty:
+            value = next_values[slot]
+            if values[slot] != value:
+                values[slot] = value
+                r.append(slot)
+        dirty.clear()
+        return r
+
+    def eval(self, node, postcommit=False):
+        if isinstance(node, Signal):
+            if postcommit:
+                return self.next_values[self.slot(node)]
+            else:
+                return self.values[self.slot(node)]
+        return Evaluator.eval(self, node, postcommit)
+
+    def assign(self, node, value):
+        if isinstance(node, Signal):
+            assert not node.variable
+            slot = self.slot(node)
+            self.next_values[slot] = _truncate(value, node.nbits, node.signed)
+            self.dirty.append(slot)
+        else:
+            Evaluator.assign(self, node, value)
+
+
+class _InputLister(NodeVisitor):
+    # Lists the signals read by statements (their sensitivity list). Unlike migen's list_inputs,
+    # keys of assigned Arrays are inputs and Clock/Reset signals are resolved. Statements using
+    # constructs that can not be analyzed set `unknown`.
+    def __init__(self, clock_domains):
+        self.clock_domains  = clock_domains
+        self.output_list    = set()
+        self.target_context = False
+        self.unknown        = False
+
+    def visit_Signal(self, node):
+        if not self.target_context:
+            self.output_list.add(node)
+
+    def visit_ClockSignal(self, node):
+        try:
+            self.visit(self.clock_domains[node.cd].clk)
+        except KeyError:
+            self.unknown = True
+
+    def visit_ResetSignal(self, node):
+        try:
+            rst = self.clock_domains[node.cd].rst
+        except KeyError:
+            self.unknown = True
+        else:
+            if rst is not None:
+                self.visit(rst)
+
+    def visit_Assign(self, node):
+        self.visit(node.r)
+        self.target_context = True
+        self.visit(node.l)
+        self.target_context = False
+
+    def visit_ArrayProxy(self, node):
+        for choice in node.choices:
+            self.visit(choice)
+        target_context, self.target_context = self.target_context, False
+        self.visit(node.key)
+        self.target_context = target_context
+
+    def visit_unknown(self, node):
+        self.unknown = True
+
+
+class CombGraph:
+    # Splits comb statements into groups driving disjoint sets of targets and orders them
+    # topologically (groups in combinatorial loops are kept in their original order).
+    def __init__(self, statements, clock_domains, key=lambda signal: signal):
+        groups = group_by_targets(statements)
+        inputs = []
+        always = []
+        for n, (targets, group_statements) in enumerate(groups):
+            lister = _InputLister(clock_domains)
+            lister.visit(group_statements)
+            inputs.append(lister.output_list)
+            if lister.unknown:
+                always.append(n)
+
+        drivers = dict()
+        for n, (targets, group_statements) in enumerate(groups):
+            for signal in targets:
+                drivers[signal] = n
+
+        # Kahn's algorithm, smallest original index first for a deterministic order.
+        successors = [set() for group in groups]
+        indegree   = [0]*len(groups)
+        for n, group_inputs in enumerate(inputs):
+            for signal in group_inputs:
+                driver = drivers.get(signal, None)
+                if driver is not None and driver != n and n not in successors[driver]:
+                    successors[driver].add(n)
+                    indegree[n] += 1
+        order = []
+        ready = [n for n in range(len(groups)) if not indegree[n]]
+        heapq.heapify(ready)
+        while ready:
+            n = heapq.heappop(ready)
+            order.append(n)
+            for m in successors[n]:
+                indegree[m] -= 1
+                if not indegree[m]:
+                    heapq.heappush(ready, m)
+        ordered = set(order)
+        order  += [n for n in range(len(groups)) if n not in ordered]
+        rank    = {n: r for r, n in enumerate(order)}
+
+        # Statements of each group, by rank.
+        self.statements = [groups[n][1] for n in order]
+        # Signal (key) -> ranks of the groups reading it.
+        self.readers = collections.defaultdict(list)
+        for n, group_inputs in enumerate(inputs):
+            for signal in group_inputs:
+                self.readers[key(signal)].append(rank[n])
+        self.readers = {k: tuple(sorted(v)) for k, v in self.readers.items()}
+        # Signal (key) -> rank of the group driving it.
+        self.drivers = {key(k): rank[v] for k, v in drivers.items()}
+        # Ranks of the groups with an unknown sensitivity list, run on any modification.
+        self.always  = tuple(sorted(rank[n] for n in always))
+
+
 class DummyAsyncResetSynchronizerImpl(Module):
     def __init__(self, cd, async_reset):
         # TODO: asynchronous set
@@ -257,7 +486,7 @@ class DummyAsyncResetSynchronizer:
 # TODO: instances via Iverilog/VPI
 class Simulator:
     def __init__(self, fragment_or_module, generators, clocks={"sys": 10}, vcd_name=None,
-                 special_overrides={}):
+                 special_overrides={}, compiled=False, compact=False, vcd_signals=None, vcd_depth=None):
         if isinstance(fragment_or_module, _Fragment):
             self.fragment = fragment_or_module
         else:
@@ -272,16 +501,10 @@ class Simulator:
         if self.fragment.specials:
             raise ValueError("Could not lower all specials", self.fragment.specials)
 
-        if not isinstance(generators, dict):
-            generators = {"sys": generators}
         self.generators = dict()
         self.passive_generators = set()
-        for k, v in generators.items():
-            if (isinstance(v, collections.abc.Iterable)
-                    and not inspect.isgenerator(v)):
-                self.generators[k] = list(v)
-            else:
-                self.generators[k] = [v]
+        self.generator_results = dict()
+        self.add_generators(generators)
 
         clocks = collections.OrderedDict(sorted(clocks.items(),
                                                 key=operator.itemgetter(0)))
@@ -296,24 +519,98 @@ class Simulator:
         # comb signals return to their reset value if nothing assigns them
         self.fragment.comb[0:0] = [s.eq(s.reset)
                                    for s in list_targets(self.fragment.comb)]
-        self.evaluator = Evaluator(self.fragment.clock_domains,
-                                   mta.replacements)
+
+        signals = list_signals(self.fragment)
+        for cd in self.fragment.clock_domains:
+            signals.add(cd.clk)
+            if cd.rst is not None:
+                signals.add(cd.rst)
+        for memory_array in mta.replacements.values():
+            signals |= set(memory_array)
+        signals = sorted(signals, key=lambda x: x.duid)
+
+        if compact:
+            self.evaluator = CompactEvaluator(self.fragment.clock_domains,
+                                              mta.replacements, signals)
+        else:
+            self.evaluator = Evaluator(self.fragment.clock_domains,
+                                       mta.replacements)
+        if compiled:
+            execute = self.evaluator.compile
+        else:
+            execute = lambda statements: partial(self.evaluator.execute, statements)
+        self.comb_graph     = CombGraph(self.fragment.comb, self.fragment.clock_domains,
+                                        self.evaluator.key)
+        self.comb_functions = [execute(statements) for statements in self.comb_graph.statements]
+        self.sync_functions = {cd: execute(statements)
+                               for cd, statements in self.fragment.sync.items()}
 
         if vcd_name is None:
             self.vcd = DummyVCDWriter()
         else:
-            self.vcd = VCDWriter(vcd_name)
-
-            signals = list_signals(self.fragment)
-            for cd in self.fragment.clock_domains:
-                signals.add(cd.clk)
-                if cd.rst is not None:
-                    signals.add(cd.rst)
-            for memory_array in mta.replacements.values():
-                signals |= set(memory_array)
+            if os.path.splitext(vcd_name)[1] == ".lxw":
+                writer = LXWWriter
+            else:
+                writer = VCDWriter
+            top = None if isinstance(fragment_or_module, _Fragment) else fragment_or_module
+            self.vcd = writer(vcd_name, signals=vcd_signals, depth=vcd_depth, top=top)
             self.vcd.init(signals)
-            for signal in sorted(signals, key=lambda x: x.duid):
-                self.vcd.set(signal, signal.reset.value)
+
+    def add_generators(self, generators):
+        # Returns the generators added, in order.
+        if not isinstance(generators, dict):
+            generators = {"sys": generators}
+        added = []
+        for k, v in generators.items():
+            if (isinstance(v, collections.abc.Iterable)
+                    and not inspect.isgenerator(v)):
+                v = list(v)
+            else:
+                v = [v]
+            self.generators.setdefault(k, []).extend(v)
+            added += v
+        return added
+
+    def snapshot(self):
+        # Capture the state of the design and of the clocks, generators are not included.
+        return self.evaluator.snapshot(), self.time.snapshot()
+
+    def restore(self, snapshot):
+        # Return to a snapshot, without any generator.
+        evaluator_snapshot, time_snapshot = snapshot
+        self.evaluator.restore(evaluator_snapshot)
+        self.time.restore(time_snapshot)
+        self.generators.clear()
+        self.passive_generators.clear()
+        self.generator_results.clear()
+
+    def _run_job(self, snapshot, job):
+        self.restore(snapshot)
+        generators = self.add_generators(job())
+        self.run()
+        return [self.generator_results.get(generator, None) for generator in generators]
+
+    def fork(self, jobs, processes=None):
+        # Run jobs from the current state of the simulation. Each job is a callable returning
+        # generators (as accepted by run_simulation) and starts from a snapshot of the current
+        # state, so elaboration and reset (typically done by running generators before the fork)
+        # are only done once; jobs start on the clock cycle following the end of the simulation.
+        # Jobs are run in a pool of forked processes (sequentially when fork is not available or
+        # with processes=1), without waveforms. Returns, for each job, the list of the values
+        # returned by its generators.
+        global _fork_simulator
+        snapshot = self.snapshot()
+        vcd, self.vcd = self.vcd, DummyVCDWriter()
+        try:
+            if processes == 1 or "fork" not in multiprocessing.get_all_start_methods():
+                return [self._run_job(snapshot, job) for job in jobs]
+            _fork_simulator = (self, snapshot, jobs)
+            with multiprocessing.get_context("fork").Pool(processes) as pool:
+                return pool.map(_run_fork_job, range(len(jobs)))
+        finally:
+            _fork_simulator = None
+            self.restore(snapshot)
+            self.vcd = vcd
 
     def __enter__(self):
         return self
@@ -325,16 +622,42 @@ class Simulator:
         self.vcd.close()
 
     def _commit_and_comb_propagate(self):
-        # TODO: optimize
+        # Event-driven propagation: only the comb groups reading a modified signal are executed
+        # again, one at a time in topological order, until nothing changes. Modifications done by
+        # sync statements or generators also re-execute the groups driving the modified signals.
+        readers      = self.comb_graph.readers
+        drivers      = self.comb_graph.drivers
+        always       = self.comb_graph.always
         all_modified = set()
-        modified = self.evaluator.commit()
-        all_modified |= modified
-        while modified:
-            self.evaluator.execute(self.fragment.comb)
+        pending      = []
+        scheduled    = set()
+        modified     = self.evaluator.commit()
+        while True:
+            all_modified.update(modified)
+            for signal in modified:
+                for rank in readers.get(signal, ()):
+                    if rank not in scheduled:
+                        scheduled.add(rank)
+                        heapq.heappush(pending, rank)
+                if drivers is not None:
+                    rank = drivers.get(signal, None)
+                    if rank is not None and rank not in scheduled:
+                        scheduled.add(rank)
+                        heapq.heappush(pending, rank)
+            if modified:
+                for rank in always:
+                    if rank not in scheduled:
+                        scheduled.add(rank)
+                        heapq.heappush(pending, rank)
+            if not pending:
+                break
+            rank = heapq.heappop(pending)
+            scheduled.remove(rank)
+            self.comb_functions[rank]()
             modified = self.evaluator.commit()
-            all_modified |= modified
-        for signal in all_modified:
-            self.vcd.set(signal, self.evaluator.signal_values[signal])
+            drivers  = None
+        for signal, value in self.evaluator.changes(all_modified):
+            self.vcd.set(signal, value)
 
     def _evalexec_nested_lists(self, x):
         if isinstance(x, list):
@@ -366,7 +689,8 @@ class Simulator:
                                              .format(request))
                     else:
                         reply = self._evalexec_nested_lists(request)
-                except StopIteration:
+                except StopIteration as e:
+                    self.generator_results[generator] = e.value
                     exhausted.append(generator)
                     break
         for generator in exhausted:
@@ -379,7 +703,8 @@ class Simulator:
         return False
 
     def run(self):
-        self.evaluator.execute(self.fragment.comb)
+        for comb_function in self.comb_functions:
+            comb_function()
         self._commit_and_comb_propagate()
 
         while True:
@@ -387,8 +712,8 @@ class Simulator:
             self.vcd.delay(dt)
             for cd in rising:
                 self.evaluator.assign(self.fragment.clock_domains[cd].clk, 1)
-                if cd in self.fragment.sync:
-                    self.evaluator.execute(self.fragment.sync[cd])
+                if cd in self.sync_functions:
+                    self.sync_functions[cd]()
                 if cd in self.generators:
                     self._process_generators(cd)
             for cd in falling:
@@ -399,6 +724,14 @@ class Simulator:
                 break
 
 
+# Simulator, snapshot and jobs of the current fork, inherited by the processes of the pool.
+_fork_simulator = None
+
+def _run_fork_job(n):
+    simulator, snapshot, jobs = _fork_simulator
+    return simulator._run_job(snapshot, jobs[n])
+
+
 def run_simulation(*args, **kwargs):
     with Simulator(*args, **kwargs) as s:
         s.run()
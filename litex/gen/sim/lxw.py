@@ -0,0 +1,278 @@
+#
+# This file is part of LiteX.
+#
+# This file is Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import json
+import zlib
+import struct
+import argparse
+
+from litex.gen.sim.vcd import WaveWriter, vcd_codes, _value_formatter
+
+# LiteX Waveform (LXW) format ----------------------------------------------------------------------
+#
+# A compressed, chunked and seekable waveform format. All integers are little-endian.
+#
+# File     : magic, blocks..., footer.
+# Magic    : b"LXWAVE\x00\x01" (format version 1).
+# Block    : header "<cQQII" (type, t_start, t_end, compressed size, raw size), followed by the
+#            zlib-compressed payload.
+#   - "S"  : signal declarations, JSON list of {"id", "name", "width", "reset"}. Emitted before the
+#            first chunk and each time signals are added during the simulation.
+#   - "D"  : data chunk covering [t_start, t_end]. The payload is a sequence of records "<QI"
+#            (time, number of changes) followed by the changes: "<I" (signal id) and the value on
+#            ceil(width/8) bytes (unsigned). The first record of a chunk is a snapshot of all the
+#            signals declared so far, so that a chunk can be decoded without the previous ones.
+#   - "I"  : index, JSON {"signals": [offsets of S blocks], "chunks": [[t_start, t_end, offset]]}.
+# Footer   : "<Q8s" (offset of the I block, b"LXWINDEX").
+#
+# Files without footer (simulation interrupted) can still be read by scanning the blocks.
+
+_magic        = b"LXWAVE\x00\x01"
+_block_header = struct.Struct("<cQQII")
+_record       = struct.Struct("<QI")
+_change       = struct.Struct("<I")
+_footer       = struct.Struct("<Q8s")
+_footer_magic = b"LXWINDEX"
+
+# LXW Writer ---------------------------------------------------------------------------------------
+
+class LXWWriter(WaveWriter):
+    """LiteX Waveform (LXW) writer
+
+    Drop-in replacement for VCDWriter, selected by Simulator for vcd_name ending in ".lxw".
+
+    Parameters
+    ----------
+    chunk_size : int
+        Size of the uncompressed data chunks (in bytes).
+    level : int
+        zlib compression level.
+    """
+    def __init__(self, filename, signals=None, depth=None, top=None, chunk_size=2**20, level=6):
+        WaveWriter.__init__(self, filename, signals, depth, top)
+        self.chunk_size  = chunk_size
+        self.level       = level
+        self.out_file    = open(filename, "wb")
+        self.out_file.write(_magic)
+        self.nbytes      = dict()
+        self.chunk       = bytearray()
+        self.chunk_start = 0
+        self.chunk_end   = 0
+        self.index       = {"signals": [], "chunks": []}
+
+    def _write_block(self, type, payload, t_start=0, t_end=0):
+        offset = self.out_file.tell()
+        data   = zlib.compress(payload, self.level)
+        self.out_file.write(_block_header.pack(type, t_start, t_end, len(data), len(payload)))
+        self.out_file.write(data)
+        return offset
+
+    def _flush_chunk(self):
+        if self.chunk:
+            offset = self._write_block(b"D", bytes(self.chunk), self.chunk_start, self.chunk_end)
+            self.index["chunks"].append([self.chunk_start, self.chunk_end, offset])
+            self.chunk = bytearray()
+
+    def _encode(self, t, changes):
+        nbytes = self.nbytes
+        ids    = self.ids
+        chunk  = self.chunk
+        chunk += _record.pack(t, len(changes))
+        for signal, value in changes:
+            n = nbytes[signal]
+            chunk += _change.pack(ids[signal])
+            chunk += (value & (2**(8*n) - 1)).to_bytes(n, "little")
+
+    def _declare(self, signals):
+        if not signals:
+            return
+        # Start a new chunk so that its snapshot includes the new signals.
+        self._flush_chunk()
+        ns = self._namespace()
+        declarations = []
+        for signal in signals:
+            self.nbytes[signal] = (len(signal) + 7)//8
+            declarations.append({
+                "id"    : self.ids[signal],
+                "name"  : ns.get_name(signal),
+                "width" : len(signal),
+                "reset" : signal.reset.value})
+        offset = self._write_block(b"S", json.dumps(declarations).encode())
+        self.index["signals"].append(offset)
+
+    def _write_changes(self, t, changes):
+        if not self.chunk:
+            self.chunk_start = t
+            self._encode(t, list(self.signal_values.items()))
+        else:
+            self._encode(t, changes)
+        self.chunk_end = t
+        if len(self.chunk) >= self.chunk_size:
+            self._flush_chunk()
+
+    def _close(self):
+        self._flush_chunk()
+        offset = self._write_block(b"I", json.dumps(self.index).encode(), 0, self.t)
+        self.out_file.write(_footer.pack(offset, _footer_magic))
+        self.out_file.close()
+
+# LXW Reader ---------------------------------------------------------------------------------------
+
+class LXWReader:
+    """LiteX Waveform (LXW) reader
+
+    Attributes
+    ----------
+    signals : list of dict
+        Signal declarations ("id", "name", "width", "reset"), by id.
+    chunks : list of (t_start, t_end, offset)
+        Data chunks, by time.
+    t_end : int
+        End time of the simulation.
+    """
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        if self.file.read(len(_magic)) != _magic:
+            raise ValueError("{} is not a LXW file".format(filename))
+        index = self._read_index()
+        self.signals = []
+        for offset in index["signals"]:
+            self.signals += json.loads(self._read_block(offset)[3])
+        self.signals.sort(key=lambda s: s["id"])
+        self.chunks = [tuple(c) for c in index["chunks"]]
+        self.t_end  = index["t_end"]
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _read_block(self, offset):
+        self.file.seek(offset)
+        header = self.file.read(_block_header.size)
+        if len(header) < _block_header.size:
+            raise EOFError
+        type, t_start, t_end, csize, rsize = _block_header.unpack(header)
+        data = self.file.read(csize)
+        if len(data) < csize:
+            raise EOFError
+        return type, t_start, t_end, zlib.decompress(data)
+
+    def _read_index(self):
+        self.file.seek(0, os.SEEK_END)
+        size = self.file.tell()
+        if size >= len(_magic) + _footer.size:
+            self.file.seek(size - _footer.size)
+            offset, magic = _footer.unpack(self.file.read(_footer.size))
+            if magic == _footer_magic:
+                type, t_start, t_end, payload = self._read_block(offset)
+                index = json.loads(payload)
+                index["t_end"] = t_end
+                return index
+        # No footer: rebuild the index by scanning the blocks.
+        index  = {"signals": [], "chunks": [], "t_end": 0}
+        offset = len(_magic)
+        while True:
+            try:
+                type, t_start, t_end, payload = self._read_block(offset)
+            except (EOFError, zlib.error):
+                break
+            if type == b"S":
+                index["signals"].append(offset)
+            elif type == b"D":
+                index["chunks"].append([t_start, t_end, offset])
+                index["t_end"] = t_end
+            offset = self.file.tell()
+        return index
+
+    def _decode(self, payload):
+        nbytes = [(s["width"] + 7)//8 for s in self.signals]
+        widths = [s["width"] for s in self.signals]
+        offset = 0
+        while offset < len(payload):
+            t, n = _record.unpack_from(payload, offset)
+            offset += _record.size
+            changes = []
+            for i in range(n):
+                id, = _change.unpack_from(payload, offset)
+                offset += _change.size
+                value = int.from_bytes(payload[offset:offset + nbytes[id]], "little")
+                offset += nbytes[id]
+                changes.append((id, value & (2**widths[id] - 1)))
+            yield t, changes
+
+    def changes(self, t_start=0, t_end=None):
+        """Iterate on (time, [(signal id, value)]) from t_start to t_end (included).
+
+        The first record is a snapshot of the signal values at (or before) t_start. Values of
+        signed signals are returned in two's complement.
+        """
+        first = 0
+        for n, (chunk_start, chunk_end, offset) in enumerate(self.chunks):
+            if chunk_start <= t_start:
+                first = n
+        for chunk_start, chunk_end, offset in self.chunks[first:]:
+            if t_end is not None and chunk_start > t_end:
+                break
+            type, _, _, payload = self._read_block(offset)
+            for t, changes in self._decode(payload):
+                if t_end is not None and t > t_end:
+                    return
+                yield t, changes
+
+    def values_at(self, t):
+        """Return the values of all the signals at time t, by signal id."""
+        values = [s["reset"] & (2**s["width"] - 1) for s in self.signals]
+        for _t, changes in self.changes(t, t):
+            for id, value in changes:
+                values[id] = value
+        return values
+
+# LXW to VCD ---------------------------------------------------------------------------------------
+
+def lxw2vcd(lxw_filename, vcd_filename):
+    with LXWReader(lxw_filename) as reader, open(vcd_filename, "w") as vcd:
+        codes      = [code for code, signal in zip(vcd_codes(), reader.signals)]
+        formatters = [_value_formatter(s["width"], code) for s, code in zip(reader.signals, codes)]
+        values     = [s["reset"] & (2**s["width"] - 1) for s in reader.signals]
+        header     = []
+        for signal, code in zip(reader.signals, codes):
+            header.append("$var wire {} {} {} $end\n".format(signal["width"], code, signal["name"]))
+        header.append("$dumpvars\n")
+        for formatter, value in zip(formatters, values):
+            header.append(formatter(value))
+        header.append("$end\n")
+        vcd.write("".join(header))
+        t_written = None
+        for t, changes in reader.changes():
+            lines = []
+            for id, value in changes:
+                if values[id] != value:
+                    values[id] = value
+                    lines.append(formatters[id](value))
+            if lines:
+                if t_written != t:
+                    t_written = t
+                    lines.insert(0, "#{}\n".format(t))
+                vcd.write("".join(lines))
+        if t_written != reader.t_end:
+            vcd.write("#{}\n".format(reader.t_end))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX Waveform (LXW) to VCD converter.")
+    parser.add_argument("lxw", help="Input LXW file.")
+    parser.add_argument("vcd", help="Output VCD file.")
+    args = parser.parse_args()
+    lxw2vcd(args.lxw, args.vcd)
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,14 @@
 from itertools import count
 import tempfile
 import os
+import fnmatch
 from collections import OrderedDict
 import shutil
 
+from migen.fhdl.structure import Signal
+from migen.fhdl.module import Module
 from migen.fhdl.namer import build_namespace
+from migen.fhdl import tracer
 
 
 def vcd_codes():
@@ -26,85 +30,198 @@ def vcd_codes():
         yield code
 
 
-class VCDWriter:
-    def __init__(self, filename):
-        self.filename = filename
-        self.out_file = None
-        self.buffer_file = tempfile.TemporaryFile(
-            dir=os.path.dirname(filename), mode="w+")
-        self.initialized = False
-        self.codegen = vcd_codes()
-        self.codes = OrderedDict()
-        self.signal_values = dict()
-        self.t = 0
-
-    def _write_value(self, signal, value):
-        l = len(signal)
+def _value_formatter(nbits, code):
+    # Return a function formatting a value change of a nbits signal.
+    if nbits > 1:
+        fmt = ("b{:0" + str(nbits) + "b} " + code + "\n").format
+    else:
+        fmt = ("{}" + code + "\n").format
+    offset = 2**nbits
+    def formatter(value):
         if value < 0:
-            value += 2**l
-        if l > 1:
-            fmtstr = "b{:0" + str(l) + "b} {}\n"
-        else:
-            fmtstr = "{}{}\n"
-        try:
-            code = self.codes[signal]
-        except KeyError:
-            code = next(self.codegen)
-            self.codes[signal] = code
-            self.init(self.codes.keys())
-
-        return fmtstr.format(value, code)
-
-    def _write(self, s):
-        self.out_file.write(s)
-        self.buffer_file.write(s)
+            value += offset
+        return fmt(value)
+    return formatter
+
+
+def _module_entries():
+    # Backtrace entries of the Modules created so far.
+    return {(tracer.remove_underscore(classname), n): obj
+        for classname, objs in tracer.classname_to_objs.items()
+        for n, obj in enumerate(objs) if isinstance(obj, Module)}
+
+
+def _module_depth(signal, modules, top=None):
+    # Depth below top of the Module that created signal, from the Modules of its backtrace (the
+    # frames of the caller of top and of non-Module objects are not part of the hierarchy).
+    # Signals created outside of top (ex: by the simulator or the generators) are at depth 0.
+    path = []
+    for entry in signal.backtrace[:-1]:
+        obj = modules.get(entry)
+        if obj is not None and (not path or path[-1] is not obj):
+            path.append(obj)
+    if top is None:
+        return max(len(path) - 1, 0)
+    for n, obj in enumerate(path):
+        if obj is top:
+            return len(path) - 1 - n
+    return 0
+
+
+class WaveWriter:
+    """Base waveform writer
+
+    Handles the selection of the signals to dump, the naming of the signals and the buffering of
+    the value changes: changes are collected per timestamp and only the last value of a signal at a
+    given timestamp is kept. Subclasses implement the output format through `_declare` (new signals
+    to dump), `_write_changes` (changes at a timestamp) and `_close`.
+
+    Parameters
+    ----------
+    filename : str
+        Output file.
+    signals : iterable of Signal or str, optional
+        Allow-list of signals to dump, either Signals or patterns (fnmatch) on their names.
+        All signals are dumped if None.
+    depth : int, optional
+        Only dump signals at most `depth` levels of hierarchy below the top module.
+    top : Module, optional
+        Top module of the design, the outermost Module creating the signals if None.
+    """
+    def __init__(self, filename, signals=None, depth=None, top=None):
+        self.filename      = filename
+        self.allowed       = None
+        self.patterns      = None
+        if signals is not None:
+            self.allowed  = set(s for s in signals if isinstance(s, Signal))
+            self.patterns = [s for s in signals if not isinstance(s, Signal)]
+        self.depth         = depth
+        self.top           = top
+        self.modules       = None
+        self.ids           = OrderedDict()
+        self.ignored       = set()
+        self.signal_values = dict()
+        self.changes       = dict()
+        self.t             = 0
+
+    def _namespace(self):
+        # Names are given in the namespace of all the signals seen, dumped or not, so that they do
+        # not depend on the filter.
+        return build_namespace(set(self.ids.keys()) | self.ignored)
+
+    def _filter(self, signals):
+        if self.depth is not None:
+            if self.modules is None:
+                self.modules = _module_entries()
+            signals = [s for s in signals if _module_depth(s, self.modules, self.top) <= self.depth]
+        if self.allowed is None:
+            return signals
+        ns = self._namespace()
+        return [s for s in signals if s in self.allowed or
+            any(fnmatch.fnmatchcase(ns.get_name(s), p) for p in self.patterns)]
 
     def init(self, signals):
-        self.out_file = open(self.filename, "w")
-
-        # generate codes
-        for signal in signals:
-            try:
-                code = self.codes[signal]
-            except KeyError:
-                code = next(self.codegen)
-                self.codes[signal] = code
-
-        # write vcd header
-        header = ""
-        ns = build_namespace(self.codes.keys())
-        for signal, code in self.codes.items():
-            name = ns.get_name(signal)
-            header += "$var wire {len} {code} {name} $end\n".format(name=name, code=code, len=len(signal))
-        header += "$dumpvars\n"
-        for signal in self.codes.keys():
-            header += self._write_value(signal, signal.reset.value)
-        header += "$end\n"
-        self.out_file.write(header)
-
-        if self.initialized:
-            self.buffer_file.seek(0)
-            shutil.copyfileobj(self.buffer_file, self.out_file)
-            self.buffer_file.seek(0, 2)
-        else:
-            # init time
-            self._write("#0\n")
-
-        self.initialized = True
+        signals = [s for s in signals if s not in self.ids and s not in self.ignored]
+        self.ignored.update(signals)
+        allowed = self._filter(signals)
+        for signal in allowed:
+            self.ignored.remove(signal)
+            self.ids[signal]           = len(self.ids)
+            self.signal_values[signal] = signal.reset.value
+        self._declare(allowed)
+
+    def _flush(self):
+        changes       = []
+        signal_values = self.signal_values
+        for signal, value in self.changes.items():
+            if signal_values[signal] != value:
+                signal_values[signal] = value
+                changes.append((signal, value))
+        self.changes.clear()
+        if changes:
+            self._write_changes(self.t, changes)
 
     def set(self, signal, value):
-        if (signal not in self.signal_values
-                or self.signal_values[signal] != value):
-            self._write(self._write_value(signal, value))
-            self.signal_values[signal] = value
+        if signal not in self.ids:
+            if signal in self.ignored:
+                return
+            self.init([signal])
+            if signal not in self.ids:
+                return
+        self.changes[signal] = value
 
     def delay(self, delay):
+        self._flush()
         self.t += delay
-        self._write("#{}\n".format(self.t))
 
     def close(self):
+        self._flush()
+        self._close()
+
+
+class VCDWriter(WaveWriter):
+    """Value Change Dump writer
+
+    The output is streamed directly to the file: when a signal appears after init (signals used by
+    generators but not by the design), the header is rewritten and the changes already written are
+    copied back from the file.
+    """
+    def __init__(self, filename, signals=None, depth=None, top=None):
+        WaveWriter.__init__(self, filename, signals, depth, top)
+        self.out_file    = None
+        self.body_offset = None
+        self.codegen     = vcd_codes()
+        self.codes       = OrderedDict()
+        self.formatters  = dict()
+        self.t_written   = None
+
+    def _header(self):
+        header = []
+        ns = self._namespace()
+        for signal, code in self.codes.items():
+            name = ns.get_name(signal)
+            header.append("$var wire {len} {code} {name} $end\n".format(name=name, code=code, len=len(signal)))
+        header.append("$dumpvars\n")
+        for signal in self.codes.keys():
+            header.append(self.formatters[signal](signal.reset.value))
+        header.append("$end\n")
+        return "".join(header).encode()
+
+    def _declare(self, signals):
+        for signal in signals:
+            code = next(self.codegen)
+            self.codes[signal]      = code
+            self.formatters[signal] = _value_formatter(len(signal), code)
+
+        if self.out_file is None:
+            self.out_file = open(self.filename, "wb", buffering=2**20)
+            self.out_file.write(self._header())
+            self.body_offset = self.out_file.tell()
+        elif signals:
+            # New signals: rewrite the header and copy back the changes already written.
+            self.out_file.close()
+            fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.filename)))
+            with os.fdopen(fd, "wb") as tmp, open(self.filename, "rb") as old:
+                tmp.write(self._header())
+                body_offset = tmp.tell()
+                old.seek(self.body_offset)
+                shutil.copyfileobj(old, tmp)
+            os.replace(tmpname, self.filename)
+            self.body_offset = body_offset
+            self.out_file    = open(self.filename, "ab", buffering=2**20)
+
+    def _write_changes(self, t, changes):
+        formatters = self.formatters
+        lines      = [formatters[signal](value) for signal, value in changes]
+        if self.t_written != t:
+            self.t_written = t
+            lines.insert(0, "#{}\n".format(t))
+        self.out_file.write("".join(lines).encode())
+
+    def _close(self):
+        if self.t_written != self.t:
+            self.out_file.write("#{}\n".format(self.t).encode())
         self.out_file.close()
-        self.buffer_file.close()
 
 
 class DummyVCDWriter:
@@ -6,6 +6,7 @@
 
 import logging
 import math
+from functools import lru_cache
 
 from migen import Record
 
@@ -56,3 +57,71 @@ def clkdiv_range(start, stop, step=1):
     while current < stop:
         yield int(current) if math.floor(current) == current else current
         current += step
+
+# PLL Solver ---------------------------------------------------------------------------------------
+
+def _clkdiv_nearest(d_range, d_ideal):
+    # Dividers of d_range (start, stop, step) around d_ideal (at most 2, clamped to the range).
+    start, stop, step = (list(d_range) + [1])[:3]
+    k_max = math.ceil((stop - start)/step) - 1
+    k     = math.floor((d_ideal - start)/step)
+    for k in sorted({min(max(k, 0), k_max), min(max(k + 1, 0), k_max)}):
+        d = start + k*step
+        yield int(d) if math.floor(d) == d else d
+
+@lru_cache(maxsize=None)
+def _compute_pll_config(clkin_freq, vco_freq_range, vco_margin, pre_div_range, mult_range, clkouts):
+    (vco_freq_min, vco_freq_max) = vco_freq_range
+    vco_freq_min *= (1 + vco_margin)
+    vco_freq_max *= (1 - vco_margin)
+    best     = None
+    best_key = None
+    for pre_div in range(*pre_div_range):
+        # Multipliers in VCO range (+-1 for rounding, checked below).
+        mult_min = max(mult_range[0],     math.ceil(vco_freq_min*pre_div/clkin_freq) - 1)
+        mult_max = min(mult_range[1] - 1, math.floor(vco_freq_max*pre_div/clkin_freq) + 1)
+        for mult in reversed(range(mult_min, mult_max + 1)):
+            vco_freq = clkin_freq*mult/pre_div
+            if not (vco_freq_min <= vco_freq <= vco_freq_max):
+                continue
+            # Nearest divider of each output.
+            divs  = []
+            error = 0
+            for f, m, d_ranges in clkouts:
+                div = None
+                for d_range in d_ranges:
+                    for d in _clkdiv_nearest(d_range, vco_freq/f):
+                        e = abs(vco_freq/d - f)/f
+                        if e <= m and (div is None or e < div[1]):
+                            div = (d, e)
+                if div is None:
+                    break
+                divs.append(div[0])
+                error += div[1]
+            else:
+                # Rank: jitter (PFD then VCO frequency) then error.
+                key = (pre_div, -vco_freq, error)
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best     = (pre_div, mult, vco_freq, tuple(divs))
+        # Higher pre-dividers only reduce PFD frequency.
+        if best is not None:
+            break
+    return best
+
+def compute_pll_config(clkin_freq, vco_freq_range, pre_div_range, mult_range, clkouts, vco_margin=0):
+    """Compute PLL configuration
+
+    Solve vco_freq = clkin_freq*mult/pre_div and clkout_freq = vco_freq/div for the clkouts, given as
+    (freq, margin, div_ranges) with div_ranges a list of (start, stop[, step]) ranges. Dividers are
+    computed analytically per output and solutions are ranked by jitter (highest PFD then VCO
+    frequencies) then frequency error. Results are memoized.
+
+    Returns (pre_div, mult, vco_freq, divs) or raises ValueError when no config is found.
+    """
+    clkouts = tuple((f, m, tuple(tuple(r) for r in d_ranges)) for f, m, d_ranges in clkouts)
+    config  = _compute_pll_config(clkin_freq, tuple(vco_freq_range), vco_margin,
+        tuple(pre_div_range), tuple(mult_range), clkouts)
+    if config is None:
+        raise ValueError("No PLL config found")
+    return config
@@ -49,37 +49,22 @@ class IntelClocking(Module, AutoCSR):
         self.nclkouts += 1
 
     def compute_config(self):
-        config = {}
-        for n in range(*self.n_div_range):
-            config["n"] = n
-            for m in reversed(range(*self.m_div_range)):
-                all_valid = True
-                vco_freq = self.clkin_freq*m/n
-                (vco_freq_min, vco_freq_max) = self.vco_freq_range
-                if (vco_freq >= vco_freq_min*(1 + self.vco_margin) and
-                    vco_freq <= vco_freq_max*(1 - self.vco_margin)):
-                    for _n, (clk, f, p, _m) in sorted(self.clkouts.items()):
-                        valid = False
-                        for c in clkdiv_range(*self.c_div_range):
-                            clk_freq = vco_freq/c
-                            if abs(clk_freq - f) <= f*_m:
-                                config["clk{}_freq".format(_n)]   = clk_freq
-                                config["clk{}_divide".format(_n)] = c
-                                config["clk{}_phase".format(_n)]  = p
-                                valid = True
-                                break
-                            if valid:
-                                break
-                    if not valid:
-                        all_valid = False
-                else:
-                    all_valid = False
-                if all_valid:
-                    config["vco"] = vco_freq
-                    config["m"]   = m
-                    compute_config_log(self.logger, config)
-                    return config
-        raise ValueError("No PLL config found")
+        n, m, vco_freq, divs = compute_pll_config(
+            clkin_freq     = self.clkin_freq,
+            vco_freq_range = self.vco_freq_range,
+            vco_margin     = self.vco_margin,
+            pre_div_range  = self.n_div_range,
+            mult_range     = self.m_div_range,
+            clkouts        = [(f, _m, [self.c_div_range]) for _n, (clk, f, p, _m) in sorted(self.clkouts.items())])
+        config = {"n": n}
+        for (_n, (clk, f, p, _m)), c in zip(sorted(self.clkouts.items()), divs):
+            config["clk{}_freq".format(_n)]   = vco_freq/c
+            config["clk{}_divide".format(_n)] = c
+            config["clk{}_phase".format(_n)]  = p
+        config["vco"] = vco_freq
+        config["m"]   = m
+        compute_config_log(self.logger, config)
+        return config
 
     def do_finalize(self):
         assert hasattr(self, "clkin")
@@ -58,34 +58,21 @@ class ECP5PLL(Module):
         self.nclkouts += 1
 
     def compute_config(self):
-        config = {}
-        for clki_div in range(*self.clki_div_range):
-            config["clki_div"] = clki_div
-            for clkfb_div in range(*self.clkfb_div_range):
-                all_valid = True
-                vco_freq = self.clkin_freq/clki_div*clkfb_div*1 # clkos3_div=1
-                (vco_freq_min, vco_freq_max) = self.vco_freq_range
-                if vco_freq >= vco_freq_min and vco_freq <= vco_freq_max:
-                    for n, (clk, f, p, m) in sorted(self.clkouts.items()):
-                        valid = False
-                        for d in range(*self.clko_div_range):
-                            clk_freq = vco_freq/d
-                            if abs(clk_freq - f) <= f*m:
-                                config["clko{}_freq".format(n)]  = clk_freq
-                                config["clko{}_div".format(n)]   = d
-                                config["clko{}_phase".format(n)] = p
-                                valid = True
-                                break
-                        if not valid:
-                            all_valid = False
-                else:
-                    all_valid = False
-                if all_valid:
-                    config["vco"] = vco_freq
-                    config["clkfb_div"] = clkfb_div
-                    compute_config_log(self.logger, config)
-                    return config
-        raise ValueError("No PLL config found")
+        clki_div, clkfb_div, vco_freq, divs = compute_pll_config(
+            clkin_freq     = self.clkin_freq,
+            vco_freq_range = self.vco_freq_range,
+            pre_div_range  = self.clki_div_range,
+            mult_range     = self.clkfb_div_range, # clkos3_div=1
+            clkouts        = [(f, m, [self.clko_div_range]) for n, (clk, f, p, m) in sorted(self.clkouts.items())])
+        config = {"clki_div": clki_div}
+        for (n, (clk, f, p, m)), d in zip(sorted(self.clkouts.items()), divs):
+            config["clko{}_freq".format(n)]  = vco_freq/d
+            config["clko{}_div".format(n)]   = d
+            config["clko{}_phase".format(n)] = p
+        config["vco"] = vco_freq
+        config["clkfb_div"] = clkfb_div
+        compute_config_log(self.logger, config)
+        return config
 
     def do_finalize(self):
         config = self.compute_config()
@@ -68,41 +68,28 @@ class XilinxClocking(Module, AutoCSR):
         self.nclkouts += 1
 
     def compute_config(self):
-        config = {}
-        for divclk_divide in range(*self.divclk_divide_range):
-            config["divclk_divide"] = divclk_divide
-            for clkfbout_mult in reversed(range(*self.clkfbout_mult_frange)):
-                all_valid = True
-                vco_freq = self.clkin_freq*clkfbout_mult/divclk_divide
-                (vco_freq_min, vco_freq_max) = self.vco_freq_range
-                if (vco_freq >= vco_freq_min*(1 + self.vco_margin) and
-                    vco_freq <= vco_freq_max*(1 - self.vco_margin)):
-                    for n, (clk, f, p, m) in sorted(self.clkouts.items()):
-                        valid = False
-                        d_ranges = [self.clkout_divide_range]
-                        if getattr(self, "clkout{}_divide_range".format(n), None) is not None:
-                            d_ranges += [getattr(self, "clkout{}_divide_range".format(n))]
-                        for d_range in d_ranges:
-                            for d in clkdiv_range(*d_range):
-                                clk_freq = vco_freq/d
-                                if abs(clk_freq - f) <= f*m:
-                                    config["clkout{}_freq".format(n)]   = clk_freq
-                                    config["clkout{}_divide".format(n)] = d
-                                    config["clkout{}_phase".format(n)]  = p
-                                    valid = True
-                                    break
-                                if valid:
-                                    break
-                        if not valid:
-                            all_valid = False
-                else:
-                    all_valid = False
-                if all_valid:
-                    config["vco"]           = vco_freq
-                    config["clkfbout_mult"] = clkfbout_mult
-                    compute_config_log(self.logger, config)
-                    return config
-        raise ValueError("No PLL config found")
+        clkouts = []
+        for n, (clk, f, p, m) in sorted(self.clkouts.items()):
+            d_ranges = [self.clkout_divide_range]
+            if getattr(self, "clkout{}_divide_range".format(n), None) is not None:
+                d_ranges += [getattr(self, "clkout{}_divide_range".format(n))]
+            clkouts.append((f, m, d_ranges))
+        divclk_divide, clkfbout_mult, vco_freq, divs = compute_pll_config(
+            clkin_freq     = self.clkin_freq,
+            vco_freq_range = self.vco_freq_range,
+            vco_margin     = self.vco_margin,
+            pre_div_range  = self.divclk_divide_range,
+            mult_range     = self.clkfbout_mult_frange,
+            clkouts        = clkouts)
+        config = {"divclk_divide": divclk_divide}
+        for (n, (clk, f, p, m)), d in zip(sorted(self.clkouts.items()), divs):
+            config["clkout{}_freq".format(n)]   = vco_freq/d
+            config["clkout{}_divide".format(n)] = d
+            config["clkout{}_phase".format(n)]  = p
+        config["vco"]           = vco_freq
+        config["clkfbout_mult"] = clkfbout_mult
+        compute_config_log(self.logger, config)
+        return config
 
     def expose_drp(self):
         self.drp_reset  = CSR()
@@ -19,6 +19,24 @@ from litex.soc.interconnect import wishbone
 def format_bytes(s, endianness):
     return {"big": s, "little": reverse_bytes(s)}[endianness]
 
+def burst_control(module, bus, burst, last):
+    """Drive cyc/cti of bus for accesses requested by bus.stb
+
+    Without burst, accesses are single (classic) accesses. With burst, consecutive accesses are
+    done in incrementing bursts ended by the access with last: cyc is kept asserted between the
+    accesses of a burst (even if stb is deasserted) so that the burst is not interrupted.
+    """
+    if not burst:
+        module.comb += bus.cyc.eq(bus.stb)
+        return
+    in_burst = Signal()
+    module.sync += If(bus.stb & bus.ack, in_burst.eq(~last))
+    module.comb += [
+        bus.cyc.eq(bus.stb | in_burst),
+        bus.cti.eq(Mux(last, wishbone.CTI_BURST_END, wishbone.CTI_BURST_INCREMENTING)),
+        bus.bte.eq(wishbone.BTE_BURST_LINEAR),
+    ]
+
 # WishboneDMAReader --------------------------------------------------------------------------------
 
 class WishboneDMAReader(Module, AutoCSR):
@@ -26,11 +44,21 @@ class WishboneDMAReader(Module, AutoCSR):
 
     For every address written to the sink, one word will be produced on the source.
 
+    Reads are issued on each cycle an address is available and the FIFO has room for the data,
+    source backpressure being absorbed by the FIFO.
+
     Parameters
     ----------
     bus : bus
         Wishbone bus of the SoC to read from.
 
+    fifo_depth : int
+        Depth of the FIFO between the bus and the source.
+
+    burst : bool
+        Do the reads in incrementing bursts. The addresses written to the sink must then be
+        consecutive until last.
+
     Attributes
     ----------
     sink : Record("address")
@@ -39,7 +67,7 @@ class WishboneDMAReader(Module, AutoCSR):
     source : Record("data")
         Source for MMAP word results from reading.
     """
-    def __init__(self, bus, endianness="little", with_csr=False):
+    def __init__(self, bus, endianness="little", fifo_depth=16, burst=False, with_csr=False):
         assert isinstance(bus, wishbone.Interface)
         self.bus    = bus
         self.sink   = sink   = stream.Endpoint([("address", bus.adr_width, ("last", 1))])
@@ -47,29 +75,25 @@ class WishboneDMAReader(Module, AutoCSR):
 
         # # #
 
-        data = Signal(bus.data_width)
+        # Data FIFO: a read is only issued when the FIFO has room for its data (the FIFO is only
+        # written by the reads, so stb stays asserted until the ack).
+        self.submodules.fifo = fifo = stream.SyncFIFO([("data", bus.data_width)], fifo_depth)
+        self.comb += fifo.source.connect(source)
 
-        self.submodules.fsm = fsm = FSM(reset_state="BUS-READ")
-        fsm.act("BUS-READ",
-            bus.stb.eq(sink.valid),
-            bus.cyc.eq(sink.valid),
+        # Reads
+        self.comb += [
+            bus.stb.eq(sink.valid & fifo.sink.ready),
             bus.we.eq(0),
             bus.sel.eq(2**(bus.data_width//8)-1),
             bus.adr.eq(sink.address),
             If(bus.stb & bus.ack,
-                NextValue(data, format_bytes(bus.dat_r, endianness)),
-                NextState("SOURCE-WRITE")
-            )
-        )
-        fsm.act("SOURCE-WRITE",
-            source.valid.eq(1),
-            source.last.eq(sink.last),
-            source.data.eq(data),
-            If(source.ready,
                 sink.ready.eq(1),
-                NextState("BUS-READ")
-            )
-        )
+                fifo.sink.valid.eq(1),
+            ),
+            fifo.sink.last.eq(sink.last),
+            fifo.sink.data.eq(format_bytes(bus.dat_r, endianness)),
+        ]
+        burst_control(self, bus, burst, sink.last)
 
         if with_csr:
             self.add_csr()
@@ -117,7 +141,8 @@ class WishboneDMAReader(Module, AutoCSR):
             )
         )
         fsm.act("DONE",
-            self._done.status.eq(1)
+            # Done once the data of all the reads has been output.
+            self._done.status.eq(~self.source.valid)
         )
 
 # WishboneDMAWriter --------------------------------------------------------------------------------
@@ -130,29 +155,31 @@ class WishboneDMAWriter(Module, AutoCSR):
     bus : bus
         Wishbone bus of the SoC to read from.
 
+    burst : bool
+        Do the writes in incrementing bursts. The addresses written to the sink must then be
+        consecutive until last.
+
     Attributes
     ----------
     sink : Record("address", "data")
         Sink for MMAP addresses/datas to be written.
     """
-    def __init__(self, bus, endianness="little", with_csr=False):
+    def __init__(self, bus, endianness="little", burst=False, with_csr=False):
         assert isinstance(bus, wishbone.Interface)
         self.bus  = bus
         self.sink = sink = stream.Endpoint([("address", bus.adr_width), ("data", bus.data_width)])
 
         # # #
 
-        data = Signal(bus.data_width)
-
         self.comb += [
             bus.stb.eq(sink.valid),
-            bus.cyc.eq(sink.valid),
             bus.we.eq(1),
             bus.sel.eq(2**(bus.data_width//8)-1),
             bus.adr.eq(sink.address),
             bus.dat_w.eq(format_bytes(sink.data, endianness)),
             sink.ready.eq(bus.ack),
         ]
+        burst_control(self, bus, burst, sink.last)
 
         if with_csr:
             self.add_csr()
@@ -187,6 +214,7 @@ class WishboneDMAWriter(Module, AutoCSR):
         )
         fsm.act("RUN",
             self._sink.valid.eq(self.sink.valid),
+            self._sink.last.eq(offset == (length - 1)),
             self._sink.data.eq(self.sink.data),
             self._sink.address.eq(base + offset),
             self.sink.ready.eq(self._sink.ready),
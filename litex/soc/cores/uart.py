@@ -7,8 +7,6 @@
 # Copyright (c) 2018 Tim 'mithro' Ansell <me@mith.ro>
 # SPDX-License-Identifier: BSD-2-Clause
 
-from math import log2
-
 from migen import *
 from migen.genlib.record import Record
 from migen.genlib.cdc import MultiReg
@@ -18,6 +16,7 @@ from litex.soc.interconnect.csr import *
 from litex.soc.interconnect.csr_eventmanager import *
 from litex.soc.interconnect import wishbone
 from litex.soc.interconnect import stream
+from litex.soc.cores.dma import WishboneDMAReader, WishboneDMAWriter
 
 # Common -------------------------------------------------------------------------------------------
 
@@ -255,33 +254,75 @@ CMD_WRITE_BURST_FIXED = 0x03
 CMD_READ_BURST_FIXED  = 0x04
 
 class Stream2Wishbone(Module):
-    def __init__(self, phy=None, clk_freq=None, data_width=32, address_width=32):
+    """Stream to Wishbone bridge (UARTBone protocol)
+
+    Commands: cmd (1 byte), length (`length_width` bits, big endian, in words), address (in words,
+    big endian), then the datas for the writes (words, big endian). The datas of the reads are
+    sent back (words, big endian).
+
+    The bus accesses are decoupled from the stream by FIFOs of `fifo_depth` words: writes are
+    posted while the next words are received and reads are prefetched while the previous words are
+    sent. A command is aborted after 100ms without activity.
+    """
+    def __init__(self, phy=None, clk_freq=None, data_width=32, address_width=32, fifo_depth=16,
+        length_width=8):
+        assert length_width % 8 == 0
         self.sink   = sink   = stream.Endpoint([("data", 8)]) if phy is None else phy.source
         self.source = source = stream.Endpoint([("data", 8)]) if phy is None else phy.sink
         self.wishbone = wishbone.Interface()
 
         # # #
 
-        cmd         = Signal(8,                        reset_less=True)
-        incr        = Signal()
-        length      = Signal(8,                        reset_less=True)
-        address     = Signal(address_width,            reset_less=True)
-        data        = Signal(data_width,               reset_less=True)
-        bytes_count = Signal(int(log2(data_width//8)), reset_less=True)
-        words_count = Signal(8,                        reset_less=True)
+        cmd          = Signal(8,                        reset_less=True)
+        incr         = Signal()
+        length       = Signal(length_width,             reset_less=True)
+        address      = Signal(address_width,            reset_less=True)
+        data         = Signal(data_width,               reset_less=True)
+        bytes_count  = Signal(bits_for(max(data_width, length_width)//8 - 1), reset_less=True)
+        words_count  = Signal(length_width,             reset_less=True)
+        rd_address   = Signal(address_width,            reset_less=True)
+        rd_count     = Signal(length_width,             reset_less=True)
+        rd_done      = Signal()
 
         bytes_count_done  = (bytes_count == (data_width//8 - 1))
+        length_count_done = (bytes_count == (length_width//8 - 1))
         words_count_done  = (words_count == (length - 1))
+        rd_count_done     = (rd_count == (length - 1))
 
         fsm   = ResetInserter()(FSM(reset_state="RECEIVE-CMD"))
         timer = WaitTimer(int(100e-3*clk_freq))
-        self.comb += timer.wait.eq(~fsm.ongoing("RECEIVE-CMD"))
         self.submodules += fsm, timer
         self.comb += fsm.reset.eq(timer.done)
+
+        # Wishbone writes (posted) and reads (prefetched), never done at the same time.
+        wr_bus = wishbone.Interface()
+        rd_bus = wishbone.Interface()
+        writer = ResetInserter()(WishboneDMAWriter(wr_bus, endianness="big"))
+        reader = ResetInserter()(WishboneDMAReader(rd_bus, endianness="big", fifo_depth=fifo_depth))
+        wr_fifo = ResetInserter()(stream.SyncFIFO(writer.sink.description, fifo_depth))
+        self.submodules.writer  = writer
+        self.submodules.reader  = reader
+        self.submodules.wr_fifo = wr_fifo
+        self.submodules.arbiter = wishbone.Arbiter([wr_bus, rd_bus], self.wishbone)
+        self.comb += [
+            writer.reset.eq(timer.done),
+            reader.reset.eq(timer.done),
+            wr_fifo.reset.eq(timer.done),
+            wr_fifo.source.connect(writer.sink),
+        ]
+
+        # Abort the command when no activity.
+        self.comb += timer.wait.eq(~fsm.ongoing("RECEIVE-CMD") &
+            ~(sink.valid & sink.ready) &
+            ~(source.valid & source.ready) &
+            ~wr_bus.ack)
+
         fsm.act("RECEIVE-CMD",
             sink.ready.eq(1),
             NextValue(bytes_count, 0),
             NextValue(words_count, 0),
+            NextValue(rd_count, 0),
+            NextValue(rd_done, 0),
             If(sink.valid,
                 NextValue(cmd, sink.data),
                 NextState("RECEIVE-LENGTH")
@@ -290,8 +331,12 @@ class Stream2Wishbone(Module):
         fsm.act("RECEIVE-LENGTH",
             sink.ready.eq(1),
             If(sink.valid,
-                NextValue(length, sink.data),
-                NextState("RECEIVE-ADDRESS")
+                NextValue(length, Cat(sink.data, length)),
+                NextValue(bytes_count, bytes_count + 1),
+                If(length_count_done,
+                    NextValue(bytes_count, 0),
+                    NextState("RECEIVE-ADDRESS")
+                )
             )
         )
         fsm.act("RECEIVE-ADDRESS",
@@ -300,11 +345,13 @@ class Stream2Wishbone(Module):
                 NextValue(address, Cat(sink.data, address)),
                 NextValue(bytes_count, bytes_count + 1),
                 If(bytes_count_done,
+                    NextValue(bytes_count, 0),
                     If((cmd == CMD_WRITE_BURST_INCR) | (cmd == CMD_WRITE_BURST_FIXED),
                         NextValue(incr, cmd == CMD_WRITE_BURST_INCR),
                         NextState("RECEIVE-DATA")
                     ).Elif((cmd == CMD_READ_BURST_INCR) | (cmd == CMD_READ_BURST_FIXED),
                         NextValue(incr, cmd == CMD_READ_BURST_INCR),
+                        NextValue(rd_address, Cat(sink.data, address)),
                         NextState("READ-DATA")
                     ).Else(
                         NextState("RECEIVE-CMD")
@@ -312,83 +359,80 @@ class Stream2Wishbone(Module):
                 )
             )
         )
+
+        # Writes: each received word is queued to the writer.
+        self.comb += [
+            wr_fifo.sink.address.eq(address),
+            wr_fifo.sink.data.eq(Cat(sink.data, data)),
+        ]
         fsm.act("RECEIVE-DATA",
-            sink.ready.eq(1),
-            If(sink.valid,
+            sink.ready.eq(~bytes_count_done | wr_fifo.sink.ready),
+            If(sink.valid & sink.ready,
                 NextValue(data, Cat(sink.data, data)),
                 NextValue(bytes_count, bytes_count + 1),
                 If(bytes_count_done,
-                    NextState("WRITE-DATA")
+                    NextValue(bytes_count, 0),
+                    wr_fifo.sink.valid.eq(1),
+                    NextValue(words_count, words_count + 1),
+                    NextValue(address, address + incr),
+                    If(words_count_done,
+                        NextState("WRITE-DATA")
+                    )
                 )
             )
         )
-        self.comb += [
-            self.wishbone.adr.eq(address),
-            self.wishbone.dat_w.eq(data),
-            self.wishbone.sel.eq(2**(data_width//8) - 1)
-        ]
         fsm.act("WRITE-DATA",
-            sink.ready.eq(0),
-            self.wishbone.stb.eq(1),
-            self.wishbone.we.eq(1),
-            self.wishbone.cyc.eq(1),
-            If(self.wishbone.ack,
-                NextValue(words_count, words_count + 1),
-                NextValue(address, address + incr),
-                If(words_count_done,
-                    NextState("RECEIVE-CMD")
-                ).Else(
-                    NextState("RECEIVE-DATA")
-                )
+            # Wait for the queued writes.
+            If(~wr_fifo.source.valid,
+                NextState("RECEIVE-CMD")
             )
         )
+
+        # Reads: the addresses are queued to the reader while the words are sent.
         fsm.act("READ-DATA",
-            sink.ready.eq(0),
-            self.wishbone.stb.eq(1),
-            self.wishbone.we.eq(0),
-            self.wishbone.cyc.eq(1),
-            If(self.wishbone.ack,
-                NextValue(data, self.wishbone.dat_r),
-                NextState("SEND-DATA")
-            )
-        )
-        cases = {}
-        for i, n in enumerate(reversed(range(data_width//8))):
-            cases[i] = source.data.eq(data[8*n:])
-        self.comb += Case(bytes_count, cases)
-        fsm.act("SEND-DATA",
-            sink.ready.eq(0),
-            source.valid.eq(1),
-            If(source.ready,
+            reader.sink.valid.eq(~rd_done),
+            reader.sink.address.eq(rd_address),
+            If(reader.sink.valid & reader.sink.ready,
+                NextValue(rd_count, rd_count + 1),
+                NextValue(rd_address, rd_address + incr),
+                If(rd_count_done,
+                    NextValue(rd_done, 1)
+                )
+            ),
+            source.valid.eq(reader.source.valid),
+            If(source.valid & source.ready,
                 NextValue(bytes_count, bytes_count + 1),
                 If(bytes_count_done,
+                    NextValue(bytes_count, 0),
+                    reader.source.ready.eq(1),
                     NextValue(words_count, words_count + 1),
-                    NextValue(address, address + incr),
                     If(words_count_done,
                         NextState("RECEIVE-CMD")
-                    ).Else(
-                        NextState("READ-DATA")
                     )
                 )
             )
         )
+        cases = {}
+        for i, n in enumerate(reversed(range(data_width//8))):
+            cases[i] = source.data.eq(reader.source.data[8*n:])
+        self.comb += Case(bytes_count, cases)
         self.comb += source.last.eq(bytes_count_done & words_count_done)
         if hasattr(source, "length"):
             self.comb += source.length.eq((data_width//8)*length)
 
 
 class UARTBone(Stream2Wishbone):
-    def __init__(self, pads, clk_freq, baudrate=115200, cd="sys"):
+    def __init__(self, pads, clk_freq, baudrate=115200, cd="sys", **kwargs):
         if cd == "sys":
             self.submodules.phy = RS232PHY(pads, clk_freq, baudrate)
-            Stream2Wishbone.__init__(self, self.phy, clk_freq=clk_freq)
+            Stream2Wishbone.__init__(self, self.phy, clk_freq=clk_freq, **kwargs)
         else:
             self.submodules.phy = ClockDomainsRenamer(cd)(RS232PHY(pads, clk_freq, baudrate))
             self.submodules.tx_cdc = stream.ClockDomainCrossing([("data", 8)], cd_from="sys", cd_to=cd)
             self.submodules.rx_cdc = stream.ClockDomainCrossing([("data", 8)], cd_from=cd,    cd_to="sys")
             self.comb += self.phy.source.connect(self.rx_cdc.sink)
             self.comb += self.tx_cdc.source.connect(self.phy.sink)
-            Stream2Wishbone.__init__(self, clk_freq=clk_freq)
+            Stream2Wishbone.__init__(self, clk_freq=clk_freq, **kwargs)
             self.comb += self.rx_cdc.source.connect(self.sink)
             self.comb += self.source.connect(self.tx_cdc.sink)
 
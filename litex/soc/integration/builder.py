@@ -19,6 +19,7 @@ import shutil
 
 from litex import get_data_mod
 from litex.build.tools import write_to_file
+from litex.gen.fhdl.hierarchy import separate_submodules
 from litex.soc.integration import export, soc_core
 from litex.soc.cores import cpu
 
@@ -60,6 +61,8 @@ class Builder:
         generated_dir    = None,
         compile_software = True,
         compile_gateware = True,
+        verilog_cache    = False,
+        verilog_modules  = [],
         csr_json         = None,
         csr_csv          = None,
         csr_svd          = None,
@@ -77,6 +80,8 @@ class Builder:
 
         self.compile_software = compile_software
         self.compile_gateware = compile_gateware
+        self.verilog_cache    = verilog_cache
+        self.verilog_modules  = verilog_modules
         self.csr_csv          = csr_csv
         self.csr_json         = csr_json
         self.csr_svd          = csr_svd
@@ -196,9 +201,13 @@ class Builder:
 
     def build(self, **kwargs):
         self.soc.platform.output_dir = self.output_dir
+        if self.verilog_cache:
+            self.soc.platform.verilog_cache_dir = os.path.join(self.gateware_dir, ".verilog_cache")
         os.makedirs(self.gateware_dir, exist_ok=True)
         os.makedirs(self.software_dir, exist_ok=True)
 
+        if self.verilog_modules:
+            separate_submodules(self.soc, self.verilog_modules)
         self.soc.finalize()
 
         self._generate_includes()
@@ -244,6 +253,12 @@ def builder_args(parser):
     parser.add_argument("--no-compile-gateware", action="store_true",
                         help="do not compile the gateware, only generate "
                              "HDL source files and build scripts")
+    parser.add_argument("--verilog-cache", action="store_true",
+                        help="reuse the generated Verilog when the design "
+                             "did not change since the previous build")
+    parser.add_argument("--verilog-modules", nargs="+", default=[],
+                        help="emit these SoC submodules (ex: cpu sdram "
+                             "bus_interconnect) as separate Verilog modules")
     parser.add_argument("--csr-csv", default=None,
                         help="store CSR map in CSV format into the "
                              "specified file")
@@ -268,6 +283,8 @@ def builder_argdict(args):
         "generated_dir":    args.generated_dir,
         "compile_software": not args.no_compile_software,
         "compile_gateware": not args.no_compile_gateware,
+        "verilog_cache":    args.verilog_cache,
+        "verilog_modules":  args.verilog_modules,
         "csr_csv":          args.csr_csv,
         "csr_json":         args.csr_json,
         "csr_svd":          args.csr_svd,
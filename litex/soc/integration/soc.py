@@ -10,6 +10,8 @@ import logging
 import time
 import datetime
 from math import log2, ceil
+from functools import reduce
+from operator import or_
 
 from migen import *
 
@@ -104,15 +106,49 @@ class SoCCSRRegion:
         self.busword = busword
         self.obj     = obj
 
+# SoCProfile ---------------------------------------------------------------------------------------
+
+class SoCProfile:
+    """Elaboration time of the steps of a SoC method (step() starts a new step, stop() ends)."""
+    def __init__(self, name):
+        self.name  = name
+        self.steps = []
+        self.start = time.perf_counter()
+        self.total = None
+
+    def step(self, name):
+        now = time.perf_counter()
+        if len(self.steps):
+            last_name, last_start, _ = self.steps[-1]
+            self.steps[-1] = (last_name, last_start, now - last_start)
+        if name is not None:
+            self.steps.append((name, now, None))
+
+    def stop(self):
+        self.step(None)
+        self.total = time.perf_counter() - self.start
+
+    def __str__(self):
+        total  = max(self.total, 1e-9)
+        length = max([len(name) for name, _, _ in self.steps] + [0])
+        r = "{} Profile: {}\n".format(self.name, colorer("{:.3f}s".format(self.total)))
+        for name, _, duration in sorted(self.steps, key=lambda step: -step[2]):
+            r += "- {}{}: {:8.3f}ms ({:5.1f}%)\n".format(
+                colorer(name, color="underline"), " "*(length-len(name)), duration*1e3, 100*duration/total)
+        r = r[:-1]
+        return r
+
 # SoCBusHandler ------------------------------------------------------------------------------------
 
 class SoCBusHandler(Module):
     supported_standard      = ["wishbone", "axi-lite"]
     supported_data_width    = [32, 64]
     supported_address_width = [32]
+    supported_interconnect  = ["shared", "crossbar"]
 
     # Creation -------------------------------------------------------------------------------------
-    def __init__(self, name="SoCBusHandler", standard="wishbone", data_width=32, address_width=32, timeout=1e6, reserved_regions={}):
+    def __init__(self, name="SoCBusHandler", standard="wishbone", data_width=32, address_width=32, timeout=1e6,
+        interconnect="shared", request_stages=0, response_stages=0, reserved_regions={}):
         self.logger = logging.getLogger(name)
         self.logger.info("Creating Bus Handler...")
 
@@ -140,6 +176,19 @@ class SoCBusHandler(Module):
                 colorer(", ".join(str(x) for x in self.supported_address_width))))
             raise
 
+        # Check Interconnect
+        if interconnect not in self.supported_interconnect:
+            self.logger.error("Unsupported {} {}, supporteds: {:s}".format(
+                colorer("Interconnect", color="red"),
+                colorer(interconnect),
+                colorer(", ".join(self.supported_interconnect))))
+            raise
+        if (request_stages or response_stages) and (interconnect, standard) != ("crossbar", "wishbone"):
+            self.logger.error("{} only supported on {} Interconnect.".format(
+                colorer("Pipeline stages", color="red"),
+                colorer("wishbone crossbar")))
+            raise
+
         # Create Bus
         self.standard      = standard
         self.data_width    = data_width
@@ -149,6 +198,8 @@ class SoCBusHandler(Module):
         self.regions       = {}
         self.io_regions    = {}
         self.timeout       = timeout
+        self.interconnect  = interconnect
+        self.stages        = (request_stages, response_stages)
         self.logger.info("{}-bit {} Bus, {}GiB Address Space.".format(
             colorer(data_width), colorer(standard), colorer(2**address_width/2**30)))
 
@@ -703,6 +754,9 @@ class SoC(Module):
         bus_data_width       = 32,
         bus_address_width    = 32,
         bus_timeout          = 1e6,
+        bus_interconnect     = "shared",
+        bus_request_stages   = 0,
+        bus_response_stages  = 0,
         bus_reserved_regions = {},
 
         csr_data_width       = 32,
@@ -740,6 +794,9 @@ class SoC(Module):
             data_width       = bus_data_width,
             address_width    = bus_address_width,
             timeout          = bus_timeout,
+            interconnect     = bus_interconnect,
+            request_stages   = bus_request_stages,
+            response_stages  = bus_response_stages,
             reserved_regions = bus_reserved_regions,
            )
 
@@ -808,8 +865,9 @@ class SoC(Module):
             "wishbone": wishbone.Interface,
             "axi-lite": axi.AXILiteInterface,
         }[self.bus.standard]
-        ram_bus = interface_cls(data_width=self.bus.data_width)
-        ram     = ram_cls(size, bus=ram_bus, init=contents, read_only=(mode == "r"))
+        ram_bus    = interface_cls(data_width=self.bus.data_width)
+        ram_kwargs = {"burst": True} if self.bus.standard == "wishbone" else {}
+        ram        = ram_cls(size, bus=ram_bus, init=contents, read_only=(mode == "r"), **ram_kwargs)
         self.bus.add_slave(name, ram.bus, SoCRegion(origin=origin, size=size, mode=mode))
         self.check_if_exists(name)
         self.logger.info("RAM {} {} {}.".format(
@@ -911,6 +969,8 @@ class SoC(Module):
 
     # SoC finalization -----------------------------------------------------------------------------
     def do_finalize(self):
+        profile = SoCProfile("Finalization")
+        profile.step("Logs")
         self.logger.info(colorer("-"*80, color="bright"))
         self.logger.info(colorer("Finalized SoC:"))
         self.logger.info(colorer("-"*80, color="bright"))
@@ -929,18 +989,25 @@ class SoC(Module):
             "wishbone": wishbone.InterconnectShared,
             "axi-lite": axi.AXILiteInterconnectShared,
         }[self.bus.standard]
+        interconnect_crossbar_cls = {
+            "wishbone": wishbone.Crossbar,
+            "axi-lite": axi.AXILiteCrossbar,
+        }[self.bus.standard]
 
         # SoC Reset --------------------------------------------------------------------------------
+        profile.step("Reset")
         # Connect SoCController's reset to CRG's reset if presents.
         if hasattr(self, "ctrl") and hasattr(self, "crg"):
             if hasattr(self.ctrl, "_reset") and hasattr(self.crg, "rst"):
                 self.comb += self.crg.rst.eq(self.ctrl._reset.re)
 
         # SoC CSR bridge ---------------------------------------------------------------------------
+        profile.step("CSR Bridge")
         # FIXME: for now, use registered CSR bridge when SDRAM is present; find the best compromise.
         self.add_csr_bridge(self.mem_map["csr"], register=hasattr(self, "sdram"))
 
         # SoC Bus Interconnect ---------------------------------------------------------------------
+        profile.step("Bus Interconnect")
         if len(self.bus.masters) and len(self.bus.slaves):
             # If 1 bus_master, 1 bus_slave and no address translation, use InterconnectPointToPoint.
             if ((len(self.bus.masters) == 1)  and
@@ -949,16 +1016,33 @@ class SoC(Module):
                 self.submodules.bus_interconnect = interconnect_p2p_cls(
                     master = next(iter(self.bus.masters.values())),
                     slave  = next(iter(self.bus.slaves.values())))
-            # Otherwise, use InterconnectShared.
+            # Otherwise, use InterconnectShared (or Crossbar).
             else:
-                self.submodules.bus_interconnect = interconnect_shared_cls(
-                    masters        = self.bus.masters.values(),
+                interconnect_kwargs = {}
+                if self.bus.interconnect == "crossbar":
+                    interconnect_cls = interconnect_crossbar_cls
+                    if self.bus.standard == "wishbone":
+                        interconnect_kwargs = {
+                            "request_stages"  : self.bus.stages[0],
+                            "response_stages" : self.bus.stages[1],
+                        }
+                else:
+                    interconnect_cls = interconnect_shared_cls
+                self.submodules.bus_interconnect = interconnect_cls(
+                    masters        = list(self.bus.masters.values()),
                     slaves         = [(self.bus.regions[n].decoder(self.bus), s) for n, s in self.bus.slaves.items()],
                     register       = True,
-                    timeout_cycles = self.bus.timeout)
+                    timeout_cycles = self.bus.timeout,
+                    **interconnect_kwargs)
                 if hasattr(self, "ctrl") and self.bus.timeout is not None:
                     if hasattr(self.ctrl, "bus_error"):
-                        self.comb += self.ctrl.bus_error.eq(self.bus_interconnect.timeout.error)
+                        timeouts = getattr(self.bus_interconnect, "timeouts", [])
+                        if hasattr(self.bus_interconnect, "timeout"):
+                            timeouts = [self.bus_interconnect.timeout]
+                        self.comb += self.ctrl.bus_error.eq(reduce(or_, [t.error for t in timeouts], 0))
+                if hasattr(self.bus_interconnect, "get_report"):
+                    for line in self.bus_interconnect.get_report().split("\n"):
+                        self.bus.logger.info(line)
             self.bus.logger.info("Interconnect: {} ({} <-> {}).".format(
                 colorer(self.bus_interconnect.__class__.__name__),
                 colorer(len(self.bus.masters)),
@@ -968,6 +1052,7 @@ class SoC(Module):
         self.add_constant("CONFIG_BUS_ADDRESS_WIDTH", self.bus.address_width)
 
         # SoC DMA Bus Interconnect (Cache Coherence) -----------------------------------------------
+        profile.step("DMA Bus Interconnect")
         if hasattr(self, "dma_bus"):
             if len(self.dma_bus.masters) and len(self.dma_bus.slaves):
                 # If 1 bus_master, 1 bus_slave and no address translation, use InterconnectPointToPoint.
@@ -990,6 +1075,7 @@ class SoC(Module):
             self.add_constant("CONFIG_CPU_HAS_DMA_BUS")
 
         # SoC CSR Interconnect ---------------------------------------------------------------------
+        profile.step("CSR Banks")
         self.submodules.csr_bankarray = csr_bus.CSRBankArray(self,
             address_map        = self.csr.address_map,
             data_width         = self.csr.data_width,
@@ -1003,6 +1089,7 @@ class SoC(Module):
                 masters = list(self.csr.masters.values()),
                 slaves  = self.csr_bankarray.get_buses())
 
+        profile.step("CSR Regions")
         # Add CSRs regions
         for name, csrs, mapaddr, rmap in self.csr_bankarray.banks:
             self.csr.add_region(name, SoCCSRRegion(
@@ -1025,6 +1112,7 @@ class SoC(Module):
             self.add_constant(name + "_" + constant.name, constant.value.value)
 
         # SoC CPU Check ----------------------------------------------------------------------------
+        profile.step("CPU Check")
         if not isinstance(self.cpu, (cpu.CPUNone, cpu.Zynq7000)):
             if "sram" not in self.bus.regions.keys():
                 self.logger.error("CPU needs {} Region to be {} as Bus or Linker Region.".format(
@@ -1048,6 +1136,7 @@ class SoC(Module):
                 raise
 
         # SoC IRQ Interconnect ---------------------------------------------------------------------
+        profile.step("IRQ Interconnect")
         if hasattr(self, "cpu") and hasattr(self.cpu, "interrupt"):
             for name, loc in sorted(self.irq.locs.items()):
                 if name in self.cpu.interrupts.keys():
@@ -1062,6 +1151,11 @@ class SoC(Module):
                     self.comb += self.cpu.interrupt[loc].eq(module.ev.irq)
                 self.add_constant(name + "_INTERRUPT", loc)
 
+        # SoC Profile ------------------------------------------------------------------------------
+        profile.stop()
+        self.finalize_profile = profile
+        self.logger.info(profile)
+
     # SoC build ------------------------------------------------------------------------------------
     def build(self, *args, **kwargs):
         self.build_name = kwargs.pop("build_name", self.platform.name)
@@ -1156,13 +1250,14 @@ class LiteXSoC(SoC):
             self.add_constant("UART_POLLING")
 
     # Add UARTbone ---------------------------------------------------------------------------------
-    def add_uartbone(self, name="serial", clk_freq=None, baudrate=115200, cd="sys"):
+    def add_uartbone(self, name="serial", clk_freq=None, baudrate=115200, cd="sys", length_width=8):
         from litex.soc.cores import uart
         self.submodules.uartbone = uart.UARTBone(
-            pads     = self.platform.request(name),
-            clk_freq = clk_freq if clk_freq is not None else self.sys_clk_freq,
-            baudrate = baudrate,
-            cd       = cd)
+            pads         = self.platform.request(name),
+            clk_freq     = clk_freq if clk_freq is not None else self.sys_clk_freq,
+            baudrate     = baudrate,
+            cd           = cd,
+            length_width = length_width)
         self.bus.add_master(name="uartbone", master=self.uartbone.wishbone)
 
     # Add SDRAM ------------------------------------------------------------------------------------
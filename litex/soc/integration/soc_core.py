@@ -65,6 +65,9 @@ class SoCCore(LiteXSoC):
         bus_data_width           = 32,
         bus_address_width        = 32,
         bus_timeout              = 1e6,
+        bus_interconnect         = "shared",
+        bus_request_stages       = 0,
+        bus_response_stages      = 0,
         # CPU parameters
         cpu_type                 = "vexriscv",
         cpu_reset_address        = None,
@@ -109,6 +112,9 @@ class SoCCore(LiteXSoC):
             bus_data_width       = bus_data_width,
             bus_address_width    = bus_address_width,
             bus_timeout          = bus_timeout,
+            bus_interconnect     = bus_interconnect,
+            bus_request_stages   = bus_request_stages,
+            bus_response_stages  = bus_response_stages,
             bus_reserved_regions = {},
 
             csr_data_width       = csr_data_width,
@@ -265,6 +271,13 @@ def soc_core_args(parser):
                         help="Bus address width (default=32)")
     parser.add_argument("--bus-timeout", default=1e6, type=float,
                         help="Bus timeout in cycles (default=1e6)")
+    parser.add_argument("--bus-interconnect", default="shared",
+                        help="select bus interconnect: {}, (default=shared)".format(
+                            ", ".join(SoCBusHandler.supported_interconnect)))
+    parser.add_argument("--bus-request-stages", default=0, type=int,
+                        help="Pipeline stages on the request path of the crossbar (0-2, default=0)")
+    parser.add_argument("--bus-response-stages", default=0, type=int,
+                        help="Pipeline stages on the response path of the crossbar (0-2, default=0)")
 
     # CPU parameters
     parser.add_argument("--cpu-type", default=None,
@@ -1313,3 +1313,258 @@ class AXILiteCrossbar(Module):
         # Arbitrate each access column onto its slave.
         for masters, bus in zip(access_s_m, busses):
             self.submodules += AXILiteArbiter(masters, bus)
+
+# AXI Interconnect ---------------------------------------------------------------------------------
+
+def _axi_channel_signals(channel):
+    # Names of the valid/ready/last and payload signals of a channel.
+    names = ["valid", "ready"]
+    if hasattr(channel, "last"):
+        names.append("last")
+    names += [name for name, _ in channel.description.payload_layout]
+    return names
+
+class AXIInterconnectPointToPoint(Module):
+    def __init__(self, master, slave):
+        self.comb += master.connect(slave)
+
+class AXIArbiter(Module):
+    """AXI arbiter
+
+    Arbitrate between master interfaces and connect them to the target. Arbitration of the write
+    and read address channels is done separately, for each burst: masters can have bursts
+    outstanding on the target at the same time.
+
+    The index of the master is appended to the IDs (`target.id_width` must be at least the
+    `id_width` of the masters plus log2(len(masters))): B/R responses are routed back with their
+    ID, so the target can reorder the responses of the different IDs. The W data are routed in the
+    order of the accepted write bursts.
+
+    `max_outstanding` limits the number of outstanding bursts per direction.
+    """
+    def __init__(self, masters, target, max_outstanding=16):
+        n          = len(masters)
+        id_width   = len(masters[0].aw.id)
+        index_bits = log2_int(n, need_pow2=False)
+        if target.id_width < id_width + index_bits:
+            raise ValueError("Target ID width {} too small for {} masters with {}-bit IDs.".format(
+                target.id_width, n, id_width))
+        self.submodules.rr_write = rr_write = roundrobin.RoundRobin(n, roundrobin.SP_CE)
+        self.submodules.rr_read  = rr_read  = roundrobin.RoundRobin(n, roundrobin.SP_CE)
+
+        def master_id(i, channel):
+            _id = getattr(masters[i], channel).id
+            return Cat(_id, Constant(i, index_bits)) if index_bits else _id
+
+        def response_index(channel):
+            return getattr(target, channel).id[id_width:id_width + index_bits] if index_bits else 0
+
+        # # #
+
+        # Outstanding bursts.
+        self.submodules.wr_lock = wr_lock = _AXILiteRequestCounter(
+            request  = target.aw.valid & target.aw.ready,
+            response = target.b.valid & target.b.ready,
+            max_requests = max_outstanding + 1)
+        self.submodules.rd_lock = rd_lock = _AXILiteRequestCounter(
+            request  = target.ar.valid & target.ar.ready,
+            response = target.r.valid & target.r.ready & target.r.last,
+            max_requests = max_outstanding + 1)
+
+        # Order of the write bursts, for the W data.
+        self.submodules.w_order = w_order = stream.SyncFIFO([("index", max(index_bits, 1))],
+            max(max_outstanding, 2))
+        w_index = w_order.source.index
+
+        # Address channels.
+        for channel, rr, lock, stall in [
+            ("aw", rr_write, wr_lock, wr_lock.full | ~w_order.sink.ready),
+            ("ar", rr_read,  rd_lock, rd_lock.full)]:
+            ax     = getattr(target, channel)
+            valids = Array(getattr(m, channel).valid for m in masters)
+            for name in _axi_channel_signals(ax):
+                if name in ["valid", "ready", "id"]:
+                    continue
+                choices = Array(getattr(getattr(m, channel), name) for m in masters)
+                self.comb += getattr(ax, name).eq(choices[rr.grant])
+            ids = Array(master_id(i, channel) for i in range(n))
+            self.comb += [
+                ax.id.eq(ids[rr.grant]),
+                ax.valid.eq(valids[rr.grant] & ~stall),
+                rr.request.eq(Cat(*[getattr(m, channel).valid for m in masters])),
+                # Switch to next request when the current one is accepted (or withdrawn).
+                rr.ce.eq(~valids[rr.grant] | (ax.valid & ax.ready)),
+            ]
+            for i, m in enumerate(masters):
+                self.comb += getattr(m, channel).ready.eq(ax.ready & ~stall & (rr.grant == i))
+        self.comb += [
+            w_order.sink.valid.eq(target.aw.valid & target.aw.ready),
+            w_order.sink.index.eq(rr_write.grant),
+        ]
+
+        # Write data channel.
+        for name in _axi_channel_signals(target.w):
+            if name in ["valid", "ready", "id"]:
+                continue
+            choices = Array(getattr(m.w, name) for m in masters)
+            self.comb += getattr(target.w, name).eq(choices[w_index])
+        w_valids = Array(m.w.valid for m in masters)
+        w_ids    = Array(master_id(i, "w") for i in range(n))
+        self.comb += [
+            target.w.id.eq(w_ids[w_index]),
+            target.w.valid.eq(w_order.source.valid & w_valids[w_index]),
+            w_order.source.ready.eq(target.w.valid & target.w.ready & target.w.last),
+        ]
+        for i, m in enumerate(masters):
+            self.comb += m.w.ready.eq(target.w.ready & w_order.source.valid & (w_index == i))
+
+        # Response channels.
+        for channel in ["b", "r"]:
+            resp   = getattr(target, channel)
+            index  = response_index(channel)
+            readys = Array(getattr(m, channel).ready for m in masters)
+            self.comb += resp.ready.eq(readys[index])
+            for i, m in enumerate(masters):
+                dest = getattr(m, channel)
+                for name in _axi_channel_signals(resp):
+                    if name == "valid":
+                        self.comb += dest.valid.eq(resp.valid & (index == i))
+                    elif name == "id":
+                        self.comb += dest.id.eq(resp.id[:id_width])
+                    elif name != "ready":
+                        self.comb += getattr(dest, name).eq(getattr(resp, name))
+
+class AXIDecoder(Module):
+    """AXI decoder
+
+    Decode master access to particular slave based on its decoder function.
+
+    slaves: [(decoder, slave), ...]
+        List of slaves with address decoders, where `decoder` is a function:
+            decoder(Signal(address_width - log2(data_width//8))) -> Signal(1)
+        that returns 1 when the slave is selected and 0 otherwise.
+
+    Up to `max_outstanding` bursts per direction can be outstanding, on a single slave (a burst to
+    another slave waits for the responses of the outstanding ones): the responses of an ID are then
+    returned in order. Routing is not done per ID: bursts of different IDs to different slaves are
+    serialized, only the slave can reorder the responses of the different IDs.
+
+    W data are routed to the slave of the accepted write bursts: W data presented before their AW
+    are held (`w.ready` low) until the AW is accepted.
+    """
+    def __init__(self, master, slaves, max_outstanding=16):
+        addr_shift = log2_int(master.data_width//8)
+
+        # # #
+
+        for direction, ax, w, resp, last in [
+            ("write", master.aw, master.w, master.b, 1),
+            ("read",  master.ar, None,     master.r, master.r.last)]:
+            channels = ["aw", "w", "b"] if direction == "write" else ["ar", "r"]
+            sel_dec  = Signal(len(slaves))
+            sel_reg  = Signal(len(slaves))
+
+            # Outstanding bursts.
+            lock = _AXILiteRequestCounter(
+                request  = ax.valid & ax.ready,
+                response = resp.valid & resp.ready & last,
+                max_requests = max_outstanding + 1)
+            self.submodules += lock
+
+            # Decode slave addresses.
+            for i, (decoder, bus) in enumerate(slaves):
+                self.comb += sel_dec[i].eq(decoder(ax.addr[addr_shift:]))
+
+            # New bursts to the selected slave, or to another one once all responses are received.
+            allow = Signal()
+            self.comb += allow.eq(lock.empty | ((sel_dec == sel_reg) & ~lock.full))
+            self.sync += If(ax.valid & ax.ready, sel_reg.eq(sel_dec))
+
+            # Address channel.
+            ax_readys = []
+            for i, (_, bus) in enumerate(slaves):
+                slave_ax = getattr(bus, channels[0])
+                for name in _axi_channel_signals(ax):
+                    if name == "valid":
+                        self.comb += slave_ax.valid.eq(ax.valid & allow & sel_dec[i])
+                    elif name != "ready":
+                        self.comb += getattr(slave_ax, name).eq(getattr(ax, name))
+                ax_readys.append(slave_ax.ready & sel_dec[i])
+            self.comb += ax.ready.eq(allow & reduce(or_, ax_readys))
+
+            # Write data channel (to the slave of the accepted bursts waiting for their data: all on
+            # sel_reg, since the outstanding bursts are on a single slave).
+            if w is not None:
+                w_pending = _AXILiteRequestCounter(
+                    request  = ax.valid & ax.ready,
+                    response = w.valid & w.ready & w.last,
+                    max_requests = max_outstanding + 1)
+                self.submodules += w_pending
+                w_sel = Signal(len(slaves))
+                self.comb += w_sel.eq(Replicate(~w_pending.empty, len(slaves)) & sel_reg)
+                w_readys = []
+                for i, (_, bus) in enumerate(slaves):
+                    for name in _axi_channel_signals(w):
+                        if name == "valid":
+                            self.comb += bus.w.valid.eq(w.valid & w_sel[i])
+                        elif name != "ready":
+                            self.comb += getattr(bus.w, name).eq(getattr(w, name))
+                    w_readys.append(bus.w.ready & w_sel[i])
+                self.comb += w.ready.eq(reduce(or_, w_readys))
+
+            # Response channel (from the slave of the outstanding bursts).
+            for name in _axi_channel_signals(resp):
+                if name == "ready":
+                    for i, (_, bus) in enumerate(slaves):
+                        self.comb += getattr(bus, channels[-1]).ready.eq(resp.ready & sel_reg[i])
+                else:
+                    masked = []
+                    for i, (_, bus) in enumerate(slaves):
+                        src = getattr(getattr(bus, channels[-1]), name)
+                        masked.append(src & Replicate(sel_reg[i], len(src)))
+                    self.comb += getattr(resp, name).eq(reduce(or_, masked))
+
+class AXIInterconnectShared(Module):
+    """AXI shared interconnect
+
+    The masters share an interface with `log2(len(masters))` more ID bits (see `AXIArbiter`).
+    """
+    def __init__(self, masters, slaves, max_outstanding=16):
+        masters = list(masters)
+        _check_axi_data_width(masters + [bus for _, bus in slaves])
+        shared = AXIInterface(
+            data_width    = masters[0].data_width,
+            address_width = masters[0].address_width,
+            id_width      = masters[0].id_width + log2_int(len(masters), need_pow2=False))
+        self.submodules.arbiter = AXIArbiter(masters, shared, max_outstanding)
+        self.submodules.decoder = AXIDecoder(shared, slaves, max_outstanding)
+
+class AXICrossbar(Module):
+    """AXI crossbar
+
+    MxN crossbar for M masters and N slaves. Bursts are kept and up to `max_outstanding` bursts
+    per direction can be outstanding on each master and on each slave (on a single slave for each
+    master). The slaves need `log2(M)` more ID bits than the masters (see `AXIArbiter`).
+    """
+    def __init__(self, masters, slaves, max_outstanding=16):
+        masters = list(masters)
+        _check_axi_data_width(masters + [bus for _, bus in slaves])
+        matches, busses = zip(*slaves)
+        access_m_s = [[AXIInterface(
+            data_width    = master.data_width,
+            address_width = master.address_width,
+            id_width      = master.id_width) for j in slaves] for master in masters]  # a[master][slave]
+        access_s_m = list(zip(*access_m_s))  # a[slave][master]
+        # Decode each master into its access row.
+        for slaves, master in zip(access_m_s, masters):
+            slaves = list(zip(matches, slaves))
+            self.submodules += AXIDecoder(master, slaves, max_outstanding)
+        # Arbitrate each access column onto its slave.
+        for masters, bus in zip(access_s_m, busses):
+            self.submodules += AXIArbiter(masters, bus, max_outstanding)
+
+def _check_axi_data_width(interfaces):
+    data_widths = set(interface.data_width for interface in interfaces)
+    if len(data_widths) > 1:
+        raise ValueError("Different data widths on AXI interconnect: {} (use converters).".format(
+            ", ".join(str(d) for d in sorted(data_widths))))
@@ -452,26 +452,54 @@ def memprefix(prefix, memories, done):
             done.add(memory.duid)
 
 
+def _autocsr_cache(obj):
+    # Per object cache of the gatherers, once the object is finalized (None before: CSRs can still
+    # be added to it or to its children).
+    if not getattr(obj, "finalized", False):
+        return None
+    try:
+        return obj._autocsr_cache
+    except AttributeError:
+        obj._autocsr_cache = {}
+        return obj._autocsr_cache
+
+
+def _autocsr_children(obj, cache):
+    # Attributes scanned by the gatherers (shared by all gatherers once cached).
+    if cache is not None and "children" in cache:
+        return cache["children"]
+    try:
+        exclude = obj.autocsr_exclude
+    except AttributeError:
+        exclude = {}
+    children = [(k, v) for k, v in xdir(obj, True) if k not in exclude and k != "_autocsr_cache"]
+    if cache is not None:
+        cache["children"] = children
+    return children
+
+
 def _make_gatherer(method, cls, prefix_cb):
     def gatherer(self):
-        try:
-            exclude = self.autocsr_exclude
-        except AttributeError:
-            exclude = {}
+        cache = _autocsr_cache(self)
+        if cache is not None and method in cache:
+            return list(cache[method])
         try:
             prefixed = self.__prefixed
         except AttributeError:
             prefixed = self.__prefixed = set()
         r = []
-        for k, v in xdir(self, True):
-            if k not in exclude:
-                if isinstance(v, cls):
-                    r.append(v)
-                elif hasattr(v, method) and callable(getattr(v, method)):
-                    items = getattr(v, method)()
-                    prefix_cb(k + "_", items, prefixed)
-                    r += items
-        return sorted(r, key=lambda x: x.duid)
+        for k, v in _autocsr_children(self, cache):
+            if isinstance(v, cls):
+                r.append(v)
+            elif hasattr(v, method) and callable(getattr(v, method)):
+                items = getattr(v, method)()
+                prefix_cb(k + "_", items, prefixed)
+                r += items
+        r = sorted(r, key=lambda x: x.duid)
+        if cache is not None:
+            cache[method] = r
+            r = list(r)
+        return r
     return gatherer
 
 
@@ -484,6 +512,9 @@ class AutoCSR:
     If the module has child objects that implement ``get_csrs``, ``get_memories`` or ``get_constants``,
     they will be called by the``AutoCSR`` methods and their CSR and memories added to the lists returned,
     with the child objects' names as prefixes.
+
+    The lists are memoized per object once the module is finalized: its CSRs, memories and
+    constants (and the ones of its children) must no longer change.
     """
     get_memories  = _make_gatherer("get_memories", Memory, memprefix)
     get_csrs      = _make_gatherer("get_csrs", _CSRBase, csrprefix)
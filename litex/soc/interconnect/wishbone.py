@@ -36,6 +36,24 @@ _layout = [
     ("err",              1, DIR_S_TO_M)
 ]
 
+# Cycle Type Identifier (cti) / Burst Type Extension (bte).
+CTI_BURST_NONE         = 0b000
+CTI_BURST_CONSTANT     = 0b001
+CTI_BURST_INCREMENTING = 0b010
+CTI_BURST_END          = 0b111
+
+BTE_BURST_LINEAR = 0b00
+BTE_BURST_4      = 0b01
+BTE_BURST_8      = 0b10
+BTE_BURST_16     = 0b11
+
+def burst_next_address(adr, bte):
+    """Address of the next access of an incrementing burst (linear or wrapped)"""
+    cases = {BTE_BURST_LINEAR: adr + 1}
+    for bte_value, bits in [(BTE_BURST_4, 2), (BTE_BURST_8, 3), (BTE_BURST_16, 4)]:
+        cases[bte_value] = Cat((adr[:bits] + 1)[:bits], adr[bits:])
+    return Array(cases[i] for i in range(4))[bte]
+
 
 class Interface(Record):
     def __init__(self, data_width=32, adr_width=30):
@@ -130,7 +148,13 @@ class InterconnectPointToPoint(Module):
 
 
 class Arbiter(Module):
-    def __init__(self, masters, target):
+    """Arbiter
+
+    Round-robin arbitration of masters on cyc: the grant only changes when the granted master
+    deasserts cyc, so bursts (cyc kept asserted) are not interrupted. The grant is also kept while
+    `hold` is asserted (e.g. access of the granted master still outstanding on the target).
+    """
+    def __init__(self, masters, target, hold=None):
         self.submodules.rr = roundrobin.RoundRobin(len(masters))
 
         # mux master->slave signals
@@ -152,6 +176,8 @@ class Arbiter(Module):
 
         # connect bus requests to round-robin selector
         reqs = [m.cyc for m in masters]
+        if hold is not None:
+            reqs = [req | (hold & (self.rr.grant == i)) for i, req in enumerate(reqs)]
         self.comb += self.rr.request.eq(Cat(*reqs))
 
 
@@ -205,8 +231,147 @@ class InterconnectShared(Module):
             self.submodules.timeout = Timeout(shared, timeout_cycles)
 
 
+class Buffer(Module):
+    """Buffer
+
+    Register slice between master and slave, to break the combinatorial paths of an interconnect.
+    `request` registers the request (adr/dat_w/sel/we, cyc/stb) to the slave, `response` registers
+    the response (ack/err/dat_r) to the master: each adds a cycle of latency to the accesses. An
+    access is outstanding (`busy`) from its capture to the return of its response to the master:
+    cyc is kept asserted to the slave until its ack and no other access is started meanwhile. The
+    access is aborted when the master deasserts cyc (e.g. on a `Timeout`): cyc is deasserted to the
+    slave and a late response is dropped. Accesses are classic (cti=CTI_BURST_NONE) on the slave.
+    """
+    def __init__(self, master, slave, request=True, response=True):
+        self.latency = int(request) + int(response)
+        self.busy    = Signal() # Outstanding access.
+
+        # # #
+
+        ack   = Signal()
+        err   = Signal()
+        dat_r = Signal(len(master.dat_r), reset_less=True)
+
+        # Request.
+        if request:
+            valid = Signal()
+            self.sync += [
+                If(master.cyc & master.stb & ~self.busy,
+                    valid.eq(1),
+                    self.busy.eq(1),
+                    slave.adr.eq(master.adr),
+                    slave.dat_w.eq(master.dat_w),
+                    slave.sel.eq(master.sel),
+                    slave.we.eq(master.we)
+                ),
+                If(slave.ack | slave.err,
+                    valid.eq(0)
+                ),
+                If(master.ack | master.err,
+                    self.busy.eq(0)
+                ),
+                # Aborted by the master.
+                If(~master.cyc,
+                    valid.eq(0),
+                    self.busy.eq(0)
+                )
+            ]
+            self.comb += [
+                slave.cyc.eq(valid),
+                slave.stb.eq(valid)
+            ]
+        else:
+            self.comb += [
+                slave.adr.eq(master.adr),
+                slave.dat_w.eq(master.dat_w),
+                slave.sel.eq(master.sel),
+                slave.we.eq(master.we),
+                slave.cyc.eq(master.cyc),
+                # Do not restart the access while its registered response is returned.
+                slave.stb.eq(master.stb & ~(ack | err)),
+                self.busy.eq(master.cyc & master.stb)
+            ]
+        self.comb += [
+            slave.cti.eq(CTI_BURST_NONE),
+            slave.bte.eq(BTE_BURST_LINEAR)
+        ]
+
+        # Response.
+        if response:
+            self.sync += [
+                ack.eq(master.cyc & slave.cyc & slave.stb & slave.ack),
+                err.eq(master.cyc & slave.cyc & slave.stb & slave.err),
+                dat_r.eq(slave.dat_r)
+            ]
+        else:
+            self.comb += [
+                ack.eq(slave.ack),
+                err.eq(slave.err),
+                dat_r.eq(slave.dat_r)
+            ]
+        self.comb += [
+            master.ack.eq(ack & master.cyc),
+            master.err.eq(err & master.cyc),
+            master.dat_r.eq(dat_r)
+        ]
+
+
 class Crossbar(Module):
-    def __init__(self, masters, slaves, register=False):
+    """Crossbar
+
+    Decodes each master to a row of accesses and arbitrates each column of accesses to its slave,
+    so that masters accessing different slaves are not serialized.
+
+    `request_stages`/`response_stages` (0 to 2) insert `Buffer`s on the request/response paths to
+    improve timing: the first request stage is on the slave ports (after the arbiters), the second
+    on the master ports (before the decoders); the first response stage is on the master ports, the
+    second on the slave ports. The buffers on the slave ports track the outstanding access of each
+    slave: the arbiter keeps its grant until the response has been returned (or the access aborted
+    by its master, see `Buffer`). Each stage adds a cycle of latency to the accesses (see `latency`
+    and `get_report`), accesses through the stages are classic.
+    """
+    def __init__(self, masters, slaves, register=False, request_stages=0, response_stages=0,
+        timeout_cycles=None):
+        for stages in [request_stages, response_stages]:
+            if stages not in [0, 1, 2]:
+                raise ValueError("Unsupported number of stages: {} (0, 1 or 2).".format(stages))
+        self.n_masters       = len(masters)
+        self.n_slaves        = len(slaves)
+        self.register        = register
+        self.request_stages  = request_stages
+        self.response_stages = response_stages
+        self.latency         = request_stages + response_stages
+        self.timeouts        = []
+
+        # # #
+
+        timeout_masters = masters
+
+        # master ports stages
+        master_request  = request_stages  >= 2
+        master_response = response_stages >= 1
+        if master_request or master_response:
+            buffered = []
+            for master in masters:
+                interface = Interface.like(master)
+                self.submodules += Buffer(master, interface, master_request, master_response)
+                buffered.append(interface)
+            masters = buffered
+
+        # slave ports stages
+        slave_request  = request_stages  >= 1
+        slave_response = response_stages >= 2
+        holds = [None]*len(slaves)
+        if slave_request or slave_response:
+            buffered = []
+            for n, (match, bus) in enumerate(slaves):
+                interface = Interface.like(bus)
+                buffer    = Buffer(interface, bus, slave_request, slave_response)
+                self.submodules += buffer
+                buffered.append((match, interface))
+                holds[n] = buffer.busy
+            slaves = buffered
+
         matches, busses = zip(*slaves)
         access = [[Interface() for j in slaves] for i in masters]
         # decode each master into its access row
@@ -214,8 +379,26 @@ class Crossbar(Module):
             row = list(zip(matches, row))
             self.submodules += Decoder(master, row, register)
         # arbitrate each access column onto its slave
-        for column, bus in zip(zip(*access), busses):
-            self.submodules += Arbiter(column, bus)
+        for column, bus, hold in zip(zip(*access), busses, holds):
+            self.submodules += Arbiter(column, bus, hold)
+
+        # master ports timeouts (after the stages/decoders, to override their responses)
+        if timeout_cycles is not None:
+            for master in timeout_masters:
+                timeout = Timeout(master, timeout_cycles)
+                self.timeouts.append(timeout)
+                self.submodules += timeout
+
+    def get_report(self):
+        def stages(n, first, second):
+            ports = [first, second][:n]
+            return "{} ({})".format(n, ", ".join(ports)) if n else "0"
+        r = "{} masters <-> {} slaves, {}registered slave select.\n".format(
+            self.n_masters, self.n_slaves, "" if self.register else "un")
+        r += "Request  stages: {}.\n".format(stages(self.request_stages, "slave ports", "master ports"))
+        r += "Response stages: {}.\n".format(stages(self.response_stages, "master ports", "slave ports"))
+        r += "Added latency  : {} cycle(s) per access.".format(self.latency)
+        return r
 
 # Wishbone Data Width Converter --------------------------------------------------------------------
 
@@ -232,6 +415,10 @@ class DownConverter(Module):
         Read from master are splitted in N reads to the the slave. Read datas from
         the slave are cached before being presented concatenated on the last access.
 
+    During the linear incrementing bursts of the master, the N accesses of the slave are done as
+    an incrementing burst, continued over the accesses of the master (and ended with its last
+    access). Classic accesses of the master are split in classic accesses of the slave, skipping
+    the sub-words without selected bytes.
     """
     def __init__(self, master, slave):
         dw_from = len(master.dat_w)
@@ -240,37 +427,54 @@ class DownConverter(Module):
 
         # # #
 
-        skip    = Signal()
-        counter = Signal(max=ratio)
+        skip     = Signal()
+        done     = Signal()
+        burst    = Signal()
+        bursting = Signal() # Burst of the master in progress (previous access was a burst access).
+        counter  = Signal(max=ratio)
 
         # Control Path
-        fsm = FSM(reset_state="IDLE")
-        fsm = ResetInserter()(fsm)
-        self.submodules.fsm = fsm
-        self.comb += fsm.reset.eq(~master.cyc)
-        fsm.act("IDLE",
-            NextValue(counter, 0),
-            If(master.stb & master.cyc,
-                NextState("CONVERT"),
-            )
-        )
-        fsm.act("CONVERT",
+        self.comb += [
+            burst.eq((master.cti == CTI_BURST_INCREMENTING) & (master.bte == BTE_BURST_LINEAR)),
             slave.adr.eq(Cat(counter, master.adr)),
             Case(counter, {i: slave.sel.eq(master.sel[i*dw_to//8:]) for i in range(ratio)}),
-            If(master.stb & master.cyc,
-                skip.eq(slave.sel == 0),
-                slave.we.eq(master.we),
-                slave.cyc.eq(~skip),
-                slave.stb.eq(~skip),
-                If(slave.ack | skip,
-                    NextValue(counter, counter + 1),
-                    If(counter == (ratio - 1),
-                        master.ack.eq(1),
-                        NextState("IDLE")
-                    )
+            skip.eq((slave.sel == 0) & ~burst),
+            slave.we.eq(master.we),
+            slave.cyc.eq(master.cyc),
+            slave.stb.eq(master.stb & ~skip),
+            done.eq(master.cyc & master.stb & (slave.ack | skip)),
+            master.ack.eq(done & (counter == (ratio - 1))),
+        ]
+        self.sync += [
+            If(~master.cyc,
+                counter.eq(0)
+            ).Elif(done,
+                counter.eq(counter + 1),
+                If(counter == (ratio - 1),
+                    counter.eq(0)
                 )
+            ),
+            If(~master.cyc,
+                bursting.eq(0)
+            ).Elif(master.ack,
+                bursting.eq(burst)
             )
-        )
+        ]
+
+        # Burst (only during the bursts of the master): continued while the next access is at the
+        # next address of the slave.
+        cti_cases = {}
+        for i in range(ratio):
+            if i < (ratio - 1):
+                next_selected = master.sel[(i + 1)*dw_to//8:(i + 2)*dw_to//8] != 0
+                cti = Mux(burst | next_selected, CTI_BURST_INCREMENTING, CTI_BURST_END)
+            else:
+                cti = Mux(burst, CTI_BURST_INCREMENTING, CTI_BURST_END)
+            cti_cases[i] = slave.cti.eq(Mux(burst | bursting, cti, CTI_BURST_NONE))
+        self.comb += [
+            Case(counter, cti_cases),
+            slave.bte.eq(BTE_BURST_LINEAR),
+        ]
 
         # Write Datapath
         self.comb += Case(counter, {i: slave.dat_w.eq(master.dat_w[i*dw_to:]) for i in range(ratio)})
@@ -278,10 +482,14 @@ class DownConverter(Module):
         # Read Datapath
         dat_r = Signal(dw_from, reset_less=True)
         self.comb += master.dat_r.eq(Cat(dat_r[dw_to:], slave.dat_r))
-        self.sync += If(slave.ack | skip, dat_r.eq(master.dat_r))
+        self.sync += If(done, dat_r.eq(master.dat_r))
 
 class UpConverter(Module):
-    """UpConverter"""
+    """UpConverter
+
+    Linear incrementing bursts of the master are converted to bursts of the slave (accesses to
+    the same word of the slave being CTI_BURST_CONSTANT), wrapped bursts to classic accesses.
+    """
     def __init__(self, master, slave):
         dw_from = len(master.dat_w)
         dw_to   = len(slave.dat_w)
@@ -289,7 +497,20 @@ class UpConverter(Module):
 
         # # #
 
-        self.comb += master.connect(slave, omit={"adr", "sel", "dat_w", "dat_r"})
+        self.comb += master.connect(slave, omit={"adr", "sel", "dat_w", "dat_r", "cti", "bte"})
+        last_subword = master.adr[:int(log2(ratio))] == (ratio - 1)
+        self.comb += [
+            If(master.cti == CTI_BURST_INCREMENTING,
+                If(master.bte == BTE_BURST_LINEAR,
+                    slave.cti.eq(Mux(last_subword, CTI_BURST_INCREMENTING, CTI_BURST_CONSTANT))
+                ).Else(
+                    slave.cti.eq(CTI_BURST_NONE)
+                )
+            ).Else(
+                slave.cti.eq(master.cti)
+            ),
+            slave.bte.eq(BTE_BURST_LINEAR),
+        ]
         cases = {}
         for i in range(ratio):
             cases[i] = [
@@ -327,7 +548,16 @@ class Converter(Module):
 # Wishbone SRAM ------------------------------------------------------------------------------------
 
 class SRAM(Module):
-    def __init__(self, mem_or_size, read_only=None, init=None, bus=None):
+    """SRAM
+
+    Wishbone SRAM, acking single accesses in 2 cycles.
+
+    With burst=True, bursts (cti=CTI_BURST_INCREMENTING, linear or wrapped, or
+    CTI_BURST_CONSTANT) are acked on each cycle: the next word of the burst is read while the
+    current one is acked. The master has to keep cyc asserted and the addresses of the burst until
+    the end of the burst (cti=CTI_BURST_END), but can insert wait states (stb deasserted).
+    """
+    def __init__(self, mem_or_size, read_only=None, init=None, bus=None, burst=False):
         if bus is None:
             bus = Interface()
         self.bus = bus
@@ -354,17 +584,33 @@ class SRAM(Module):
             self.comb += [port.we[i].eq(self.bus.cyc & self.bus.stb & self.bus.we & self.bus.sel[i])
                 for i in range(bus_data_width//8)]
         # address and data
-        self.comb += [
-            port.adr.eq(self.bus.adr[:len(port.adr)]),
-            self.bus.dat_r.eq(port.dat_r)
-        ]
+        if burst:
+            burst_next = Signal()
+            self.comb += [
+                burst_next.eq(self.bus.cyc & self.bus.stb & self.bus.ack &
+                    (self.bus.cti == CTI_BURST_INCREMENTING)),
+                If(burst_next & ~self.bus.we,
+                    port.adr.eq(burst_next_address(self.bus.adr, self.bus.bte)[:len(port.adr)])
+                ).Else(
+                    port.adr.eq(self.bus.adr[:len(port.adr)])
+                )
+            ]
+        else:
+            self.comb += port.adr.eq(self.bus.adr[:len(port.adr)])
+        self.comb += self.bus.dat_r.eq(port.dat_r)
         if not read_only:
             self.comb += port.dat_w.eq(self.bus.dat_w),
         # generate ack
-        self.sync += [
-            self.bus.ack.eq(0),
-            If(self.bus.cyc & self.bus.stb & ~self.bus.ack, self.bus.ack.eq(1))
-        ]
+        if burst:
+            ack = Signal()
+            self.sync += ack.eq(self.bus.cyc & self.bus.stb & (~self.bus.ack |
+                (self.bus.cti == CTI_BURST_INCREMENTING) | (self.bus.cti == CTI_BURST_CONSTANT)))
+            self.comb += self.bus.ack.eq(ack & self.bus.cyc & self.bus.stb)
+        else:
+            self.sync += [
+                self.bus.ack.eq(0),
+                If(self.bus.cyc & self.bus.stb & ~self.bus.ack, self.bus.ack.eq(1))
+            ]
 
 # Wishbone To CSR ----------------------------------------------------------------------------------
 
@@ -426,6 +672,9 @@ class Cache(Module):
 
     This module is a write-back wishbone cache that can be used as a L2 cache.
     Cachesize (in 32-bit words) is the size of the data store and must be a power of 2
+
+    Read hits of incrementing bursts of the master are acked on each cycle. Lines are evicted and
+    refilled with incrementing bursts of the slave.
     """
     def __init__(self, cachesize, master, slave, reverse=True):
         self.master = master
@@ -450,6 +699,17 @@ class Cache(Module):
         adr_offset, adr_line, adr_tag = split(master.adr, offsetbits, linebits, tagbits)
         word = Signal(wordbits) if wordbits else None
 
+        # Address of the memories: next address of the burst when a read hit of an incrementing
+        # burst is acked, so that it can be tested on the next cycle.
+        burst_next = Signal()
+        adr_mem    = Signal(len(master.adr))
+        self.comb += If(burst_next,
+            adr_mem.eq(burst_next_address(master.adr, master.bte))
+        ).Else(
+            adr_mem.eq(master.adr)
+        )
+        adr_mem_offset, adr_mem_line, _ = split(adr_mem, offsetbits, linebits, tagbits)
+
         # Data memory
         data_mem = Memory(dw_to*2**wordbits, 2**linebits)
         data_port = data_mem.get_port(write_capable=True, we_granularity=8)
@@ -460,10 +720,10 @@ class Cache(Module):
             adr_offset_r = None
         else:
             adr_offset_r = Signal(offsetbits, reset_less=True)
-            self.sync += adr_offset_r.eq(adr_offset)
+            self.sync += adr_offset_r.eq(adr_mem_offset)
 
         self.comb += [
-            data_port.adr.eq(adr_line),
+            data_port.adr.eq(adr_mem_line),
             If(write_from_slave,
                 displacer(slave.dat_r, word, data_port.dat_w),
                 displacer(Replicate(1, dw_to//8), word, data_port.we)
@@ -492,7 +752,7 @@ class Cache(Module):
         ]
 
         self.comb += [
-            tag_port.adr.eq(adr_line),
+            tag_port.adr.eq(adr_mem_line),
             tag_di.tag.eq(adr_tag)
         ]
         if word is not None:
@@ -518,6 +778,12 @@ class Cache(Module):
             else:
                 return 1
 
+        # Slave bursts (evictions/refills)
+        self.comb += [
+            slave.cti.eq(Mux(word_is_last(word), CTI_BURST_END, CTI_BURST_INCREMENTING)),
+            slave.bte.eq(BTE_BURST_LINEAR),
+        ]
+
         # Control FSM
         self.submodules.fsm = fsm = FSM(reset_state="IDLE")
         fsm.act("IDLE",
@@ -527,13 +793,21 @@ class Cache(Module):
         )
         fsm.act("TEST_HIT",
             word_clr.eq(1),
-            If(tag_do.tag == adr_tag,
+            If(~(master.cyc & master.stb),
+                # Wait state of a burst.
+                NextState("IDLE")
+            ).Elif(tag_do.tag == adr_tag,
                 master.ack.eq(1),
                 If(master.we,
                     tag_di.dirty.eq(1),
-                    tag_port.we.eq(1)
-                ),
-                NextState("IDLE")
+                    tag_port.we.eq(1),
+                    NextState("IDLE")
+                ).Elif(master.cti == CTI_BURST_INCREMENTING,
+                    burst_next.eq(1),
+                    NextState("TEST_HIT")
+                ).Else(
+                    NextState("IDLE")
+                )
             ).Else(
                 If(tag_do.dirty,
                     NextState("EVICT")
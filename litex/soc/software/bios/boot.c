@@ -218,6 +218,59 @@ int serialboot(void)
 					uart_write(SFL_ACK_SUCCESS);
 				break;
 			}
+			case SFL_CMD_FILL: {
+				failed = 0;
+				memset((char *) get_uint32(&frame.payload[0]), frame.payload[8],
+					get_uint32(&frame.payload[4]));
+				uart_write(SFL_ACK_SUCCESS);
+				break;
+			}
+			case SFL_CMD_LOAD_LZ: {
+				/* Tokens:
+				 * - 0b0nnnnnnn: literal, followed by n + 1 bytes.
+				 * - 0b1nnnnnnn, offset (16-bit): copy of n + 3 bytes from offset bytes
+				 *   before the write pointer (can reference previous frames).
+				 */
+				char *writepointer;
+				unsigned int n;
+				unsigned int offset;
+
+				failed = 0;
+				writepointer = (char *) get_uint32(&frame.payload[0]);
+				i = 4;
+				while(i < frame.payload_length) {
+					n = frame.payload[i++];
+					if(n & 0x80) {
+						n = (n & 0x7f) + 3;
+						offset = ((unsigned int)frame.payload[i] << 8) | frame.payload[i+1];
+						i += 2;
+						/* Byte copy: source and destination can overlap. */
+						while(n--) {
+							*writepointer = *(writepointer - offset);
+							writepointer++;
+						}
+					} else {
+						n = n + 1;
+						while(n--)
+							*(writepointer++) = frame.payload[i++];
+					}
+				}
+				uart_write(SFL_ACK_SUCCESS);
+				break;
+			}
+			case SFL_CMD_CRC: {
+				uint32_t crc;
+
+				failed = 0;
+				crc = crc32((unsigned char *) get_uint32(&frame.payload[0]),
+					get_uint32(&frame.payload[4]));
+				uart_write(SFL_ACK_SUCCESS);
+				uart_write((crc >> 24) & 0xff);
+				uart_write((crc >> 16) & 0xff);
+				uart_write((crc >>  8) & 0xff);
+				uart_write((crc >>  0) & 0xff);
+				break;
+			}
 			case SFL_CMD_JUMP: {
 				uint32_t addr;
 
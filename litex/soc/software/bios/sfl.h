@@ -21,6 +21,9 @@ struct sfl_frame {
 #define SFL_CMD_JUMP		0x02
 #define SFL_CMD_FLASH		0x04
 #define SFL_CMD_REBOOT		0x05
+#define SFL_CMD_FILL		0x06 /* Address, length, value: fill memory with value. */
+#define SFL_CMD_LOAD_LZ		0x07 /* Address, LZ compressed data (see serialboot). */
+#define SFL_CMD_CRC		0x08 /* Address, length: reply K followed by the memory CRC32. */
 
 /* Replies */
 #define SFL_ACK_SUCCESS		'K'
@@ -9,17 +9,39 @@
 
 import os
 import argparse
+import time
 import socket
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
 
 from litex.tools.remote.etherbone import EtherbonePacket, EtherboneRecord
 from litex.tools.remote.etherbone import EtherboneReads, EtherboneWrites
 from litex.tools.remote.etherbone import EtherboneIPC
 from litex.tools.remote.csr_builder import CSRBuilder
+from litex.tools.remote.memory import MemoryAccess
 
 # Remote Client ------------------------------------------------------------------------------------
 
-class RemoteClient(EtherboneIPC, CSRBuilder):
-    def __init__(self, host="localhost", port=1234, base_address=0, csr_csv=None, csr_data_width=None, debug=False):
+class RemoteClient(EtherboneIPC, CSRBuilder, MemoryAccess):
+    """Etherbone client of litex_server
+
+    Accesses are pipelined: `read_async` sends the request and returns a Future, replies are
+    received by a background thread (in order, since the server handles the packets of a connection
+    sequentially) and up to `max_outstanding` read packets can be in flight. `read` is `read_async`
+    followed by a wait on the result and `write` does not wait (the server does not acknowledge
+    writes).
+
+    In a `batch()` block, accesses are queued instead of sent: consecutive reads are packed in
+    records of up to 255 reads and all the packets are sent at once when the block exits. Futures
+    returned by `read_async` in the block are completed after the block.
+    """
+    mem_read_burst  = 255
+    mem_write_burst = 255
+
+    def __init__(self, host="localhost", port=1234, base_address=0, csr_csv=None, csr_data_width=None, debug=False,
+        max_outstanding=16):
         # If csr_csv set to None and local csr.csv file exists, use it.
         if csr_csv is None and os.path.exists("csr.csv"):
             csr_csv = "csr.csv"
@@ -29,61 +51,216 @@ class RemoteClient(EtherboneIPC, CSRBuilder):
         # Else if csr_data_width set to None, force to csr_data_width 32-bit.
         elif csr_data_width is None:
             csr_data_width = 32
-        self.host         = host
-        self.port         = port
-        self.base_address = base_address
-        self.debug        = debug
+        self.host            = host
+        self.port            = port
+        self.base_address    = base_address
+        self.debug           = debug
+        self.max_outstanding = max_outstanding
+        self.batched         = None
 
     def open(self):
         if hasattr(self, "socket"):
             return
         self.socket = socket.create_connection((self.host, self.port), 5.0)
         self.socket.settimeout(5.0)
+        self.lock     = threading.Lock()
+        self.pending  = deque()
+        self.slots    = threading.Semaphore(self.max_outstanding)
+        self.closing  = False
+        self.error    = None
+        self.deadline = None
+        self.receiver = threading.Thread(target=self._receive_thread, daemon=True)
+        self.receiver.start()
 
     def close(self):
         if not hasattr(self, "socket"):
             return
+        self.closing = True
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.receiver.join()
         self.socket.close()
         del self.socket
 
-    def read(self, addr, length=None, burst="incr"):
-        length_int = 1 if length is None else length
-        # Prepare packet
-        record = EtherboneRecord()
-        incr = (burst == "incr")
-        record.reads  = EtherboneReads(addrs=[self.base_address + addr + 4*incr*j for j in range(length_int)])
-        record.rcount = len(record.reads)
+    # Receive --------------------------------------------------------------------------------------
 
-        # Send packet
-        packet = EtherbonePacket()
-        packet.records = [record]
-        packet.encode()
-        self.send_packet(self.socket, packet)
+    def _fail(self, error):
+        with self.lock:
+            self.error = error
+            requests, self.pending = self.pending, deque()
+        for request in requests:
+            self.slots.release()
+            for addrs, future, single in request:
+                future.set_exception(error)
 
-        # Receive response
-        packet = EtherbonePacket(self.receive_packet(self.socket))
-        packet.decode()
-        datas = packet.records.pop().writes.get_datas()
-        if self.debug:
-            for i, data in enumerate(datas):
-                print("read 0x{:08x} @ 0x{:08x}".format(data, self.base_address + addr + 4*i))
-        return datas[0] if length is None else datas
+    def _receive_thread(self):
+        while True:
+            try:
+                packet = self.receive_packet(self.socket)
+            except socket.timeout:
+                if not self.pending or time.monotonic() < self.deadline:
+                    continue
+                # A late reply would be matched with the wrong request: give up the connection.
+                self._fail(TimeoutError("No reply from {}:{}".format(self.host, self.port)))
+                return
+            except OSError as e:
+                self._fail(e)
+                return
+            if packet == 0:
+                self._fail(ConnectionError("Connection closed" if self.closing else
+                    "Connection closed by {}:{}".format(self.host, self.port)))
+                return
+            packet = EtherbonePacket(packet)
+            packet.decode()
+            datas = packet.records.pop().writes.get_datas()
+            with self.lock:
+                request       = self.pending.popleft()
+                self.deadline = time.monotonic() + self.socket.gettimeout()
+            self.slots.release()
+            offset = 0
+            for addrs, future, single in request:
+                _datas  = datas[offset:offset + len(addrs)]
+                offset += len(addrs)
+                if self.debug:
+                    for addr, data in zip(addrs, _datas):
+                        print("read 0x{:08x} @ 0x{:08x}".format(data, addr))
+                future.set_result(_datas[0] if single else _datas)
 
-    def write(self, addr, datas):
-        datas = datas if isinstance(datas, list) else [datas]
-        record = EtherboneRecord()
-        record.writes = EtherboneWrites(base_addr=self.base_address + addr, datas=[d for d in datas])
-        record.wcount = len(record.writes)
+    # Send -----------------------------------------------------------------------------------------
 
+    def _encode(self, reads=None, writes=None):
+        record = EtherboneRecord()
+        if reads is not None:
+            record.reads  = EtherboneReads(addrs=reads)
+            record.rcount = len(record.reads)
+        if writes is not None:
+            record.writes = EtherboneWrites(base_addr=writes[0], datas=writes[1])
+            record.wcount = len(record.writes)
         packet = EtherbonePacket()
         packet.records = [record]
         packet.encode()
-        self.send_packet(self.socket, packet)
+        return packet.bytes
+
+    def _send(self, packets):
+        # packets: list of (bytes, request) with request None for writes. Packets are sent in as few
+        # sendall as possible, waiting for a free slot when max_outstanding reads are in flight.
+        data     = bytearray()
+        requests = []
+        def send():
+            with self.lock:
+                if self.error is not None:
+                    raise self.error
+                if requests and not self.pending:
+                    self.deadline = time.monotonic() + self.socket.gettimeout()
+                self.pending.extend(requests)
+                self.socket.sendall(data)
+            data.clear()
+            requests.clear()
+        for packet, request in packets:
+            if request is not None:
+                if not self.slots.acquire(blocking=False):
+                    if data:
+                        send()
+                    self.slots.acquire()
+                requests.append(request)
+            data += packet
+        if data:
+            send()
+
+    def _flush(self, operations):
+        packets = []
+        reads   = []
+        request = []
+        for operation in operations + [None]:
+            if operation is not None and operation[0] == "read":
+                addrs, future, single = operation[1:]
+                if len(reads) + len(addrs) <= 255:
+                    reads   += addrs
+                    request += [(addrs, future, single)]
+                    continue
+            if reads:
+                packets.append((self._encode(reads=reads), request))
+                reads   = []
+                request = []
+            if operation is None:
+                break
+            if operation[0] == "read":
+                reads   = list(addrs)
+                request = [(addrs, future, single)]
+            else:
+                packets.append((operation[1], None))
+        self._send(packets)
+
+    @contextmanager
+    def batch(self):
+        """Queue the accesses of the block and send them at once on exit."""
+        assert self.batched is None
+        self.batched = []
+        try:
+            yield self
+        finally:
+            operations, self.batched = self.batched, None
+            self._flush(operations)
+
+    # Read / Write ---------------------------------------------------------------------------------
+
+    def read_async(self, addr, length=None, burst="incr"):
+        length_int = 1 if length is None else length
+        incr  = (burst == "incr")
+        addrs = [self.base_address + addr + 4*incr*j for j in range(length_int)]
+        if len(addrs) > 255:
+            raise ValueError(f"Burst size of {len(addrs)} exceeds maximum of 255 allowed by Etherbone.")
+        future    = Future()
+        operation = ("read", addrs, future, length is None)
+        if self.batched is not None:
+            self.batched.append(operation)
+        else:
+            self._flush([operation])
+        return future
+
+    def read(self, addr, length=None, burst="incr"):
+        future = self.read_async(addr, length, burst)
+        if self.batched:
+            # Blocking read in a batch: send what has been queued so far.
+            operations, self.batched = self.batched, []
+            self._flush(operations)
+        return future.result()
+
+    def write(self, addr, datas):
+        datas  = datas if isinstance(datas, list) else [datas]
+        packet = self._encode(writes=(self.base_address + addr, datas))
+        if self.batched is not None:
+            self.batched.append(("write", packet))
+        else:
+            self._send([(packet, None)])
 
         if self.debug:
             for i, data in enumerate(datas):
                 print("write 0x{:08x} @ 0x{:08x}".format(data, self.base_address + addr + 4*i))
 
+    def _read_words(self, addr, nwords):
+        # Bursts are pipelined, read_async blocks when max_outstanding reads are in flight.
+        futures = deque()
+        for offset in range(0, nwords, self.mem_read_burst):
+            length = min(self.mem_read_burst, nwords - offset)
+            futures.append((offset, self.read_async(addr + 4*offset, length)))
+            while futures and futures[0][1].done():
+                offset, future = futures.popleft()
+                yield offset, future.result()
+        for offset, future in futures:
+            yield offset, future.result()
+
+    def _write_words(self, addr, words):
+        # Writes are not acknowledged: send them in batches.
+        batch = 16*self.mem_write_burst
+        for offset in range(0, len(words), batch):
+            with self.batch():
+                for n in MemoryAccess._write_words(self, addr + 4*offset, words[offset:offset + batch]):
+                    pass
+            yield min(batch, len(words) - offset)
+
 # Utils --------------------------------------------------------------------------------------------
 
 def dump_identifier(port):
@@ -14,6 +14,7 @@ import sys
 import socket
 import time
 import threading
+from collections import deque
 
 from litex.tools.remote.etherbone import EtherbonePacket, EtherboneRecord, EtherboneWrites
 from litex.tools.remote.etherbone import EtherboneIPC
@@ -66,14 +67,66 @@ def _read_merger(addrs, max_length=256, bursts=["incr", "fixed"]):
             burst_type   = "incr"
     yield (burst_base, burst_length, burst_type)
 
+# Remote Server Stats ------------------------------------------------------------------------------
+
+class RemoteServerStats:
+    def __init__(self):
+        self.transactions = 0   # Etherbone records handled.
+        self.reads        = 0   # Words read.
+        self.writes       = 0   # Words written.
+        self.comm_reads   = 0   # Reads issued to comm (after merging).
+        self.depth        = 0   # Transactions queued.
+        self.max_depth    = 0
+        self.latency      = 0.0 # Total queuing + execution latency (s).
+        self.max_latency  = 0.0
+
+    def __str__(self):
+        latency = self.latency/self.transactions if self.transactions else 0
+        return ("transactions: {} / reads: {} ({} comm reads) / writes: {} / "
+            "depth: {} (max {}) / latency: {:.3f}ms (max {:.3f}ms)".format(
+            self.transactions, self.reads, self.comm_reads, self.writes,
+            self.depth, self.max_depth, 1e3*latency, 1e3*self.max_latency))
+
 # Remote Server ------------------------------------------------------------------------------------
 
+class _RemoteClient:
+    def __init__(self, socket, addr):
+        self.socket = socket
+        self.addr   = addr
+        self.queue  = deque() # (record, enqueue time)
+        self.busy   = 0       # Transactions being executed.
+        self.closed = False   # Connection closed by the server (comm error).
+
+
 class RemoteServer(EtherboneIPC):
-    def __init__(self, comm, bind_ip, bind_port=1234):
+    """Etherbone server
+
+    Each connected client has its own queue of transactions (Etherbone records), filled by the
+    client's thread. A single scheduler thread owns the comm: each round, it takes the first
+    transaction of each client (round-robin, so that clients are served fairly), executes the writes
+    and merges the reads of all the clients in bursts before issuing them to the comm.
+
+    Etherbone has no error reply: when the comm fails, the connections of the clients of the round
+    are closed (their pending reads then fail) and their queued transactions dropped.
+    """
+    def __init__(self, comm, bind_ip, bind_port=1234, max_queue=64):
         self.comm      = comm
         self.bind_ip   = bind_ip
         self.bind_port = bind_port
-        self.lock      = False
+        self.max_queue = max_queue
+        self.clients   = []
+        self.cond      = threading.Condition()
+        self.running   = False
+        self.stats     = RemoteServerStats()
+
+        # Read bursts supported by the comm.
+        self.max_read_length = {
+            "CommUART": getattr(comm, "max_burst", 255),
+            "CommUDP":    1,
+        }.get(self.comm.__class__.__name__, 1)
+        self.read_bursts = {
+            "CommUART": ["incr", "fixed"]
+        }.get(self.comm.__class__.__name__, ["incr"])
 
     def open(self):
         if hasattr(self, "socket"):
@@ -85,20 +138,125 @@ class RemoteServer(EtherboneIPC):
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.socket.bind((self.bind_ip, self.bind_port))
         print("tcp port: {:d}".format(self.bind_port))
-        self.socket.listen(1)
+        self.socket.listen(8)
         self.comm.open()
 
     def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if hasattr(self, "schedule_thread"):
+            self.schedule_thread.join()
         self.comm.close()
         if not hasattr(self, "socket"):
             return
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
         self.socket.close()
         del self.socket
 
+    # Scheduler ------------------------------------------------------------------------------------
+
+    def _schedule_thread(self):
+        while True:
+            with self.cond:
+                while self.running and not any(client.queue for client in self.clients):
+                    self.cond.wait()
+                if not self.running:
+                    return
+                transactions = []
+                for client in self.clients:
+                    if client.queue:
+                        client.busy += 1
+                        transactions.append((client, *client.queue.popleft()))
+                # Rotate the clients so that none of them is always served first.
+                self.clients.append(self.clients.pop(0))
+                self.stats.depth -= len(transactions)
+                # Wake up the clients waiting for room in their queue.
+                self.cond.notify_all()
+            try:
+                self._execute(transactions)
+            except Exception as e:
+                print("Error: {}".format(e))
+                for client, record, t in transactions:
+                    self._close_client(client)
+            finally:
+                with self.cond:
+                    for client, record, t in transactions:
+                        client.busy -= 1
+                    self.cond.notify_all()
+
+    def _execute(self, transactions):
+        # Handle writes.
+        for client, record, t in transactions:
+            if record.writes != None:
+                datas = record.writes.get_datas()
+                self.comm.write(record.writes.base_addr, datas)
+                self.stats.writes += len(datas)
+
+        # Handle reads, merged across clients.
+        addrs = []
+        for client, record, t in transactions:
+            if record.reads != None:
+                addrs += record.reads.get_addrs()
+        reads = []
+        if addrs:
+            for addr, length, burst in _read_merger(addrs,
+                max_length  = self.max_read_length,
+                bursts      = self.read_bursts):
+                reads += self.comm.read(addr, length, burst)
+                self.stats.comm_reads += 1
+            self.stats.reads += len(addrs)
+
+        # Send the replies.
+        offset = 0
+        for client, record, t in transactions:
+            latency = time.perf_counter() - t
+            self.stats.transactions += 1
+            self.stats.latency      += latency
+            self.stats.max_latency   = max(self.stats.max_latency, latency)
+            if record.reads != None:
+                length  = len(record.reads.get_addrs())
+                record  = EtherboneRecord()
+                record.writes = EtherboneWrites(datas=reads[offset:offset + length])
+                record.wcount = len(record.writes)
+                offset += length
+
+                packet = EtherbonePacket()
+                packet.records = [record]
+                packet.encode()
+                try:
+                    self.send_packet(client.socket, packet)
+                except OSError:
+                    pass
+
+    # Clients --------------------------------------------------------------------------------------
+
+    def _close_client(self, client):
+        # Drop the queued transactions and close the connection (the client's thread then exits).
+        with self.cond:
+            client.closed = True
+            self.stats.depth -= len(client.queue)
+            client.queue.clear()
+            self.cond.notify_all()
+        try:
+            client.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
     def _serve_thread(self):
+        server_socket = self.socket
         while True:
-            client_socket, addr = self.socket.accept()
+            try:
+                client_socket, addr = server_socket.accept()
+            except OSError:
+                return
             print("Connected with " + addr[0] + ":" + str(addr[1]))
+            client = _RemoteClient(client_socket, addr)
+            with self.cond:
+                self.clients.append(client)
             try:
                 while True:
                     try:
@@ -110,54 +268,36 @@ class RemoteServer(EtherboneIPC):
                     packet = EtherbonePacket(packet)
                     packet.decode()
 
-                    record = packet.records.pop()
-
-                    # Wait for lock
-                    while self.lock:
-                        time.sleep(0.01)
-
-                    # Set lock
-                    self.lock = True
-
-                    # Handle writes:
-                    if record.writes != None:
-                        self.comm.write(record.writes.base_addr, record.writes.get_datas())
-
-                    # Handle reads
-                    if record.reads != None:
-                        max_length = {
-                            "CommUART": 256,
-                            "CommUDP":    1,
-                        }.get(self.comm.__class__.__name__, 1)
-                        bursts = {
-                            "CommUART": ["incr", "fixed"]
-                        }.get(self.comm.__class__.__name__, ["incr"])
-                        reads = []
-                        for addr, length, burst in _read_merger(record.reads.get_addrs(),
-                            max_length  = max_length,
-                            bursts      = bursts):
-                            reads += self.comm.read(addr, length, burst)
-
-                        record = EtherboneRecord()
-                        record.writes = EtherboneWrites(datas=reads)
-                        record.wcount = len(record.writes)
-
-                        packet = EtherbonePacket()
-                        packet.records = [record]
-                        packet.encode()
-                        self.send_packet(client_socket, packet)
-
-                    # release lock
-                    self.lock = False
+                    with self.cond:
+                        # Wait for room in the queue.
+                        while self.running and not client.closed and len(client.queue) >= self.max_queue:
+                            self.cond.wait()
+                        if client.closed:
+                            break
+                        t = time.perf_counter()
+                        for record in packet.records:
+                            client.queue.append((record, t))
+                        self.stats.depth    += len(packet.records)
+                        self.stats.max_depth = max(self.stats.max_depth, self.stats.depth)
+                        self.cond.notify_all()
 
             finally:
+                # Let the queued transactions (writes) complete before disconnecting.
+                with self.cond:
+                    while self.running and (client.queue or client.busy):
+                        self.cond.wait()
+                    self.stats.depth -= len(client.queue)
+                    self.clients.remove(client)
                 print("Disconnect")
                 client_socket.close()
 
     def start(self, nthreads):
+        self.running = True
+        self.schedule_thread = threading.Thread(target=self._schedule_thread, daemon=True)
+        self.schedule_thread.start()
+        # One thread per client.
         for i in range(nthreads):
-            self.serve_thread = threading.Thread(target=self._serve_thread)
-            self.serve_thread.setDaemon(True)
+            self.serve_thread = threading.Thread(target=self._serve_thread, daemon=True)
             self.serve_thread.start()
 
 # Run ----------------------------------------------------------------------------------------------
@@ -168,11 +308,13 @@ def main():
     parser.add_argument("--bind-ip",         default="localhost",    help="Host bind address")
     parser.add_argument("--bind-port",       default=1234,           help="Host bind port")
     parser.add_argument("--debug",           action="store_true",    help="Enable debug")
+    parser.add_argument("--stats",           action="store_true",    help="Periodically print server stats")
 
     # UART arguments
     parser.add_argument("--uart",            action="store_true",    help="Select UART interface")
     parser.add_argument("--uart-port",       default=None,           help="Set UART port")
     parser.add_argument("--uart-baudrate",   default=115200,         help="Set UART baudrate")
+    parser.add_argument("--uart-length-width", default=8, type=int,  help="Set UARTBone length field width (8, 16, 24 or 32)")
 
     # UDP arguments
     parser.add_argument("--udp",             action="store_true",    help="Select UDP interface")
@@ -201,7 +343,7 @@ def main():
         uart_port = args.uart_port
         uart_baudrate = int(float(args.uart_baudrate))
         print("[CommUART] port: {} / baudrate: {} / ".format(uart_port, uart_baudrate), end="")
-        comm = CommUART(uart_port, uart_baudrate, debug=args.debug)
+        comm = CommUART(uart_port, uart_baudrate, debug=args.debug, length_width=args.uart_length_width)
 
     # UDP mode
     elif args.udp:
@@ -255,8 +397,10 @@ def main():
     server.open()
     server.start(4)
     try:
-        import time
-        while True: time.sleep(100)
+        while True:
+            time.sleep(10 if args.stats else 100)
+            if args.stats:
+                print(server.stats)
     except KeyboardInterrupt:
         pass
 
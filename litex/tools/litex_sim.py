@@ -351,6 +351,10 @@ def sim_args(parser):
     parser.add_argument("--trace-end",            default="-1",            help="Time to end tracing (ps)")
     parser.add_argument("--opt-level",            default="O3",            help="Compilation optimization level")
     parser.add_argument("--sim-debug",            action="store_true",     help="Add simulation debugging modules")
+    parser.add_argument("--sim-checkpoint-save",      default=None,        help="Save a simulation checkpoint to this file (at --sim-checkpoint-save-time or from software with --sim-debug)")
+    parser.add_argument("--sim-checkpoint-save-time", default=None,        help="Time to save the simulation checkpoint (ps)")
+    parser.add_argument("--sim-checkpoint-exit",      action="store_true", help="Exit the simulation once the checkpoint is saved")
+    parser.add_argument("--sim-checkpoint-restore",   default=None,        help="Resume the simulation from this checkpoint file")
 
 def main():
     parser = argparse.ArgumentParser(description="Generic LiteX SoC Simulation")
@@ -393,6 +397,9 @@ def main():
 
     trace_start = int(float(args.trace_start))
     trace_end = int(float(args.trace_end))
+    checkpoint_save_time = None
+    if args.sim_checkpoint_save_time is not None:
+        checkpoint_save_time = int(float(args.sim_checkpoint_save_time))
 
     # SoC ------------------------------------------------------------------------------------------
     soc = SimSoC(
@@ -429,7 +436,11 @@ def main():
             trace       = args.trace,
             trace_fst   = args.trace_fst,
             trace_start = trace_start,
-            trace_end   = trace_end
+            trace_end   = trace_end,
+            checkpoint_save      = args.sim_checkpoint_save,
+            checkpoint_save_time = checkpoint_save_time,
+            checkpoint_exit      = args.sim_checkpoint_exit,
+            checkpoint_restore   = args.sim_checkpoint_restore
         )
         if args.with_analyzer:
             soc.analyzer.export_csv(vns, "analyzer.csv")
@@ -18,6 +18,11 @@ import argparse
 import json
 import pty
 import telnetlib
+import re
+import zlib
+import queue
+import threading
+import collections
 
 # Console ------------------------------------------------------------------------------------------
 
@@ -142,7 +147,16 @@ sfl_magic_req = b"sL5DdSMmkekro\n"
 sfl_magic_ack = b"z6IHG7cYDID6o\n"
 
 sfl_payload_length = 255
-sfl_outstanding    = 128
+sfl_outstanding    = 128   # Maximum number of frames waiting for an ack (window).
+sfl_window         = 4     # Initial window.
+sfl_retries        = 8     # Maximum consecutive errors (CRC errors/lost frames) before aborting.
+sfl_ack_timeout    = 0.5   # Minimum ack timeout (s).
+sfl_delay_max      = 1e-2  # Maximum inter-frame delay (s).
+
+sfl_block_size     = 65536 # Blocks of the images skipped when already loaded (same CRC32).
+sfl_crc_outstanding = 4    # Maximum number of CRC frames waiting for their reply (the device does not
+                           # drain its 128 bytes RX buffer while computing a CRC).
+sfl_fill_min       = 32    # Minimal length of the runs of a byte sent with a fill command.
 
 # General commands
 sfl_cmd_abort       = b"\x00"
@@ -150,6 +164,9 @@ sfl_cmd_load        = b"\x01"
 sfl_cmd_jump        = b"\x02"
 sfl_cmd_flash       = b"\x04"
 sfl_cmd_reboot      = b"\x05"
+sfl_cmd_fill        = b"\x06" # Address, length (4 bytes), byte value.
+sfl_cmd_load_lz     = b"\x07" # Address, LZ compressed data.
+sfl_cmd_crc         = b"\x08" # Address, length (4 bytes), replied with the CRC32 (4 bytes).
 
 # Replies
 sfl_ack_success  = b"K"
@@ -173,6 +190,181 @@ class SFLFrame:
         packet += self.payload
         return packet
 
+# SFL Window ---------------------------------------------------------------------------------------
+
+class SFLWindow:
+    """Sliding window of the SFL upload frames
+
+    Tuned from the acks of the device:
+    - size: slow start then additive increase while frames are acknowledged, halved and restarted on
+      errors (CRC errors or lost frames when the device is overrun). Also capped to twice the frames
+      needed in flight to sustain the measured ack rate: more frames would only queue in the USB-UART
+      and device buffers.
+    - delay: inter-frame delay, doubled on errors and halved after each window without errors.
+    - timeout: ack timeout, from the smoothed ack latency and its variation.
+    """
+    def __init__(self, size=sfl_window, max_size=sfl_outstanding, delay=0):
+        self.size        = size
+        self.max_size    = max_size
+        self.threshold   = max_size
+        self.delay       = delay
+        self.credit      = 0
+        self.acks        = size
+        self.errors      = 0
+        self.latency     = None
+        self.latency_var = 0
+        self.latency_min = None
+        self.interval    = None
+        self.last_ack    = None
+
+    @property
+    def timeout(self):
+        if self.latency is None:
+            return 4*sfl_ack_timeout
+        return max(sfl_ack_timeout, self.latency + 4*self.latency_var)
+
+    def ack(self, latency, now=None):
+        now = time.time() if now is None else now
+        # Ack interval/latency.
+        if self.last_ack is not None:
+            interval = now - self.last_ack
+            self.interval = interval if self.interval is None else (7*self.interval + interval)/8
+        self.last_ack = now
+        if self.latency is None:
+            self.latency     = latency
+            self.latency_var = latency/2
+            self.latency_min = latency
+        else:
+            self.latency_var = (3*self.latency_var + abs(latency - self.latency))/4
+            self.latency     = (7*self.latency + latency)/8
+            self.latency_min = min(self.latency_min, latency)
+
+        # Size.
+        if self.size < self.threshold:
+            self.size += 1
+        else:
+            self.credit += 1
+            if self.credit >= self.size:
+                self.credit = 0
+                self.size  += 1
+        size_max = self.max_size
+        if self.interval:
+            size_max = min(size_max, max(sfl_window, int(2*self.latency_min/self.interval) + 1))
+        self.size = min(self.size, size_max)
+
+        # Delay.
+        self.acks -= 1
+        if self.acks <= 0:
+            self.acks  = self.size
+            self.delay = self.delay/2 if self.delay > 1e-6 else 0
+
+    def error(self):
+        self.errors   += 1
+        self.threshold = max(1, self.size//2)
+        self.size      = 1
+        self.credit    = 0
+        self.acks      = 1
+        self.last_ack  = None
+        self.delay     = min(max(2*self.delay, 1e-5), sfl_delay_max)
+
+# LZ Compression -----------------------------------------------------------------------------------
+
+# Tokens of the sfl_cmd_load_lz payloads (after the address):
+# - 0b0nnnnnnn: literal, followed by n + 1 bytes.
+# - 0b1nnnnnnn, offset (2 bytes): copy of n + 3 bytes from offset bytes before the current address
+#   (the references can be in data loaded by the previous frames).
+lz_literal_max = 128
+lz_match_min   = 3
+lz_match_max   = 130
+lz_offset_max  = 65535
+
+def _lz_literal_cost(n):
+    return n + (n + lz_literal_max - 1)//lz_literal_max
+
+class LZCompressor:
+    """Greedy LZ compressor of the sfl_cmd_load_lz payloads of an image
+
+    The positions of the image before the compressed ones are used as references (they have been
+    loaded by the previous frames).
+    """
+    def __init__(self, data):
+        self.data    = data
+        self.table   = {}
+        self.indexed = 0
+
+    def index(self, start, end):
+        data  = self.data
+        table = self.table
+        for i in range(max(start, self.indexed), min(end, len(data) - lz_match_min + 1)):
+            table[data[i:i + lz_match_min]] = i
+        self.indexed = max(self.indexed, end)
+
+    def skip(self, end):
+        # Positions not used as references (filled/skipped data).
+        self.indexed = max(self.indexed, end)
+
+    def compress(self, pos, end, max_length):
+        # Compress data[pos:end] in up to max_length bytes, return (payload, consumed bytes).
+        data  = self.data
+        table = self.table
+        self.index(self.indexed, pos)
+        out       = bytearray()
+        lit_start = pos
+        i         = pos
+
+        def literals(start, end):
+            for j in range(start, end, lz_literal_max):
+                n = min(lz_literal_max, end - j)
+                out.append(n - 1)
+                out.extend(data[j:j + n])
+
+        while i < end:
+            literal_cost = _lz_literal_cost(i - lit_start)
+            key  = data[i:i + lz_match_min]
+            cand = table.get(key) if (i + lz_match_min) <= end else None
+            if cand is not None and (i - cand) <= lz_offset_max:
+                if len(out) + literal_cost + 3 > max_length:
+                    break
+                n = lz_match_min
+                n_max = min(lz_match_max, end - i)
+                while n < n_max and data[cand + n] == data[i + n]:
+                    n += 1
+                literals(lit_start, i)
+                out.append(0x80 | (n - lz_match_min))
+                out.extend((i - cand).to_bytes(2, "big"))
+                table[key] = i
+                self.index(i + 1, i + n)
+                i += n
+                lit_start = i
+            else:
+                if len(out) + _lz_literal_cost(i + 1 - lit_start) > max_length:
+                    break
+                table[key] = i
+                i += 1
+        literals(lit_start, i)
+        self.indexed = max(self.indexed, i)
+        return bytes(out), i - pos
+
+def lz_decompress(payload, memory, address):
+    # Reference decoder (as done by the BIOS) of a sfl_cmd_load_lz payload to memory (bytearray).
+    i = 0
+    while i < len(payload):
+        c = payload[i]
+        i += 1
+        if c & 0x80:
+            n      = (c & 0x7f) + lz_match_min
+            offset = int.from_bytes(payload[i:i + 2], "big")
+            i += 2
+            for j in range(n):
+                memory[address] = memory[address - offset]
+                address += 1
+        else:
+            n = c + 1
+            memory[address:address + n] = payload[i:i + n]
+            address += n
+            i += n
+    return address
+
 # CRC16 --------------------------------------------------------------------------------------------
 
 crc16_table = [
@@ -220,7 +412,7 @@ def crc16(l):
 # LiteXTerm ----------------------------------------------------------------------------------------
 
 class LiteXTerm:
-    def __init__(self, serial_boot, kernel_image, kernel_address, json_images, flash):
+    def __init__(self, serial_boot, kernel_image, kernel_address, json_images, flash, raw_upload=False):
         self.serial_boot = serial_boot
         assert not (kernel_image is not None and json_images is not None)
         self.mem_regions = {}
@@ -235,6 +427,7 @@ class LiteXTerm:
             self.boot_address = self.mem_regions[list(self.mem_regions.keys())[-1]]
             f.close()
         self.flash = flash
+        self.raw_upload = raw_upload
 
         self.reader_alive = False
         self.writer_alive = False
@@ -300,22 +493,142 @@ class LiteXTerm:
             print(f"[LXTERM] Got unexpected response from device '{reply}'")
         sys.exit(1)
 
-    def upload(self, filename, address):
-        f = open(filename, "rb")
-        f.seek(0, 2)
-        length = f.tell()
-        f.seek(0, 0)
-
-        action = "Flashing" if self.flash else "Uploading"
-        print(f"[LXTERM] {action} {filename} to 0x{address:08x} ({length} bytes)...")
+    def probe_extensions(self):
+        # Devices without fill/compressed/CRC commands reply sfl_ack_unknown to sfl_cmd_crc.
+        frame = SFLFrame()
+        frame.cmd = sfl_cmd_crc
+        frame.payload = bytes(8)
+        timeout = self.port.timeout
+        self.port.timeout = 4*sfl_ack_timeout
+        try:
+            for retry in range(sfl_retries):
+                self.port.write(frame.encode())
+                reply = self.port.read()
+                if reply not in [sfl_ack_crcerror, b""]:
+                    break
+            if reply == sfl_ack_success:
+                return len(self.port.read(4)) == 4
+            return False
+        finally:
+            self.port.timeout = timeout
+
+    def loaded_blocks(self, data, address):
+        # Return the blocks of data already present at address on the device (same CRC32). Only a few
+        # CRC frames are kept outstanding; on errors (CRC error or lost frame/reply, the device then
+        # flushes its RX buffer) the remaining replies are drained and the frames resent from the
+        # failed one. Blocks that could not be checked are considered not loaded.
+        blocks  = list(range(0, len(data), sfl_block_size))
+        loaded  = set()
+        sent    = 0
+        done    = 0
+        errors  = 0
+        timeout = self.port.timeout
+        self.port.timeout = 4*sfl_ack_timeout
+        try:
+            while done < len(blocks):
+                while sent < len(blocks) and (sent - done) < sfl_crc_outstanding:
+                    position = blocks[sent]
+                    frame = SFLFrame()
+                    frame.cmd = sfl_cmd_crc
+                    frame.payload = (address + position).to_bytes(4, "big")
+                    frame.payload += min(sfl_block_size, len(data) - position).to_bytes(4, "big")
+                    self.port.write(frame.encode())
+                    sent += 1
+                reply = self.port.read(5)
+                if len(reply) == 5 and reply[:1] == sfl_ack_success:
+                    position = blocks[done]
+                    if int.from_bytes(reply[1:], "big") == zlib.crc32(data[position:position + sfl_block_size]):
+                        loaded.add(position)
+                    done  += 1
+                    errors = 0
+                    continue
+                errors += 1
+                if errors > sfl_retries:
+                    break
+                while len(self.port.read(64)):
+                    pass
+                sent = done
+        finally:
+            self.port.timeout = timeout
+        return loaded
+
+    def upload_frames(self, data, address, extensions, loaded):
+        # Generate the frames uploading data to address, with the number of bytes of data they cover.
+        max_length = self.payload_length - 4
+        cmd        = sfl_cmd_flash if self.flash else sfl_cmd_load
+
+        # Raw upload (flash or device without SFL extensions).
+        if not extensions:
+            for position in range(0, len(data), max_length):
+                frame = SFLFrame()
+                frame.cmd = cmd
+                frame.payload = (address + position).to_bytes(4, "big")
+                frame.payload += data[position:position + max_length]
+                yield frame, len(frame.payload) - 4
+            return
 
-        # Prepare parameters
-        current_address = address
-        position        = 0
-        start           = time.time()
-        remaining       = length
-        outstanding     = 0
-        while remaining:
+        # Split data in segments: skipped (already loaded), filled or compressed.
+        segments = []
+        fill_re  = re.compile(rb"(.)\1{%d,}" % (sfl_fill_min - 1), re.DOTALL)
+        for block in range(0, len(data), sfl_block_size):
+            block_end = min(block + sfl_block_size, len(data))
+            if block in loaded:
+                segments.append(("skip", block, block_end))
+                continue
+            position = block
+            for m in fill_re.finditer(data, block, block_end):
+                if m.start() > position:
+                    segments.append(("load", position, m.start()))
+                segments.append(("fill", m.start(), m.end()))
+                position = m.end()
+            if position < block_end:
+                segments.append(("load", position, block_end))
+
+        compressor = LZCompressor(data)
+        for kind, start, end in segments:
+            if kind == "skip":
+                compressor.skip(end)
+                yield None, end - start
+            elif kind == "fill":
+                compressor.skip(end)
+                frame = SFLFrame()
+                frame.cmd = sfl_cmd_fill
+                frame.payload = (address + start).to_bytes(4, "big")
+                frame.payload += (end - start).to_bytes(4, "big")
+                frame.payload += data[start:start + 1]
+                yield frame, end - start
+            else:
+                position = start
+                while position < end:
+                    payload, consumed = compressor.compress(position, end, max_length)
+                    frame = SFLFrame()
+                    frame.payload = (address + position).to_bytes(4, "big")
+                    # Only use compressed frames when more efficient than raw ones.
+                    if consumed > max_length:
+                        frame.cmd = sfl_cmd_load_lz
+                        frame.payload += payload
+                    else:
+                        consumed = min(end - position, max_length)
+                        frame.cmd = sfl_cmd_load
+                        frame.payload += data[position:position + consumed]
+                    position += consumed
+                    yield frame, consumed
+
+    def ack_reader(self, acks):
+        while self.ack_reader_alive:
+            reply = self.port.read()
+            if len(reply):
+                acks.put((reply, time.time()))
+
+    def send_frames(self, frames, length, window, acks):
+        # Send the frames with a sliding window; on errors (CRC error or lost frame) the device flushes
+        # its RX buffer: wait for the remaining acks and resend the frames from the failed one (frames
+        # are idempotent).
+        position = 0
+        inflight = collections.deque()
+        resend   = collections.deque()
+        errors   = 0
+        while True:
             # Show progress
             sys.stdout.write("|{}>{}| {}%\r".format(
                 "=" * (20*position//length),
@@ -323,44 +636,90 @@ class LiteXTerm:
                 100*position//length))
             sys.stdout.flush()
 
-            # Send frame if max outstanding not reached.
-            if outstanding <= sfl_outstanding:
-                # Prepare frame.
-                frame = SFLFrame()
-                frame_data = f.read(min(remaining, self.payload_length-4))
-                if self.flash:
-                    frame.cmd = sfl_cmd_flash
+            # Send frames while window is not full.
+            while len(inflight) < window.size:
+                if resend:
+                    frame, frame_length = resend.popleft()
                 else:
-                    frame.cmd = sfl_cmd_load
-                frame.payload = current_address.to_bytes(4, "big")
-                frame.payload += frame_data
-
-                # Encode frame and send it.
-                self.port.write(frame.encode())
-
-                # Update parameters
-                current_address += len(frame_data)
-                position        += len(frame_data)
-                remaining       -= len(frame_data)
-                outstanding     += 1
+                    frame, frame_length = next(frames, (None, 0))
+                    # Skipped data (already loaded).
+                    if frame is None:
+                        if frame_length == 0:
+                            break
+                        position += frame_length
+                        continue
+                    frame = frame.encode()
+                self.port.write(frame)
+                inflight.append((frame, frame_length, time.time()))
 
                 # Inter-frame delay.
-                time.sleep(self.delay)
+                if window.delay:
+                    time.sleep(window.delay)
+            if not inflight:
+                break
+
+            # Wait for ack.
+            try:
+                reply, reply_time = acks.get(timeout=window.timeout)
+            except queue.Empty:
+                reply = None
+            if reply == sfl_ack_success:
+                frame, frame_length, frame_time = inflight.popleft()
+                window.ack(reply_time - frame_time, reply_time)
+                position += frame_length
+                errors    = 0
+                continue
+            if reply not in [sfl_ack_crcerror, None]:
+                print(f"[LXTERM] Got unexpected response from device '{reply}'")
+                sys.exit(1)
+            errors += 1
+            if errors > sfl_retries:
+                print("[LXTERM] Upload to device failed due to data corruption (CRC error)")
+                sys.exit(1)
+            window.error()
+            while True:
+                try:
+                    acks.get(timeout=window.timeout)
+                except queue.Empty:
+                    break
+            resend.extendleft((frame, frame_length) for frame, frame_length, _ in reversed(inflight))
+            inflight.clear()
 
-            # Read response if availables.
-            while self.port.in_waiting:
-                self.receive_upload_response()
-                outstanding -= 1
+    def upload(self, filename, address):
+        f = open(filename, "rb")
+        data = f.read()
+        f.close()
+        length = len(data)
 
-        # Get remaining responses.
-        for _ in range(outstanding):
-            self.receive_upload_response()
+        action = "Flashing" if self.flash else "Uploading"
+        print(f"[LXTERM] {action} {filename} to 0x{address:08x} ({length} bytes)...")
+
+        # Prepare parameters
+        start      = time.time()
+        extensions = (not self.flash) and (not self.raw_upload) and self.probe_extensions()
+        loaded     = self.loaded_blocks(data, address) if extensions else set()
+        frames     = self.upload_frames(data, address, extensions, loaded)
+        window     = SFLWindow(delay=self.delay)
+
+        # Send frames, acks received by a reader thread.
+        acks    = queue.Queue()
+        timeout = self.port.timeout
+        self.port.timeout = 0.1
+        self.ack_reader_alive  = True
+        self.ack_reader_thread = threading.Thread(target=self.ack_reader, args=(acks,), daemon=True)
+        self.ack_reader_thread.start()
+        try:
+            self.send_frames(frames, max(length, 1), window, acks)
+        finally:
+            self.ack_reader_alive = False
+            self.ack_reader_thread.join()
+            self.port.timeout = timeout
 
         # Compute speed.
         end     = time.time()
         elapsed = end - start
-        print("[LXTERM] Upload complete ({0:.1f}KB/s).".format(length/(elapsed*1024)))
-        f.close()
+        print("[LXTERM] Upload complete ({0:.1f}KB/s, {1} error(s)).".format(
+            length/(elapsed*1024), window.errors))
         return length
 
     def boot(self):
@@ -477,13 +836,14 @@ def _get_args():
     parser.add_argument("--images",      default=None,                       help="JSON description of the images to load to memory")
     parser.add_argument("--no-crc",      default=False, action='store_true', help="Disable CRC check (speedup serialboot)")
     parser.add_argument("--flash",       default=False, action='store_true', help="Flash data with serialboot command")
+    parser.add_argument("--raw-upload",  default=False, action='store_true', help="Disable fill/compressed/CRC frames (for serialboot)")
     return parser.parse_args()
 
 def main():
     args = _get_args()
     if args.no_crc:
         print("[LXTERM] --no-crc is deprecated and now does nothing (CRC checking is now fast)")
-    term = LiteXTerm(args.serial_boot, args.kernel, args.kernel_adr, args.images, args.flash)
+    term = LiteXTerm(args.serial_boot, args.kernel, args.kernel_adr, args.images, args.flash, args.raw_upload)
 
     bridge_cls = {"crossover": CrossoverUART, "jtag_uart": JTAGUART}.get(args.port, None)
     if bridge_cls is not None:
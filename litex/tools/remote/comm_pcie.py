@@ -9,11 +9,16 @@ import ctypes
 import mmap
 
 from litex.tools.remote.csr_builder import CSRBuilder
+from litex.tools.remote.memory import MemoryAccess
 
 # CommPCIe -----------------------------------------------------------------------------------------
 
-class CommPCIe(CSRBuilder):
-    def __init__(self, bar, csr_csr=None, debug=False):
+class CommPCIe(CSRBuilder, MemoryAccess):
+    # Bursts are only used to split the transfers for the progress reporting.
+    mem_read_burst  = 16384
+    mem_write_burst = 16384
+
+    def __init__(self, bar, csr_csv=None, debug=False):
         CSRBuilder.__init__(self, comm=self, csr_csv=csr_csv)
         if "/sys/bus/pci/devices" not in bar:
             bar = f"/sys/bus/pci/devices/0000:{bar}/resource0"
@@ -39,9 +44,9 @@ class CommPCIe(CSRBuilder):
     def close(self):
         if not hasattr(self, "file"):
             return
-        self.file.close()
-        del self.file
         self.mmap.close()
+        os.close(self.file)
+        del self.file
 
     def read(self, addr, length=None, burst="incr"):
         assert burst == "incr"
@@ -63,3 +68,18 @@ class CommPCIe(CSRBuilder):
             ctypes.c_uint32.from_buffer(self.mmap, addr + 4*i).value = value
             if self.debug:
                 print("write 0x{:08x} @ 0x{:08x}".format(value, addr + 4*i))
+
+    def _words(self, addr, length):
+        # 32-bit view of the BAR: each word is accessed with a single 32-bit access.
+        return (ctypes.c_uint32*length).from_buffer(self.mmap, addr)
+
+    def _read_words(self, addr, nwords):
+        for offset in range(0, nwords, self.mem_read_burst):
+            length = min(self.mem_read_burst, nwords - offset)
+            yield offset, self._words(addr + 4*offset, length)[:]
+
+    def _write_words(self, addr, words):
+        for offset in range(0, len(words), self.mem_write_burst):
+            datas = words[offset:offset + self.mem_write_burst]
+            self._words(addr + 4*offset, len(datas))[:] = datas
+            yield len(datas)
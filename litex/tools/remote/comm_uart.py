@@ -8,6 +8,7 @@ import serial
 import struct
 
 from litex.tools.remote.csr_builder import CSRBuilder
+from litex.tools.remote.memory import MemoryAccess, words_to_bytes
 
 # Constants ----------------------------------------------------------------------------------------
 
@@ -18,12 +19,18 @@ CMD_READ_BURST_FIXED  = 0x04
 
 # CommUART -----------------------------------------------------------------------------------------
 
-class CommUART(CSRBuilder):
-    def __init__(self, port, baudrate=115200, csr_csv=None, debug=False):
+class CommUART(CSRBuilder, MemoryAccess):
+    # UARTBone has no RX buffering: a command can't be sent before the end of the previous read.
+    # length_width: width of the length field of the commands (length_width of the UARTBone).
+    def __init__(self, port, baudrate=115200, csr_csv=None, debug=False, length_width=8):
         CSRBuilder.__init__(self, comm=self, csr_csv=csr_csv)
-        self.port     = serial.serial_for_url(port, baudrate)
-        self.baudrate = str(baudrate)
-        self.debug    = debug
+        self.port            = serial.serial_for_url(port, baudrate)
+        self.baudrate        = str(baudrate)
+        self.debug           = debug
+        self.length_bytes    = length_width//8
+        self.max_burst       = 2**length_width - 1
+        self.mem_read_burst  = self.max_burst
+        self.mem_write_burst = self.max_burst
 
     def open(self):
         if hasattr(self, "port"):
@@ -54,6 +61,10 @@ class CommUART(CSRBuilder):
         if self.port.inWaiting() > 0:
             self.port.read(self.port.inWaiting())
 
+    def _command(self, cmd, length, addr):
+        return (bytes([cmd]) + length.to_bytes(self.length_bytes, byteorder="big") +
+            (addr//4).to_bytes(4, byteorder="big"))
+
     def read(self, addr, length=None, burst="incr"):
         self._flush()
         data       = []
@@ -62,10 +73,10 @@ class CommUART(CSRBuilder):
             "incr" : CMD_READ_BURST_INCR,
             "fixed": CMD_READ_BURST_FIXED,
         }[burst]
-        self._write([cmd, length_int])
-        self._write(list((addr//4).to_bytes(4, byteorder="big")))
+        self._write(self._command(cmd, length_int, addr))
+        datas = self._read(4*length_int)
         for i in range(length_int):
-            value = int.from_bytes(self._read(4), "big")
+            value = int.from_bytes(datas[4*i:4*(i + 1)], "big")
             if self.debug:
                 print("read 0x{:08x} @ 0x{:08x}".format(value, addr + 4*i))
             if length is None:
@@ -78,17 +89,25 @@ class CommUART(CSRBuilder):
         data   = data if isinstance(data, list) else [data]
         length = len(data)
         offset = 0
+        cmd    = {
+            "incr" : CMD_WRITE_BURST_INCR,
+            "fixed": CMD_WRITE_BURST_FIXED,
+        }[burst]
         while length:
-            size = min(length, 8)
-            cmd = {
-                "incr" : CMD_WRITE_BURST_INCR,
-                "fixed": CMD_WRITE_BURST_FIXED,
-            }[burst]
-            self._write([cmd, size])
-            self._write(list(((addr//4 + offset).to_bytes(4, byteorder="big"))))
+            size    = min(length, self.max_burst)
+            command = bytearray(self._command(cmd, size, addr + 4*offset))
             for i, value in enumerate(data[offset:offset+size]):
-                self._write(list(value.to_bytes(4, byteorder="big")))
+                command += value.to_bytes(4, byteorder="big")
                 if self.debug:
-                    print("write 0x{:08x} @ 0x{:08x}".format(value, addr + offset, 4*i))
+                    print("write 0x{:08x} @ 0x{:08x}".format(value, addr + 4*(offset + i)))
+            self._write(command)
             offset += size
             length -= size
+
+    def _write_words(self, addr, words):
+        # Writes are not acknowledged: send the bursts back to back.
+        for offset in range(0, len(words), self.mem_write_burst):
+            datas = words[offset:offset + self.mem_write_burst]
+            self._write(self._command(CMD_WRITE_BURST_INCR, len(datas), addr + 4*offset) +
+                words_to_bytes(datas, byteorder="big"))
+            yield len(datas)
@@ -6,15 +6,23 @@
 # SPDX-License-Identifier: BSD-2-Clause
 
 import socket
+from collections import deque
 
 from litex.tools.remote.etherbone import EtherbonePacket, EtherboneRecord
 from litex.tools.remote.etherbone import EtherboneReads, EtherboneWrites
 
 from litex.tools.remote.csr_builder import CSRBuilder
+from litex.tools.remote.memory import MemoryAccess
 
 # CommUDP ------------------------------------------------------------------------------------------
 
-class CommUDP(CSRBuilder):
+class CommUDP(CSRBuilder, MemoryAccess):
+    mem_read_burst  = 255
+    mem_write_burst = 255
+    mem_read_window  = 4  # Read packets in flight.
+    mem_write_window = 16 # Write packets sent between two synchronizations.
+    mem_retries      = 4
+
     def __init__(self, server="192.168.1.50", port=1234, csr_csv=None, debug=False):
         CSRBuilder.__init__(self, comm=self, csr_csv=csr_csv)
         self.server = server
@@ -103,3 +111,66 @@ class CommUDP(CSRBuilder):
         if self.debug:
             for i, value in enumerate(datas):
                 print("write 0x{:08x} @ 0x{:08x}".format(value, addr + 4*i))
+
+    def _send_reads(self, addr, length, tag):
+        # The reply record is written at base_ret_addr: use it to tag the reads.
+        record = EtherboneRecord()
+        record.reads = EtherboneReads(base_ret_addr=tag, addrs=[addr+4*j for j in range(length)])
+        packet = EtherbonePacket()
+        packet.records = [record]
+        packet.encode()
+        self.socket.sendto(packet.bytes, (self.server, self.port))
+
+    def _read_words(self, addr, nwords):
+        # Keep mem_read_window packets in flight, resend them when replies are lost.
+        bursts   = deque((offset, min(self.mem_read_burst, nwords - offset))
+            for offset in range(0, nwords, self.mem_read_burst))
+        inflight = {}
+        retries  = self.mem_retries
+        resent   = False
+        while bursts or inflight:
+            while bursts and len(inflight) < self.mem_read_window:
+                offset, length = bursts.popleft()
+                self._send_reads(addr + 4*offset, length, tag=4*offset)
+                inflight[4*offset] = length
+            try:
+                datas, dummy = self.socket.recvfrom(8192)
+            except socket.timeout:
+                if not retries:
+                    raise
+                retries -= 1
+                resent   = True
+                for tag, length in inflight.items():
+                    self._send_reads(addr + tag, length, tag)
+                continue
+            packet = EtherbonePacket(datas)
+            packet.decode()
+            record = packet.records.pop()
+            if record.writes is None:
+                continue
+            tag = record.writes.base_addr
+            if inflight.get(tag, None) != len(record.writes.get_datas()):
+                continue # Duplicate reply of a resent burst.
+            del inflight[tag]
+            retries = self.mem_retries
+            yield tag//4, record.writes.get_datas()
+        if resent:
+            # Drop the late replies of the resent bursts.
+            self.socket.setblocking(False)
+            try:
+                while True:
+                    self.socket.recvfrom(8192)
+            except BlockingIOError:
+                pass
+            finally:
+                self.socket.settimeout(1)
+
+    def _write_words(self, addr, words):
+        for n, offset in enumerate(range(0, len(words), self.mem_write_burst)):
+            datas = words[offset:offset + self.mem_write_burst]
+            self.write(addr + 4*offset, datas)
+            # Wait for the writes to be executed (reads are executed in order) before sending
+            # more packets.
+            if (n + 1) % self.mem_write_window == 0:
+                self.read(addr + 4*offset)
+            yield len(datas)
@@ -8,6 +8,7 @@ import usb.core
 import time
 
 from litex.tools.remote.csr_builder import CSRBuilder
+from litex.tools.remote.memory import MemoryAccess
 
 # Wishbone USB Protocol Bridge
 # ============================
@@ -61,8 +62,13 @@ from litex.tools.remote.csr_builder import CSRBuilder
 
 # CommUSB ------------------------------------------------------------------------------------------
 
-class CommUSB(CSRBuilder):
-    def __init__(self, vid=None, pid=None, max_retries=10, csr_csr=None, debug=False):
+class CommUSB(CSRBuilder, MemoryAccess):
+    # Control transfers carry a single word and are synchronous: no bursts, no pipelining (bursts
+    # are only used to split the transfers for the progress reporting).
+    mem_read_burst  = 1024
+    mem_write_burst = 1024
+
+    def __init__(self, vid=None, pid=None, max_retries=10, csr_csv=None, debug=False):
         CSRBuilder.__init__(self, comm=self, csr_csv=csr_csv)
         self.vid         = vid
         self.pid         = pid
@@ -100,14 +106,14 @@ class CommUSB(CSRBuilder):
         data = []
         length_int = 1 if length is None else length
         for i in range(length_int):
-            value = self.usb_read(addr)
+            value = self.usb_read(addr + 4*i)
             # Note that sometimes, the value ends up as None when the device
             # disconnects during a transaction.  Paper over this fact by
             # replacing it with a sentinal.
             if value is None:
                 value = 0xffffffff
             if self.debug:
-                print("read 0x{:08x} @ 0x{:08x}".format(value, addr))
+                print("read 0x{:08x} @ 0x{:08x}".format(value, addr + 4*i))
             if length is None:
                 return value
             data.append(value)
@@ -140,7 +146,7 @@ class CommUSB(CSRBuilder):
         data = data if isinstance(data, list) else [data]
         length = len(data)
         for i, value in enumerate(data):
-            self.usb_write(addr, value)
+            self.usb_write(addr + 4*i, value)
             if self.debug:
                 print("write 0x{:08x} @ 0x{:08x}".format(value, addr + 4*i))
 
@@ -5,8 +5,10 @@
 # Copyright (c) 2017 Tim Ansell <mithro@mithis.com>
 # SPDX-License-Identifier: BSD-2-Clause
 
+import sys
 import math
 import struct
+from array import array
 
 from litex.soc.interconnect.packet import HeaderField, Header
 
@@ -57,6 +59,26 @@ def get_field_data(field, datas):
     v = int.from_bytes(datas[field.byte:field.byte+math.ceil(field.width/8)], "big")
     return (v >> field.offset) & (2**field.width-1)
 
+def _header_fields(header):
+    # (name, byte, number of bytes, offset, mask) of the fields, computed once per header.
+    return [(k, v.byte, math.ceil(v.width/8), v.offset, 2**v.width-1)
+        for k, v in sorted(header.fields.items())]
+
+def encode_header(fields, length, obj):
+    header = 0
+    for k, byte, nbytes, offset, mask in fields:
+        value = int.from_bytes(getattr(obj, k).to_bytes(nbytes, "big"), "little")
+        header += (value << offset+(byte*8))
+    return header.to_bytes(length, "little")
+
+def decode_header(fields, obj, datas):
+    for k, byte, nbytes, offset, mask in fields:
+        v = int.from_bytes(datas[byte:byte+nbytes], "big")
+        setattr(obj, k, (v >> offset) & mask)
+
+etherbone_packet_header_fields_list = _header_fields(etherbone_packet_header)
+etherbone_record_header_fields_list = _header_fields(etherbone_record_header)
+
 pack_to_uint32 = struct.Struct('>I').pack
 unpack_uint32_from = struct.Struct('>I').unpack
 
@@ -85,51 +107,76 @@ class EtherboneRead:
     def __repr__(self):
         return "RD32 @ 0x{:08x}".format(self.addr)
 
+# Etherbone Words ----------------------------------------------------------------------------------
+
+# Words are packed/unpacked as whole arrays of big-endian uint32.
+_uint32 = "I" if array("I").itemsize == 4 else "L"
+
+def pack_uint32s(values):
+    words = array(_uint32, values)
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words.tobytes()
+
+def unpack_uint32s(data):
+    words = array(_uint32)
+    words.frombytes(data)
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words
+
 # Etherbone Writes ---------------------------------------------------------------------------------
 
 class EtherboneWrites(Packet):
     def __init__(self, init=[], base_addr=0, datas=[]):
-        if isinstance(datas, list) and len(datas) > 255:
+        datas = list(datas)
+        if len(datas) > 255:
             raise ValueError(f"Burst size of {len(datas)} exceeds maximum of 255 allowed by Etherbone.")
         Packet.__init__(self, init)
         self.base_addr = base_addr
-        self.writes    = []
+        # Words (packed/unpacked as a whole), replaced by EtherboneWrite objects on the first access
+        # to writes (then encoded from them, so that their modifications are kept).
+        self._datas    = datas
+        self._writes   = None
         self.encoded   = init != []
-        for data in datas:
-            self.add(EtherboneWrite(data))
+
+    @property
+    def writes(self):
+        if self._writes is None:
+            self._writes = [EtherboneWrite(data) for data in self._datas]
+            self._datas  = None
+        return self._writes
+
+    @writes.setter
+    def writes(self, writes):
+        self._writes = writes
+        self._datas  = None
 
     def add(self, write):
-        self.writes.append(write)
+        if self._writes is None:
+            self._datas.append(write.data)
+        else:
+            self._writes.append(write)
 
     def get_datas(self):
-        datas = []
-        for write in self.writes:
-            datas.append(write.data)
-        return datas
+        if self._writes is None:
+            return self._datas
+        return [write.data for write in self._writes]
 
     def encode(self):
         if self.encoded:
             raise ValueError
-        ba = bytearray()
-        ba += pack_to_uint32(self.base_addr)
-        for write in self.writes:
-            ba += pack_to_uint32(write.data)
-        self.bytes   = ba
+        self.bytes   = pack_uint32s([self.base_addr] + self.get_datas())
         self.encoded = True
 
     def decode(self):
         if not self.encoded:
             raise ValueError
-        ba = self.bytes
-        self.base_addr = unpack_uint32_from(ba[:4])[0]
-        writes = []
-        offset = 4
-        length = len(ba)
-        while length > offset:
-            writes.append(EtherboneWrite(unpack_uint32_from(ba[offset:offset+4])[0]))
-            offset += 4
-        self.writes  = writes
-        self.encoded = False
+        words = unpack_uint32s(self.bytes)
+        self.base_addr = words[0]
+        self._datas    = words[1:].tolist()
+        self._writes   = None
+        self.encoded   = False
 
     def __repr__(self):
         r = "Writes\n"
@@ -143,46 +190,53 @@ class EtherboneWrites(Packet):
 
 class EtherboneReads(Packet):
     def __init__(self, init=[], base_ret_addr=0, addrs=[]):
-        if isinstance(addrs, list) and len(addrs) > 255:
+        addrs = list(addrs)
+        if len(addrs) > 255:
             raise ValueError(f"Burst size of {len(addrs)} exceeds maximum of 255 allowed by Etherbone.")
         Packet.__init__(self, init)
         self.base_ret_addr = base_ret_addr
-        self.reads   = []
+        # Words (packed/unpacked as a whole), replaced by EtherboneRead objects on the first access
+        # to reads (then encoded from them, so that their modifications are kept).
+        self._addrs  = addrs
+        self._reads  = None
         self.encoded = init != []
-        for addr in addrs:
-            self.add(EtherboneRead(addr))
+
+    @property
+    def reads(self):
+        if self._reads is None:
+            self._reads = [EtherboneRead(addr) for addr in self._addrs]
+            self._addrs = None
+        return self._reads
+
+    @reads.setter
+    def reads(self, reads):
+        self._reads = reads
+        self._addrs = None
 
     def add(self, read):
-        self.reads.append(read)
+        if self._reads is None:
+            self._addrs.append(read.addr)
+        else:
+            self._reads.append(read)
 
     def get_addrs(self):
-        addrs = []
-        for read in self.reads:
-            addrs.append(read.addr)
-        return addrs
+        if self._reads is None:
+            return self._addrs
+        return [read.addr for read in self._reads]
 
     def encode(self):
         if self.encoded:
             raise ValueError
-        ba = bytearray()
-        ba += pack_to_uint32(self.base_ret_addr)
-        for read in self.reads:
-            ba += pack_to_uint32(read.addr)
-        self.bytes   = ba
+        self.bytes   = pack_uint32s([self.base_ret_addr] + self.get_addrs())
         self.encoded = True
 
     def decode(self):
         if not self.encoded:
             raise ValueError
-        ba = self.bytes
-        base_ret_addr = unpack_uint32_from(ba[:4])[0]
-        reads  = []
-        offset = 4
-        length = len(ba)
-        while length > offset:
-            reads.append(EtherboneRead(unpack_uint32_from(ba[offset:offset+4])[0]))
-            offset += 4
-        self.reads   = reads
+        words = unpack_uint32s(self.bytes)
+        self.base_ret_addr = words[0]
+        self._addrs  = words[1:].tolist()
+        self._reads  = None
         self.encoded = False
 
     def __repr__(self):
@@ -216,20 +270,19 @@ class EtherboneRecord(Packet):
             raise ValueError
 
         # Decode header
-        header = list(self.bytes[:etherbone_record_header.length])
-        for k, v in sorted(etherbone_record_header.fields.items()):
-            setattr(self, k, get_field_data(v, header))
+        ba = memoryview(self.bytes)
+        decode_header(etherbone_record_header_fields_list, self, ba)
         offset = etherbone_record_header.length
 
         # Decode writes
         if self.wcount:
-            self.writes = EtherboneWrites(self.bytes[offset:offset + 4*(self.wcount+1)])
+            self.writes = EtherboneWrites(ba[offset:offset + 4*(self.wcount+1)])
             offset += 4*(self.wcount+1)
             self.writes.decode()
 
         # Decode reads
         if self.rcount:
-            self.reads = EtherboneReads(self.bytes[offset:offset + 4*(self.rcount+1)])
+            self.reads = EtherboneReads(ba[offset:offset + 4*(self.rcount+1)])
             offset += 4*(self.rcount+1)
             self.reads.decode()
 
@@ -240,17 +293,13 @@ class EtherboneRecord(Packet):
             raise ValueError
 
         # Set writes/reads count
-        self.wcount = 0 if self.writes is None else len(self.writes.writes)
-        self.rcount = 0 if self.reads  is None else len(self.reads.reads)
+        self.wcount = 0 if self.writes is None else len(self.writes.get_datas())
+        self.rcount = 0 if self.reads  is None else len(self.reads.get_addrs())
 
         ba = bytearray()
 
         # Encode header
-        header = 0
-        for k, v in sorted(etherbone_record_header.fields.items()):
-            value = int.from_bytes(getattr(self, k).to_bytes(math.ceil(v.width/8), "big"), "little")
-            header += (value << v.offset+(v.byte*8))
-        ba += header.to_bytes(etherbone_record_header.length, "little")
+        ba += encode_header(etherbone_record_header_fields_list, etherbone_record_header.length, self)
 
         # Encode writes
         if self.wcount:
@@ -300,12 +349,14 @@ class EtherbonePacket(Packet):
         if not self.encoded:
             raise ValueError
 
-        ba = self.bytes
+        # Records are decoded from views on the packet (a mutable packet is copied first, so that
+        # it can still be resized).
+        if not isinstance(self.bytes, bytes):
+            self.bytes = bytes(self.bytes)
+        ba = memoryview(self.bytes)
 
         # Decode header
-        header = list(ba[:etherbone_packet_header.length])
-        for k, v in sorted(etherbone_packet_header.fields.items()):
-            setattr(self, k, get_field_data(v, header))
+        decode_header(etherbone_packet_header_fields_list, self, ba)
         offset = etherbone_packet_header.length
 
         # Decode records
@@ -329,11 +380,7 @@ class EtherbonePacket(Packet):
         ba = bytearray()
 
         # Encode header
-        header = 0
-        for k, v in sorted(etherbone_packet_header.fields.items()):
-            value = int.from_bytes(getattr(self, k).to_bytes(math.ceil(v.width/8), "big"), "little")
-            header += (value << v.offset+(v.byte*8))
-        ba += header.to_bytes(etherbone_packet_header.length, "little")
+        ba += encode_header(etherbone_packet_header_fields_list, etherbone_packet_header.length, self)
 
         # Encode records
         for record in self.records:
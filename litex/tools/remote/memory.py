@@ -0,0 +1,97 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import sys
+from array import array
+
+# Helpers ------------------------------------------------------------------------------------------
+
+_uint32 = "I" if array("I").itemsize == 4 else "L"
+
+def words_to_bytes(words, byteorder="little"):
+    words = array(_uint32, words)
+    if byteorder != sys.byteorder:
+        words.byteswap()
+    return words.tobytes()
+
+def bytes_to_words(data, byteorder="little"):
+    words = array(_uint32)
+    words.frombytes(data)
+    if byteorder != sys.byteorder:
+        words.byteswap()
+    return words
+
+def print_progress(done, total):
+    print("\r{:8d}/{:8d} bytes ({:5.1f}%)".format(done, total, 100*done/total if total else 100),
+        end="\n" if done == total else "", flush=True)
+
+# Memory Access ------------------------------------------------------------------------------------
+
+class MemoryAccess:
+    """Bulk memory accesses
+
+    Mixin for the comms: `read_mem`/`write_mem` transfer a memory region from/to a bytes-like
+    buffer, split in bursts of `mem_read_burst`/`mem_write_burst` words. Comms override
+    `_read_words`/`_write_words` to pipeline the bursts when the transport allows it.
+
+    Words are converted from/to bytes with `byteorder` (little-endian by default, as the CPUs
+    supported by LiteX). `progress` is called with (bytes done, total bytes) after each burst.
+    """
+    mem_read_burst  = 1
+    mem_write_burst = 1
+
+    def _read_words(self, addr, nwords):
+        # Yield (word offset, datas) for each burst (bursts can be yielded in any order).
+        for offset in range(0, nwords, self.mem_read_burst):
+            length = min(self.mem_read_burst, nwords - offset)
+            yield offset, self.read(addr + 4*offset, length)
+
+    def _write_words(self, addr, words):
+        # Yield the number of words written for each burst.
+        for offset in range(0, len(words), self.mem_write_burst):
+            datas = words[offset:offset + self.mem_write_burst]
+            self.write(addr + 4*offset, datas)
+            yield len(datas)
+
+    def read_mem(self, addr, nbytes, buffer=None, progress=None, byteorder="little"):
+        """Read nbytes at addr, into buffer (writable bytes-like) if provided.
+
+        Returns the buffer (or a bytearray).
+        """
+        if addr % 4:
+            raise ValueError("Address 0x{:08x} is not 32-bit aligned.".format(addr))
+        if buffer is None:
+            buffer = bytearray(nbytes)
+        view = memoryview(buffer).cast("B")
+        if len(view) < nbytes:
+            raise ValueError("Buffer of {} bytes is too small for {} bytes.".format(len(view), nbytes))
+        done = 0
+        for offset, datas in self._read_words(addr, (nbytes + 3)//4):
+            data = words_to_bytes(datas, byteorder)
+            data = data[:nbytes - 4*offset]
+            view[4*offset:4*offset + len(data)] = data
+            done += len(data)
+            if progress is not None:
+                progress(done, nbytes)
+        return buffer
+
+    def write_mem(self, addr, buffer, progress=None, byteorder="little"):
+        """Write buffer (bytes-like) at addr."""
+        if addr % 4:
+            raise ValueError("Address 0x{:08x} is not 32-bit aligned.".format(addr))
+        data   = memoryview(buffer).cast("B")
+        nbytes = len(data)
+        tail   = nbytes % 4
+        if tail:
+            # Partial last word: read-modify-write.
+            last = words_to_bytes([self.read(addr + nbytes - tail)], byteorder)
+            data = bytes(data) + last[tail:]
+        words = bytes_to_words(data, byteorder).tolist()
+        done  = 0
+        for n in self._write_words(addr, words):
+            done = min(done + 4*n, nbytes)
+            if progress is not None:
+                progress(done, nbytes)
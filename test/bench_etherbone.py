@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Etherbone codec microbenchmark: encode/decode of packets with 255-word bursts.
+
+import time
+import argparse
+
+from litex.tools.remote.etherbone import EtherbonePacket, EtherboneRecord
+from litex.tools.remote.etherbone import EtherboneReads, EtherboneWrites
+
+
+def bench_encode(n, datas):
+    t = time.perf_counter()
+    for i in range(n):
+        record = EtherboneRecord()
+        record.writes = EtherboneWrites(base_addr=0x1000, datas=datas)
+        record.reads  = EtherboneReads(addrs=datas)
+        packet = EtherbonePacket()
+        packet.records = [record]
+        packet.encode()
+    return time.perf_counter() - t, bytes(packet.bytes)
+
+
+def bench_decode(n, data):
+    t = time.perf_counter()
+    for i in range(n):
+        packet = EtherbonePacket(data)
+        packet.decode()
+        record = packet.records[0]
+        record.writes.get_datas()
+        record.reads.get_addrs()
+    return time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Etherbone codec microbenchmark")
+    parser.add_argument("--packets", default=5000, type=int, help="Number of packets")
+    parser.add_argument("--burst",   default=255,  type=int, help="Burst length (words)")
+    args = parser.parse_args()
+
+    datas = [0x10000000 + i for i in range(args.burst)]
+    words = 2*args.burst*args.packets # Writes + reads.
+    t_encode, data = bench_encode(args.packets, datas)
+    t_decode       = bench_decode(args.packets, data)
+    print("encode: {:6.2f} Mwords/s".format(words/t_encode/1e6))
+    print("decode: {:6.2f} Mwords/s".format(words/t_decode/1e6))
+
+if __name__ == "__main__":
+    main()
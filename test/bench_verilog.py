@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Verilog conversion benchmark on a reference SoC, to track regressions of the elaboration and
+# conversion times.
+
+import time
+import argparse
+import tempfile
+from functools import reduce
+from operator import xor
+
+from migen import *
+from migen.fhdl import tracer
+
+from litex.build.generic_platform import *
+from litex.build.sim import SimPlatform
+from litex.build.sim.common import sim_special_overrides
+from litex.gen.fhdl import verilog
+
+from litex.soc.integration.soc_core import SoCCore
+from litex.soc.cores.gpio import GPIOOut
+
+# Platform -----------------------------------------------------------------------------------------
+
+_io = [
+    ("sys_clk", 0, Pins(1)),
+    ("sys_rst", 0, Pins(1)),
+    ("serial", 0,
+        Subsignal("source_valid", Pins(1)),
+        Subsignal("source_ready", Pins(1)),
+        Subsignal("source_data",  Pins(8)),
+
+        Subsignal("sink_valid",   Pins(1)),
+        Subsignal("sink_ready",   Pins(1)),
+        Subsignal("sink_data",    Pins(8)),
+    ),
+]
+
+class Platform(SimPlatform):
+    def __init__(self):
+        SimPlatform.__init__(self, "SIM", _io)
+
+# Reference SoC ------------------------------------------------------------------------------------
+
+class BenchSoC(SoCCore):
+    def __init__(self, ngpios=8, ndecoders=4):
+        platform = Platform()
+        SoCCore.__init__(self, platform, clk_freq=int(1e6),
+            cpu_type                 = None,
+            uart_name                = "sim",
+            integrated_sram_size     = 0x1000,
+            integrated_main_ram_size = 0x10000)
+        self.submodules.crg = CRG(platform.request("sys_clk"))
+
+        # CSR peripherals.
+        for i in range(ngpios):
+            setattr(self.submodules, "gpio{}".format(i), GPIOOut(Signal(32)))
+            self.add_csr("gpio{}".format(i))
+
+        # Large comb groups (decoders with many targets).
+        for i in range(ndecoders):
+            sel  = Signal(8)
+            outs = [Signal(32) for j in range(64)]
+            self.comb += Case(sel, {k: [o.eq(k*j) for j, o in enumerate(outs)] for k in range(256)})
+            self.sync += sel.eq(sel + 1)
+            self.sync += Signal(32).eq(reduce(xor, outs))
+
+# Run ----------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Verilog conversion benchmark")
+    parser.add_argument("--ngpios",    default=8, type=int, help="Number of GPIO peripherals")
+    parser.add_argument("--ndecoders", default=4, type=int, help="Number of large comb decoders")
+    args = parser.parse_args()
+
+    def run(desc, **kwargs):
+        # Fresh tracer: same instance numbers (and names) as a new build process.
+        tracer.name_to_idx.clear()
+        tracer.classname_to_objs.clear()
+        t0  = time.perf_counter()
+        soc = BenchSoC(args.ngpios, args.ndecoders)
+        soc.finalize()
+        t1  = time.perf_counter()
+        v   = verilog.convert(soc.get_fragment(),
+            ios               = soc.platform.constraint_manager.get_io_signals(),
+            special_overrides = sim_special_overrides,
+            **kwargs)
+        t2  = time.perf_counter()
+        print("{:18}: elaboration {:6.2f}s, conversion {:6.2f}s, {} lines".format(
+            desc, t1 - t0, t2 - t1, str(v).count("\n")))
+
+    for regular_comb in [True, False]:
+        run("regular_comb={}".format(regular_comb), regular_comb=regular_comb)
+    with tempfile.TemporaryDirectory() as d:
+        run("cache (miss)", cache_dir=d)
+        run("cache (hit)",  cache_dir=d)
+
+if __name__ == "__main__":
+    main()
@@ -329,3 +329,299 @@ class TestAXI(unittest.TestCase):
             r_valid_random  = 90,
             r_ready_random  = 90
         )
+
+# AXI Interconnect Models --------------------------------------------------------------------------
+
+@passive
+def timeout_generator(ticks):
+    for i in range(ticks):
+        yield
+    raise TimeoutError("Timeout after %d ticks" % ticks)
+
+def _random_wait(prng, rand):
+    while prng.randrange(100) < rand:
+        yield
+
+def _pick_oldest_of_random_id(prng, pending):
+    # Reorders the responses of the different IDs, keeps the order of the responses of an ID.
+    _id = prng.choice(sorted(set(burst.id for burst in pending)))
+    return next(burst for burst in pending if burst.id == _id)
+
+
+class AXIMemoryModel:
+    """Slave model: memory with outstanding bursts, responses reordered across IDs"""
+    def __init__(self, axi, rand=0, seed=0, eager_w=False):
+        self.axi         = axi
+        self.rand        = rand
+        self.eager_w     = eager_w # W beats accepted even without write burst waiting for data.
+        self.w_orphans   = 0       # W beats received without write burst waiting for data.
+        self.prng        = random.Random(seed)
+        self.mem         = {}
+        self.bursts      = [] # Accepted (channel, Burst).
+        self.writes      = [] # Write bursts waiting for their data.
+        self.responses   = [] # Write bursts waiting for their response.
+        self.reads       = [] # Read bursts waiting for their data.
+        self.max_pending = 0
+
+    def ax_burst(self, ax):
+        burst    = Burst((yield ax.addr), (yield ax.burst), (yield ax.len), (yield ax.size))
+        burst.id    = (yield ax.id)
+        burst.beats = 0 # Data beats received.
+        return burst
+
+    @passive
+    def ax_handler(self, channel, queue):
+        ax = getattr(self.axi, channel)
+        while True:
+            yield ax.ready.eq(self.prng.randrange(100) >= self.rand)
+            yield
+            if (yield ax.valid) and (yield ax.ready):
+                burst = (yield from self.ax_burst(ax))
+                self.bursts.append((channel, burst))
+                queue.append(burst)
+                self.max_pending = max(self.max_pending, len(queue))
+
+    @passive
+    def w_handler(self):
+        w = self.axi.w
+        while True:
+            yield w.ready.eq((self.eager_w or len(self.writes) > 0) and
+                (self.prng.randrange(100) >= self.rand))
+            yield
+            if (yield w.valid) and (yield w.ready):
+                if not self.writes:
+                    self.w_orphans += 1
+                    continue
+                burst = self.writes[0]
+                beat  = burst.to_beats()[burst.beats]
+                self.mem[beat.addr] = (yield w.data)
+                burst.beats += 1
+                assert (yield w.last) == (burst.beats == burst.len + 1)
+                if (yield w.last):
+                    self.responses.append(self.writes.pop(0))
+
+    @passive
+    def b_handler(self):
+        b = self.axi.b
+        while True:
+            yield b.valid.eq(0)
+            yield
+            if not self.responses:
+                continue
+            yield from _random_wait(self.prng, self.rand)
+            burst = _pick_oldest_of_random_id(self.prng, self.responses)
+            yield b.valid.eq(1)
+            yield b.id.eq(burst.id)
+            yield b.resp.eq(RESP_OKAY)
+            yield
+            while not (yield b.ready):
+                yield
+            self.responses.remove(burst)
+
+    @passive
+    def r_handler(self):
+        r = self.axi.r
+        while True:
+            yield r.valid.eq(0)
+            yield
+            if not self.reads:
+                continue
+            burst = _pick_oldest_of_random_id(self.prng, self.reads)
+            beats = burst.to_beats()
+            for i, beat in enumerate(beats):
+                yield r.valid.eq(0)
+                yield from _random_wait(self.prng, self.rand)
+                yield r.valid.eq(1)
+                yield r.id.eq(burst.id)
+                yield r.resp.eq(RESP_OKAY)
+                yield r.data.eq(self.mem.get(beat.addr, 0))
+                yield r.last.eq(i == len(beats) - 1)
+                yield
+                while not (yield r.ready):
+                    yield
+            self.reads.remove(burst)
+
+    def generators(self):
+        return [
+            self.ax_handler("aw", self.writes),
+            self.w_handler(),
+            self.b_handler(),
+            self.ax_handler("ar", self.reads),
+            self.r_handler(),
+        ]
+
+
+class AXIBurstGenerator:
+    """Master model: write bursts then read them back, multiple outstanding bursts"""
+    def __init__(self, axi, accesses, rand=0, seed=0, aw_delay=0):
+        self.axi        = axi
+        self.accesses   = accesses # Write accesses, read back after the write responses.
+        self.rand       = rand
+        self.aw_delay   = aw_delay # Cycles before each AW (W data presented before their AW).
+        self.prng       = random.Random(seed)
+        self.writes_done = False
+        self.b_ids      = []
+        self.errors     = 0
+
+    def ax_generator(self, channel):
+        ax = getattr(self.axi, channel)
+        if channel == "ar":
+            while not self.writes_done:
+                yield
+        for access in self.accesses:
+            yield from _random_wait(self.prng, self.rand)
+            if channel == "aw":
+                for i in range(self.aw_delay):
+                    yield
+            yield ax.valid.eq(1)
+            yield ax.addr.eq(access.addr)
+            yield ax.burst.eq(access.type)
+            yield ax.len.eq(access.len)
+            yield ax.size.eq(access.size)
+            yield ax.id.eq(access.id)
+            yield
+            while not (yield ax.ready):
+                yield
+            yield ax.valid.eq(0)
+
+    def w_generator(self):
+        w = self.axi.w
+        yield w.strb.eq(2**len(w.strb) - 1)
+        for access in self.accesses:
+            for i, data in enumerate(access.data):
+                yield w.valid.eq(0)
+                yield from _random_wait(self.prng, self.rand)
+                yield w.valid.eq(1)
+                yield w.data.eq(data)
+                yield w.last.eq(i == len(access.data) - 1)
+                yield
+                while not (yield w.ready):
+                    yield
+        yield w.valid.eq(0)
+
+    def b_generator(self):
+        b = self.axi.b
+        while len(self.b_ids) < len(self.accesses):
+            yield b.ready.eq(self.prng.randrange(100) >= self.rand)
+            yield
+            if (yield b.valid) and (yield b.ready):
+                self.b_ids.append((yield b.id))
+                if (yield b.resp) != RESP_OKAY:
+                    self.errors += 1
+        yield b.ready.eq(0)
+        self.writes_done = True
+
+    def r_generator(self):
+        r = self.axi.r
+        # Expected beats, per ID.
+        expected = {}
+        for access in self.accesses:
+            for i, data in enumerate(access.data):
+                expected.setdefault(access.id, []).append((data, i == len(access.data) - 1))
+        n = sum(len(access.data) for access in self.accesses)
+        while n:
+            yield r.ready.eq(self.prng.randrange(100) >= self.rand)
+            yield
+            if (yield r.valid) and (yield r.ready):
+                data, last = expected[(yield r.id)].pop(0)
+                if (yield r.data) != data or (yield r.last) != last:
+                    self.errors += 1
+                n -= 1
+        yield r.ready.eq(0)
+
+    def generators(self):
+        return [
+            self.ax_generator("aw"),
+            self.w_generator(),
+            self.b_generator(),
+            self.ax_generator("ar"),
+            self.r_generator(),
+        ]
+
+# TestAXIInterconnect ------------------------------------------------------------------------------
+
+class AXIInterconnectDUT(Module):
+    def __init__(self, interconnect, n_masters=3, n_slaves=2, id_width=2, **kwargs):
+        index_bits   = log2_int(n_masters, need_pow2=False)
+        self.masters = [AXIInterface(data_width=32, address_width=32, id_width=id_width)
+            for i in range(n_masters)]
+        self.slaves  = [AXIInterface(data_width=32, address_width=32, id_width=id_width + index_bits)
+            for i in range(n_slaves)]
+        # Slave i at 0x1000*i (decoders on word addresses).
+        slaves = [(lambda a, i=i: a[10:12] == i, slave) for i, slave in enumerate(self.slaves)]
+        self.submodules.interconnect = interconnect(self.masters, slaves, **kwargs)
+
+
+class TestAXIInterconnect(unittest.TestCase):
+    def interconnect_test(self, interconnect, rand=0, n_bursts=8, timeout=20000,
+        aw_delay=0, eager_w=False, **kwargs):
+        dut  = AXIInterconnectDUT(interconnect, **kwargs)
+        prng = random.Random(42)
+
+        # Bursts of each master to its own region of the slaves.
+        masters = []
+        for n, master in enumerate(dut.masters):
+            accesses = []
+            for k in range(n_bursts):
+                _len  = prng.randrange(16)
+                _data = [prng.randrange(2**32) for i in range(_len + 1)]
+                _addr = 0x1000*prng.randrange(len(dut.slaves)) + 0x400*n + 0x40*k
+                accesses.append(Write(_addr, _data, prng.randrange(2**master.id_width),
+                    type=BURST_INCR, len=_len, size=log2_int(32//8)))
+            masters.append(AXIBurstGenerator(master, accesses, rand=rand, seed=n, aw_delay=aw_delay))
+        slaves = [AXIMemoryModel(slave, rand=rand, seed=100 + n, eager_w=eager_w)
+            for n, slave in enumerate(dut.slaves)]
+
+        generators = [timeout_generator(timeout)]
+        for model in masters + slaves:
+            generators += model.generators()
+        run_simulation(dut, generators)
+
+        for slave in slaves:
+            self.assertEqual(slave.w_orphans, 0)
+        for master in masters:
+            self.assertEqual(master.errors, 0)
+            self.assertEqual(sorted(master.b_ids), sorted(a.id for a in master.accesses))
+        # Bursts kept, on the right slave, with the index of the master in the ID.
+        for i, slave in enumerate(slaves):
+            for channel, burst in slave.bursts:
+                self.assertEqual(burst.addr >> 12, i)
+                n      = (burst.addr >> 10) & 0b11
+                access = next(a for a in masters[n].accesses if a.addr == burst.addr)
+                self.assertEqual(burst.len, access.len)
+                self.assertEqual(burst.id, access.id | (n << dut.masters[0].id_width))
+        self.assertEqual(sum(len(slave.bursts) for slave in slaves),
+            2*sum(len(master.accesses) for master in masters))
+        return slaves
+
+    def test_crossbar_no_random(self):
+        slaves = self.interconnect_test(AXICrossbar)
+        # Outstanding bursts on the slaves.
+        self.assertGreater(max(slave.max_pending for slave in slaves), 1)
+
+    def test_crossbar_random(self):
+        self.interconnect_test(AXICrossbar, rand=50)
+
+    def test_crossbar_max_outstanding(self):
+        slaves = self.interconnect_test(AXICrossbar, rand=30, max_outstanding=1)
+        # One outstanding burst per direction on each slave.
+        self.assertEqual(max(slave.max_pending for slave in slaves), 1)
+
+    def test_w_before_aw(self):
+        # W data presented before their AW, slaves accepting W data eagerly.
+        def decoder(masters, slaves, **kwargs):
+            return AXIDecoder(masters[0], slaves, **kwargs)
+        for interconnect, n_masters in [(decoder, 1), (AXICrossbar, 3), (AXIInterconnectShared, 3)]:
+            self.interconnect_test(interconnect, n_masters=n_masters, aw_delay=8, eager_w=True)
+            self.interconnect_test(interconnect, n_masters=n_masters, rand=30, aw_delay=4, eager_w=True)
+
+    def test_interconnect_shared(self):
+        self.interconnect_test(AXIInterconnectShared, rand=50)
+
+    def test_crossbar_single_master(self):
+        self.interconnect_test(AXICrossbar, rand=50, n_masters=1, n_slaves=3)
+
+    def test_crossbar_id_width(self):
+        with self.assertRaises(ValueError):
+            AXICrossbar([AXIInterface(id_width=2) for i in range(2)], [
+                (lambda a: 1, AXIInterface(id_width=2))])
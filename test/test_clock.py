@@ -9,6 +9,36 @@ import unittest
 from migen import *
 
 from litex.soc.cores.clock import *
+from litex.soc.cores.clock.common import compute_pll_config, _compute_pll_config, clkdiv_range
+
+
+def legacy_pll_config(clkin_freq, vco_freq_range, pre_div_range, mult_range, clkouts,
+    vco_margin=0, mult_reversed=True):
+    # Previous solver of the Xilinx/ECP5 compute_config: first match.
+    for pre_div in range(*pre_div_range):
+        mults = range(*mult_range)
+        for mult in (reversed(mults) if mult_reversed else mults):
+            vco_freq = clkin_freq*mult/pre_div
+            if not (vco_freq_range[0]*(1 + vco_margin) <= vco_freq <= vco_freq_range[1]*(1 - vco_margin)):
+                continue
+            divs = []
+            for f, m, d_ranges in clkouts:
+                div = None
+                for d_range in d_ranges:
+                    for d in clkdiv_range(*d_range):
+                        if abs(vco_freq/d - f) <= f*m:
+                            div = d
+                            break
+                if div is None:
+                    break
+                divs.append(div)
+            else:
+                return (pre_div, mult, vco_freq, tuple(divs))
+    raise ValueError("No PLL config found")
+
+def pll_config_error(config, clkouts):
+    pre_div, mult, vco_freq, divs = config
+    return sum(abs(vco_freq/d - f)/f for (f, m, d_ranges), d in zip(clkouts, divs))
 
 
 class TestClock(unittest.TestCase):
@@ -120,6 +150,71 @@ class TestClock(unittest.TestCase):
             pll.create_clkout(ClockDomain("clkout{}".format(i)), 200e6)
         pll.compute_config()
 
+    # PLL Solver
+    def pll_solver_requests(self):
+        s7mmcm = dict(vco_freq_range=(600e6, 1200e6), pre_div_range=(1, 106+1), mult_range=(2, 64+1))
+        ecp5   = dict(vco_freq_range=(400e6,  800e6), pre_div_range=(1, 128+1), mult_range=(1, 128+1))
+        d_int  = [(1, 128+1)]
+        d_frac = [(1, 128+1), (1, 128 + 1/8, 1/8)]
+        for clkin_freq, freqs in [
+            (100e6, [100e6, 200e6, 200e6, 50e6]),
+            (100e6, [150e6, 75e6, 125e6]),
+            (125e6, [148.5e6, 74.25e6]),
+            (50e6,  [83.333e6, 166.666e6, 25e6, 12.5e6, 33.333e6, 41.666e6]),
+            (27e6,  [108e6, 54e6, 13.5e6]),
+            (24e6,  [60e6, 60e6, 60e6]),
+        ]:
+            yield clkin_freq, False, s7mmcm, [(f, 1e-2, d_frac if n == 0 else d_int) for n, f in enumerate(freqs)]
+            yield clkin_freq, True,  ecp5,   [(f, 1e-2, d_int) for f in freqs[:3]]
+
+    def test_pll_solver(self):
+        for clkin_freq, ecp5, kwargs, clkouts in self.pll_solver_requests():
+            legacy = legacy_pll_config(clkin_freq, clkouts=clkouts, mult_reversed=not ecp5, **kwargs)
+            config = compute_pll_config(clkin_freq, clkouts=clkouts, **kwargs)
+            pre_div, mult, vco_freq, divs = config
+            # Valid config.
+            self.assertTrue(kwargs["pre_div_range"][0] <= pre_div < kwargs["pre_div_range"][1])
+            self.assertTrue(kwargs["mult_range"][0] <= mult < kwargs["mult_range"][1])
+            self.assertTrue(kwargs["vco_freq_range"][0] <= vco_freq <= kwargs["vco_freq_range"][1])
+            for (f, m, d_ranges), d in zip(clkouts, divs):
+                self.assertLessEqual(abs(vco_freq/d - f), f*m)
+            # Never worse than the previous solver: PFD/VCO frequencies then error.
+            self.assertEqual(pre_div, legacy[0])
+            self.assertGreaterEqual(vco_freq, legacy[2])
+            if vco_freq == legacy[2]:
+                self.assertLessEqual(pll_config_error(config, clkouts), pll_config_error(legacy, clkouts))
+
+    def test_pll_solver_memoize(self):
+        clkouts = [(f, 1e-3, [(1, 128+1), (1, 128 + 1/8, 1/8)]) for f in [83.3e6, 66.6e6, 33.3e6, 27e6, 13.5e6]]
+        kwargs  = dict(clkin_freq=33.33e6, vco_freq_range=(600e6, 1200e6),
+            pre_div_range=(1, 106+1), mult_range=(2, 64+1), clkouts=clkouts)
+        _compute_pll_config.cache_clear()
+        config = compute_pll_config(**kwargs)
+        self.assertEqual(compute_pll_config(**kwargs), config)
+        self.assertEqual(_compute_pll_config.cache_info().hits, 1)
+
+    def test_pll_solver_divider_range(self):
+        # Ideal divider above the range: edge divider within margin.
+        config = compute_pll_config(100e6, (600e6, 1200e6), (1, 2), (6, 7),
+            [(600e6/128.2, 1e-2, [(1, 128 + 1/8, 1/8)])])
+        self.assertEqual(config[3], (128,))
+
+    def test_pll_solver_no_config(self):
+        with self.assertRaises(ValueError):
+            compute_pll_config(100e6, (600e6, 1200e6), (1, 2), (2, 3), [(100e6, 1e-2, [(1, 2)])])
+
+    def test_s7mmcm_config(self):
+        mmcm = S7MMCM()
+        mmcm.register_clkin(Signal(), 100e6)
+        mmcm.create_clkout(ClockDomain("clkout0"), 148.5e6)
+        mmcm.create_clkout(ClockDomain("clkout1"), 200e6)
+        config = mmcm.compute_config()
+        # Highest VCO, nearest (fractional) divider.
+        self.assertEqual(config["divclk_divide"], 1)
+        self.assertEqual(config["vco"], 1200e6)
+        self.assertEqual(config["clkout0_divide"], 8.125)
+        self.assertEqual(config["clkout1_divide"], 6)
+
     # Lattice / NX
     def test_nxpll(self):
         pll = NXPLL()
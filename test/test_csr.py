@@ -125,3 +125,26 @@ class TestCSR(unittest.TestCase):
                 ]
         dut = DUT()
         run_simulation(dut, generator(dut))
+
+    def test_autocsr_cache(self):
+        class Child(Module, csr.AutoCSR):
+            def __init__(self):
+                self.a = csr.CSRStorage(8, name="a")
+
+        class Parent(Module, csr.AutoCSR):
+            def __init__(self):
+                self.child = Child()
+                self.b     = csr.CSRStatus(8, name="b")
+
+        parent = Parent()
+        # Not memoized before finalization: CSRs can still be added.
+        self.assertEqual([c.name for c in parent.get_csrs()], ["child_a", "b"])
+        parent.child.c = csr.CSRStorage(8, name="c")
+        self.assertEqual([c.name for c in parent.get_csrs()], ["child_a", "b", "child_c"])
+        # Memoized once finalized: same CSRs (not prefixed twice), returned lists can be modified.
+        parent.finalize()
+        csrs = parent.get_csrs()
+        self.assertEqual([c.name for c in csrs], ["child_a", "b", "child_c"])
+        csrs.append(None)
+        self.assertEqual(parent.get_csrs(), csrs[:-1])
+        self.assertEqual(parent.child.get_csrs()[0].name, "child_a")
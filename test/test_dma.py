@@ -0,0 +1,124 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import unittest
+import random
+
+from migen import *
+
+from litex.soc.interconnect import wishbone
+from litex.soc.cores.dma import WishboneDMAReader, WishboneDMAWriter
+
+# Helpers ------------------------------------------------------------------------------------------
+
+class DMADUT(Module):
+    def __init__(self, dma_cls, burst=False, sram_burst=False, init=[], **kwargs):
+        bus = wishbone.Interface()
+        self.submodules.sram = wishbone.SRAM(1024, init=init, bus=bus, burst=sram_burst)
+        self.submodules.dma  = dma_cls(bus, endianness="big", burst=burst, **kwargs)
+
+# TestDMA ------------------------------------------------------------------------------------------
+
+class TestDMA(unittest.TestCase):
+    def reader_test(self, n=64, ready_rate=1.0, **kwargs):
+        # Return the achieved words per cycle. (The generators get the DUT as argument: the signal
+        # names are traced back from the variables of the callers.)
+        prng  = random.Random(42)
+        init  = [prng.randrange(2**32) for i in range(256)]
+        dut   = DMADUT(WishboneDMAReader, init=init, **kwargs)
+        datas = []
+        cycles = [0]
+
+        def producer(dut):
+            for i in range(n):
+                yield dut.dma.sink.valid.eq(1)
+                yield dut.dma.sink.address.eq(i)
+                yield dut.dma.sink.last.eq(i == n - 1)
+                yield
+                while not (yield dut.dma.sink.ready):
+                    yield
+            yield dut.dma.sink.valid.eq(0)
+
+        def consumer(dut):
+            while len(datas) < n:
+                yield dut.dma.source.ready.eq(prng.random() < ready_rate)
+                yield
+                cycles[0] += 1
+                if (yield dut.dma.source.valid) and (yield dut.dma.source.ready):
+                    datas.append((yield dut.dma.source.data))
+                    if len(datas) == n:
+                        self.assertEqual((yield dut.dma.source.last), 1)
+
+        run_simulation(dut, [producer(dut), consumer(dut)])
+        self.assertEqual(datas, init[:n])
+        return n/cycles[0]
+
+    def writer_test(self, n=64, **kwargs):
+        # Return the achieved words per cycle.
+        prng   = random.Random(42)
+        datas  = [prng.randrange(2**32) for i in range(n)]
+        dut    = DMADUT(WishboneDMAWriter, **kwargs)
+        cycles = [0]
+
+        def producer(dut):
+            for i in range(n):
+                yield dut.dma.sink.valid.eq(1)
+                yield dut.dma.sink.address.eq(i)
+                yield dut.dma.sink.data.eq(datas[i])
+                yield dut.dma.sink.last.eq(i == n - 1)
+                yield
+                cycles[0] += 1
+                while not (yield dut.dma.sink.ready):
+                    yield
+                    cycles[0] += 1
+            yield dut.dma.sink.valid.eq(0)
+            yield
+            for i in range(n):
+                self.assertEqual((yield dut.sram.mem[i]), datas[i])
+
+        run_simulation(dut, producer(dut))
+        return n/cycles[0]
+
+    def test_reader(self):
+        # Classic accesses: limited by the 2 cycles accesses of the SRAM.
+        self.assertGreaterEqual(self.reader_test(), 0.45)
+        self.assertGreaterEqual(self.reader_test(burst=True), 0.45)
+        # Bursts: one word per cycle.
+        self.assertGreaterEqual(self.reader_test(burst=True, sram_burst=True), 0.9)
+        # Source backpressure, small FIFO.
+        self.reader_test(burst=True, sram_burst=True, ready_rate=0.5, fifo_depth=2)
+        self.reader_test(ready_rate=0.3, fifo_depth=4)
+
+    def test_writer(self):
+        self.assertGreaterEqual(self.writer_test(), 0.45)
+        self.assertGreaterEqual(self.writer_test(burst=True, sram_burst=True), 0.9)
+
+    def test_sram_wrapped_burst(self):
+        init = list(range(16))
+        dut  = wishbone.SRAM(64, init=init, burst=True)
+
+        def generator(bus):
+            # 4 beats wrapped burst, starting at 6: 6, 7, 4, 5.
+            datas = []
+            adr   = 6
+            yield bus.cyc.eq(1)
+            yield bus.stb.eq(1)
+            yield bus.bte.eq(wishbone.BTE_BURST_4)
+            for i in range(4):
+                yield bus.adr.eq(adr)
+                yield bus.cti.eq(wishbone.CTI_BURST_END if i == 3 else wishbone.CTI_BURST_INCREMENTING)
+                yield
+                while not (yield bus.ack):
+                    yield
+                datas.append((yield bus.dat_r))
+                adr = (adr & ~0b11) | ((adr + 1) & 0b11)
+            yield bus.cyc.eq(0)
+            yield bus.stb.eq(0)
+            yield
+            self.assertEqual(datas, [6, 7, 4, 5])
+            self.assertEqual((yield from bus.read(9)), 9)
+
+        run_simulation(dut, generator(dut.bus))
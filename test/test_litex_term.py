@@ -0,0 +1,270 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import time
+import zlib
+import random
+import tempfile
+import unittest
+import threading
+import collections
+from unittest import mock
+
+from litex.tools import litex_term
+from litex.tools.litex_term import *
+
+
+class SFLDevice:
+    # Model of the BIOS serialboot: frames written to the port are executed on memory. Frames can be
+    # corrupted (CRC error) or lost (the next frame is then seen as corrupted). A slow device
+    # (frame_time, crc_time for the CRC frames) executes the frames from a RX buffer of rx_frames
+    # frames: frames received when full are corrupted (overrun) and, as on CRC errors, the RX buffer
+    # is flushed.
+    def __init__(self, base=0x40000000, size=0x100000, extensions=True,
+        corrupt=[], lose=[], frame_time=0, crc_time=0, rx_frames=None):
+        self.base       = base
+        self.mem        = bytearray(size)
+        self.extensions = extensions
+        self.corrupt    = corrupt
+        self.lose       = lose
+        self.frame_time = frame_time
+        self.crc_time   = crc_time
+        self.rx_frames  = rx_frames
+        self.timeout    = None
+        self.rx         = bytearray()
+        self.tx         = bytearray()
+        self.frames     = collections.deque()
+        self.received   = 0
+        self.cmds       = []
+        self.cond       = threading.Condition()
+        if frame_time:
+            self.alive  = True
+            self.thread = threading.Thread(target=self.worker, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        if self.frame_time:
+            with self.cond:
+                self.alive = False
+                self.cond.notify_all()
+            self.thread.join()
+
+    @property
+    def in_waiting(self):
+        return len(self.tx)
+
+    def read(self, size=1):
+        with self.cond:
+            self.cond.wait_for(lambda: len(self.tx) >= size, self.timeout)
+            data = bytes(self.tx[:size])
+            del self.tx[:size]
+            return data
+
+    def write(self, data):
+        with self.cond:
+            self.rx += data
+            while len(self.rx) >= 4 and len(self.rx) >= 4 + self.rx[0]:
+                frame = bytes(self.rx[:4 + self.rx[0]])
+                del self.rx[:4 + self.rx[0]]
+                corrupted = self.received in self.corrupt or self.received - 1 in self.lose
+                corrupted |= (self.rx_frames is not None) and len(self.frames) >= self.rx_frames
+                if self.received not in self.lose:
+                    self.frames.append(frame[:-1] + bytes([frame[-1] ^ corrupted]))
+                self.received += 1
+            if not self.frame_time:
+                while self.frames:
+                    self.receive(self.frames.popleft())
+            self.cond.notify_all()
+
+    def worker(self):
+        with self.cond:
+            while self.alive:
+                self.cond.wait(self.frame_time)
+                if self.frames:
+                    frame = self.frames.popleft()
+                    if frame[3:4] == sfl_cmd_crc:
+                        # RX buffer not drained while computing the CRC.
+                        deadline = time.time() + self.crc_time
+                        while self.alive and time.time() < deadline:
+                            self.cond.wait(deadline - time.time())
+                    self.receive(frame)
+                    self.cond.notify_all()
+
+    def receive(self, frame):
+        crc     = int.from_bytes(frame[1:3], "big")
+        cmd     = frame[3:4]
+        payload = frame[4:]
+        if crc16(list(cmd + payload)) != crc:
+            self.frames.clear()
+            self.tx += sfl_ack_crcerror
+            return
+        self.cmds.append(ord(cmd))
+        self.execute(cmd, payload)
+
+    def execute(self, cmd, payload):
+        address = int.from_bytes(payload[0:4], "big") - self.base
+        if cmd == sfl_cmd_load:
+            self.mem[address:address + len(payload) - 4] = payload[4:]
+        elif cmd == sfl_cmd_fill and self.extensions:
+            length = int.from_bytes(payload[4:8], "big")
+            self.mem[address:address + length] = payload[8:9]*length
+        elif cmd == sfl_cmd_load_lz and self.extensions:
+            lz_decompress(payload[4:], self.mem, address)
+        elif cmd == sfl_cmd_crc and self.extensions:
+            length = int.from_bytes(payload[4:8], "big")
+            crc    = zlib.crc32(self.mem[max(address, 0):max(address, 0) + length])
+            self.tx += sfl_ack_success + crc.to_bytes(4, "big")
+            return
+        else:
+            self.tx += sfl_ack_unknown
+            return
+        self.tx += sfl_ack_success
+
+
+class TestLiteXTerm(unittest.TestCase):
+    def upload(self, data, device, **kwargs):
+        with mock.patch.object(litex_term, "Console"):
+            term = LiteXTerm(False, None, None, None, False, **kwargs)
+        term.port           = device
+        term.payload_length = sfl_payload_length
+        term.delay          = 0
+        with tempfile.TemporaryDirectory() as d:
+            filename = os.path.join(d, "image.bin")
+            with open(filename, "wb") as f:
+                f.write(data)
+            with mock.patch("sys.stdout"):
+                self.assertEqual(term.upload(filename, device.base), len(data))
+        self.assertEqual(device.mem[:len(data)], data)
+        self.assertEqual(device.tx, b"")
+        return len(device.cmds)
+
+    def image(self, seed=0):
+        # Code-like data (repeated words), random data and zeroed areas.
+        prng  = random.Random(seed)
+        words = [prng.randrange(2**32).to_bytes(4, "little") for i in range(64)]
+        data  = b"".join(prng.choice(words) for i in range(20000))
+        data += bytes(prng.randrange(256) for i in range(10000))
+        data += bytes(100000)
+        data += b"".join(prng.choice(words) for i in range(1000))
+        data += b"\xff"*1000 + b"\x12"
+        return data
+
+    def test_lz(self):
+        prng = random.Random(42)
+        for data in [b"", b"a", b"ab"*200, bytes(1000), self.image()[:30000],
+            bytes(prng.randrange(4) for i in range(3000))]:
+            compressor = LZCompressor(data)
+            mem        = bytearray(len(data))
+            position   = 0
+            while position < len(data):
+                payload, consumed = compressor.compress(position, len(data), 251)
+                self.assertLessEqual(len(payload), 251)
+                self.assertGreater(consumed, 0)
+                self.assertEqual(lz_decompress(payload, mem, position), position + consumed)
+                position += consumed
+            self.assertEqual(mem, data)
+
+    def test_upload(self):
+        data   = self.image()
+        device = SFLDevice()
+        frames = self.upload(data, device)
+        # Zeroed areas filled, code compressed: less frames than a raw upload.
+        self.assertLess(frames, len(data)//(sfl_payload_length - 4)//2)
+        self.assertTrue(ord(sfl_cmd_fill) in device.cmds)
+        self.assertTrue(ord(sfl_cmd_load_lz) in device.cmds)
+
+    def test_upload_raw(self):
+        data = self.image()
+        for device, kwargs in [
+            (SFLDevice(extensions=False), {}),
+            (SFLDevice(), {"raw_upload": True})]:
+            self.upload(data, device, **kwargs)
+            self.assertEqual(device.cmds.count(ord(sfl_cmd_load)),
+                (len(data) + sfl_payload_length - 5)//(sfl_payload_length - 4))
+            self.assertFalse(ord(sfl_cmd_fill) in device.cmds)
+            self.assertFalse(ord(sfl_cmd_load_lz) in device.cmds)
+
+    def test_upload_loaded(self):
+        prng   = random.Random(1)
+        data   = bytes(prng.randrange(256) for i in range(4*sfl_block_size + 100))
+        device = SFLDevice()
+        # First and third blocks already loaded (reupload of a partially modified image).
+        device.mem[0:sfl_block_size] = data[0:sfl_block_size]
+        device.mem[2*sfl_block_size:3*sfl_block_size] = data[2*sfl_block_size:3*sfl_block_size]
+        self.upload(data, device)
+        loads = device.cmds.count(ord(sfl_cmd_load))
+        self.assertEqual(loads, 2*((sfl_block_size + sfl_payload_length - 5)//(sfl_payload_length - 4)) + 1)
+        # Everything loaded: only the CRC frames.
+        device.cmds = []
+        self.upload(data, device)
+        self.assertEqual(set(device.cmds), {ord(sfl_cmd_crc)})
+
+    def test_window(self):
+        window = SFLWindow(size=4, max_size=32, delay=1e-3)
+        # Slow start, without errors the delay is halved on each window.
+        for i in range(16):
+            window.ack(latency=1e-3, now=i*1e-4)
+        self.assertEqual(window.size, 20)
+        self.assertLess(window.delay, 1e-3)
+        # Capped to twice the frames in flight needed for the ack rate.
+        for i in range(16, 64):
+            window.ack(latency=1e-3, now=i*1e-4)
+        self.assertEqual(window.size, 21)
+        # Halved on errors.
+        window.error()
+        self.assertEqual((window.size, window.threshold), (1, 10))
+        self.assertGreater(window.delay, 0)
+        self.assertGreaterEqual(window.timeout, sfl_ack_timeout)
+        for i in range(9):
+            window.ack(latency=1e-3)
+        self.assertEqual(window.size, 10)
+        for i in range(10):
+            window.ack(latency=1e-3)
+        self.assertEqual(window.size, 11)
+
+    def test_upload_errors(self):
+        data   = self.image()
+        device = SFLDevice()
+        self.upload(data, device)
+        frames = device.received
+        device = SFLDevice(corrupt=[10, 11, 100], lose=[50, 300])
+        self.upload(data, device)
+        self.assertGreater(device.received, frames)
+        # Last frame lost: ack timeout and resends (first one seen as corrupted).
+        device = SFLDevice(lose=[frames - 1])
+        self.upload(data, device)
+        self.assertEqual(device.received, frames + 2)
+
+    def test_upload_overrun(self):
+        # Slow device with a small RX buffer: window adapted to avoid overruns.
+        prng   = random.Random(2)
+        data   = bytes(prng.randrange(256) for i in range(256*(sfl_payload_length - 4)))
+        device = SFLDevice(frame_time=1e-3, rx_frames=4)
+        try:
+            self.upload(data, device)
+        finally:
+            device.stop()
+        self.assertLess(device.received, 2*256)
+
+    def test_upload_loaded_slow_crc(self):
+        # Slow CRC and small RX buffer: CRC frames not overrunning the device; lost CRC frame/reply
+        # (timeout) recovered.
+        prng = random.Random(3)
+        data = bytes(prng.randrange(256) for i in range(1024))*(8*sfl_block_size//1024)
+        for lose in [[], [3]]:
+            device = SFLDevice(frame_time=1e-4, crc_time=1e-2, rx_frames=2, lose=lose)
+            device.mem[:6*sfl_block_size] = data[:6*sfl_block_size]
+            try:
+                self.upload(data, device)
+            finally:
+                device.stop()
+            # Probe and one CRC frame per block executed, loaded blocks skipped.
+            self.assertEqual(device.cmds.count(ord(sfl_cmd_crc)), 1 + 8)
+            self.assertLess(len(device.cmds) - 9, 2*sfl_block_size//(sfl_payload_length - 4))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import time
+import unittest
+import random
+import threading
+
+from litex.tools.remote.etherbone import EtherbonePacket, EtherboneRecord
+from litex.tools.remote.etherbone import EtherboneReads, EtherboneWrites
+from litex.tools.remote.etherbone import EtherboneRead, EtherboneWrite
+from litex.tools.litex_client import RemoteClient
+from litex.tools.litex_server import RemoteServer
+
+
+class CommMemory:
+    # Memory mapped comm: 32-bit words, byte addresses.
+    def __init__(self, fail_addr=None):
+        self.mem       = {}
+        self.reads     = 0
+        self.writes    = 0
+        self.fail_addr = fail_addr # Reads of this address raise (comm error).
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def read(self, addr, length=None, burst="incr"):
+        self.reads += 1
+        if addr == self.fail_addr:
+            raise IOError("Comm error")
+        length_int = 1 if length is None else length
+        incr  = (burst == "incr")
+        datas = [self.mem.get(addr + 4*incr*i, 0) for i in range(length_int)]
+        return datas[0] if length is None else datas
+
+    def write(self, addr, datas):
+        self.writes += 1
+        for i, data in enumerate(datas):
+            self.mem[addr + 4*i] = data
+
+
+class TestEtherbone(unittest.TestCase):
+    def test_codec(self):
+        record = EtherboneRecord()
+        record.writes = EtherboneWrites(base_addr=0x1234, datas=[1, 2, 0xffffffff])
+        record.reads  = EtherboneReads(base_ret_addr=5, addrs=[7, 8])
+        record.cyc    = 1
+        packet = EtherbonePacket()
+        packet.records = [record]
+        packet.pf      = 1
+        packet.encode()
+        self.assertEqual(bytes(packet.bytes).hex(),
+            "4e6f114400000000100f0302" +
+            "00001234" + "00000001" + "00000002" + "ffffffff" +
+            "00000005" + "00000007" + "00000008")
+
+        packet = EtherbonePacket(packet.bytes)
+        packet.decode()
+        record = packet.records[0]
+        self.assertEqual(packet.pf, 1)
+        self.assertEqual((record.cyc, record.wcount, record.rcount), (1, 3, 2))
+        self.assertEqual(record.writes.base_addr, 0x1234)
+        self.assertEqual(record.writes.get_datas(), [1, 2, 0xffffffff])
+        self.assertEqual(record.reads.base_ret_addr, 5)
+        self.assertEqual(record.reads.get_addrs(), [7, 8])
+
+    def test_burst(self):
+        datas = [0x10000000 + i for i in range(255)]
+        record = EtherboneRecord()
+        record.writes = EtherboneWrites(datas=datas)
+        packet = EtherbonePacket()
+        packet.records = [record]
+        packet.encode()
+        packet = EtherbonePacket(packet.bytes)
+        packet.decode()
+        self.assertEqual(packet.records[0].writes.get_datas(), datas)
+        with self.assertRaises(ValueError):
+            EtherboneWrites(datas=datas + [0])
+
+
+    def test_record_modifications(self):
+        # Writes/reads modified (in place or added) after decoding, then encoded.
+        record = EtherboneRecord()
+        record.writes = EtherboneWrites(base_addr=0x100, datas=[1, 2])
+        record.reads  = EtherboneReads(base_ret_addr=0x200, addrs=[3, 4])
+        packet = EtherbonePacket()
+        packet.records = [record]
+        packet.encode()
+        packet = EtherbonePacket(packet.bytes)
+        packet.decode()
+        record = packet.records[0]
+        record.writes.writes[0].data = 5
+        record.writes.writes.append(EtherboneWrite(6))
+        record.writes.add(EtherboneWrite(7))
+        record.reads.reads[1].addr = 8
+        record.reads.add(EtherboneRead(9))
+        self.assertEqual(record.writes.get_datas(), [5, 2, 6, 7])
+        self.assertEqual(record.reads.get_addrs(), [3, 8, 9])
+        packet = EtherbonePacket()
+        packet.records = [record]
+        packet.encode()
+        packet = EtherbonePacket(packet.bytes)
+        packet.decode()
+        record = packet.records[0]
+        self.assertEqual((record.wcount, record.rcount), (4, 3))
+        self.assertEqual(record.writes.get_datas(), [5, 2, 6, 7])
+        self.assertEqual(record.reads.get_addrs(), [3, 8, 9])
+
+
+class TestRemote(unittest.TestCase):
+    def setUp(self):
+        self.comm   = CommMemory()
+        self.server = RemoteServer(self.comm, "localhost", 0)
+        self.server.open()
+        self.server.start(1)
+        self.port = self.server.socket.getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_read_write(self):
+        wb = RemoteClient(port=self.port, csr_data_width=32)
+        wb.open()
+        wb.write(0x100, 0x12345678)
+        wb.write(0x200, list(range(16)))
+        self.assertEqual(wb.read(0x100), 0x12345678)
+        self.assertEqual(wb.read(0x200, 16), list(range(16)))
+        self.assertEqual(wb.read(0x200, 4, burst="fixed"), [0]*4)
+        wb.close()
+
+    def test_pipelined(self):
+        wb = RemoteClient(port=self.port, csr_data_width=32, max_outstanding=4)
+        wb.open()
+        wb.write(0, list(range(255)))
+        futures = [wb.read_async(4*i) for i in range(64)]
+        self.assertEqual([f.result() for f in futures], list(range(64)))
+        wb.close()
+
+    def test_batch(self):
+        wb = RemoteClient(port=self.port, csr_data_width=32, max_outstanding=2)
+        wb.open()
+        with wb.batch():
+            for i in range(32):
+                wb.write(0x1000 + 4*i, i + 1)
+            futures = [wb.read_async(0x1000 + 4*i) for i in range(32)]
+            bursts  = [wb.read_async(0x1000, 32) for i in range(16)]
+            # Nothing sent before the end of the batch.
+            self.assertFalse(futures[0].done())
+        self.assertEqual([f.result() for f in futures], [i + 1 for i in range(32)])
+        for f in bursts:
+            self.assertEqual(f.result(), [i + 1 for i in range(32)])
+        # Reads packed in records of up to 255 reads.
+        self.assertEqual(self.comm.reads, 32 + 32*16)
+        with wb.batch():
+            wb.write(0x2000, 0xdeadbeef)
+            self.assertEqual(wb.read(0x2000), 0xdeadbeef)
+        wb.close()
+
+    def test_multi_client(self):
+        self.server.close()
+        self.comm   = CommMemory()
+        self.server = RemoteServer(self.comm, "localhost", 0)
+        self.server.max_read_length = 256
+        self.server.open()
+        self.server.start(4)
+        self.port = self.server.socket.getsockname()[1]
+
+        results = {}
+        def client(n):
+            wb = RemoteClient(port=self.port, csr_data_width=32)
+            wb.open()
+            wb.write(0x1000*n, [n*256 + i for i in range(64)])
+            futures = [wb.read_async(0x1000*n + 4*i) for i in range(64)]
+            results[n] = [f.result() for f in futures]
+            wb.close()
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for n in range(4):
+            self.assertEqual(results[n], [n*256 + i for i in range(64)])
+        stats = self.server.stats
+        self.assertEqual(stats.transactions, 4*(1 + 64))
+        self.assertEqual(stats.reads,  4*64)
+        self.assertEqual(stats.writes, 4*64)
+        self.assertLessEqual(stats.comm_reads, stats.reads)
+        self.assertEqual(stats.depth, 0)
+
+    def test_comm_error(self):
+        self.comm.fail_addr = 0x100
+        wb = RemoteClient(port=self.port, csr_data_width=32, max_outstanding=16)
+        wb.open()
+        start = time.monotonic()
+        with wb.batch():
+            futures = [wb.read_async(0x100)]
+            for i in range(8):
+                wb.write(0x200 + 4*i, i)
+                futures.append(wb.read_async(0x200 + 4*i))
+        # Connection closed by the server (before the socket timeout), queued transactions dropped.
+        for future in futures:
+            with self.assertRaises(ConnectionError):
+                future.result()
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertEqual((self.comm.reads, self.comm.writes), (1, 0))
+        with self.assertRaises(ConnectionError):
+            wb.read(0x200)
+        wb.close()
+        # Other clients still served.
+        wb = RemoteClient(port=self.port, csr_data_width=32)
+        wb.open()
+        wb.write(0x200, 0x5678)
+        self.assertEqual(wb.read(0x200), 0x5678)
+        wb.close()
+        self.assertEqual(self.server.stats.depth, 0)
+
+    def test_mem(self):
+        wb = RemoteClient(port=self.port, csr_data_width=32, max_outstanding=4)
+        wb.open()
+        data = bytes(random.Random(0).randrange(256) for i in range(64*1024 + 6))
+        steps = []
+        wb.write_mem(0x10000, data, progress=lambda done, total: steps.append((done, total)))
+        self.assertEqual(steps[-1], (len(data), len(data)))
+        self.assertEqual(wb.read(0x10000), int.from_bytes(data[:4], "little"))
+        self.assertEqual(wb.read_mem(0x10000, len(data)), data)
+        buffer = bytearray(100)
+        wb.read_mem(0x10000 + 4, 100, buffer=buffer)
+        self.assertEqual(buffer, data[4:104])
+
+        # Partial last word.
+        wb.write_mem(0x10000, b"\xaa\xbb")
+        self.assertEqual(wb.read_mem(0x10000, 4), b"\xaa\xbb" + data[2:4])
+        wb.close()
+
+if __name__ == "__main__":
+    unittest.main()
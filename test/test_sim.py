@@ -0,0 +1,297 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import unittest
+import random
+import tempfile
+import os
+
+from migen import *
+from migen.fhdl.tools import list_targets
+from migen.sim import run_simulation as migen_run_simulation
+
+from litex.gen.sim import *
+from litex.gen.sim.core import Simulator
+from litex.gen.sim.lxw import LXWWriter, LXWReader, lxw2vcd
+
+
+def parse_vcd(filename):
+    # Return the values of each signal, by name: [(time, value), ...].
+    names  = {}
+    values = {}
+    t = 0
+    with open(filename) as f:
+        for line in f:
+            if line.startswith("$var"):
+                _, _, _, code, name, _ = line.split()
+                names[code] = name
+            elif line.startswith("#"):
+                t = int(line[1:])
+            elif line.startswith("b"):
+                value, code = line[1:].split()
+                values.setdefault(names[code], []).append((t, int(value, 2)))
+            elif line[0] in "01":
+                values.setdefault(names[line[1:].strip()], []).append((t, int(line[0])))
+    return values
+
+
+class SimDUT(Module):
+    def __init__(self):
+        self.a = a = Signal(8)
+        self.b = b = Signal((8, True))
+        self.c = c = Signal(4)
+
+        # Combinatorial logic.
+        self.sum    = Signal(10)
+        self.diff   = Signal((10, True))
+        self.cmp    = Signal(6)
+        self.mux    = Signal(8)
+        self.cat    = Signal(16)
+        self.rep    = Signal(12)
+        self.inv    = Signal(8)
+        self.neg    = Signal((9, True))
+        self.array  = Signal(8)
+        self.split0 = Signal(3)
+        self.split1 = Signal(5)
+        self.comb += [
+            self.sum.eq(a + b + c),
+            self.diff.eq(b - a),
+            self.cmp.eq(Cat(a < b, a <= c, a == c, a != b, b > c, b >= a)),
+            self.mux.eq(Mux(c[0], a, b)),
+            self.cat.eq(Cat(c, a[2:6], b[4:])),
+            self.rep.eq(Replicate(c[1:4], 4)),
+            self.inv.eq(~a),
+            self.neg.eq(-b),
+            self.array.eq(Array([a, b, c, a ^ c])[c[:2]]),
+            Cat(self.split0, self.split1).eq(a),
+        ]
+
+        # Synchronous logic.
+        self.acc     = Signal(16)
+        self.shift   = Signal(8)
+        self.sliced  = Signal(8)
+        self.state   = Signal(4)
+        self.decoded = Signal(8)
+        self.regs    = Array(Signal(8) for i in range(4))
+        self.sync += [
+            self.acc.eq(self.acc + (a << 2) - (b >> 1)),
+            self.shift.eq(Cat(c[0], self.shift[:-1])),
+            self.sliced[2:6].eq(c),
+            self.regs[c[:2]].eq(a),
+            If(a[0],
+                self.state.eq(self.state + 1)
+            ).Elif(b < 0,
+                self.state.eq(0)
+            )
+        ]
+        self.sync += Case(self.state, dict(
+            [(i, self.decoded.eq(1 << (i % 8))) for i in range(12)] +
+            [("default", self.decoded.eq(0xff))]
+        ))
+        self.small = Signal(2)
+        self.sync += Case(c, {0: self.small.eq(1), 1: self.small.eq(2), "default": self.small.eq(3)})
+
+        # Memory.
+        self.mem_dat_r = Signal(8)
+        mem  = Memory(8, 16, init=[i*3 for i in range(16)])
+        port = mem.get_port(write_capable=True)
+        self.specials += mem, port
+        self.comb += [
+            port.adr.eq(c),
+            port.dat_w.eq(a),
+            port.we.eq(b[0]),
+            self.mem_dat_r.eq(port.dat_r),
+        ]
+
+
+class HierarchyLeaf(Module):
+    def __init__(self):
+        self.leaf = Signal(8, name="leaf")
+        self.sync += self.leaf.eq(self.leaf + 1)
+
+
+class HierarchyNode(Module):
+    def __init__(self):
+        self.node = Signal(8, name="node")
+        self.submodules.leaf = HierarchyLeaf()
+        self.comb += self.node.eq(self.leaf.leaf + 1)
+
+
+class HierarchyTop(Module):
+    def __init__(self):
+        self.top = Signal(8, name="top")
+        self.submodules.node = HierarchyNode()
+        self.comb += self.top.eq(self.node.node + 1)
+
+
+class TestSim(unittest.TestCase):
+    def run_trace(self, run_simulation=run_simulation, **kwargs):
+        prng = random.Random(42)
+        dut  = SimDUT()
+        outputs = [dut.sum, dut.diff, dut.cmp, dut.mux, dut.cat, dut.rep, dut.inv, dut.neg,
+            dut.array, dut.split0, dut.split1, dut.acc, dut.shift, dut.sliced, dut.state,
+            dut.decoded, dut.small, dut.mem_dat_r, *dut.regs]
+        trace = []
+        def generator():
+            for i in range(256):
+                yield dut.a.eq(prng.randrange(2**8))
+                yield dut.b.eq(prng.randrange(-2**7, 2**7))
+                yield dut.c.eq(prng.randrange(2**4))
+                yield
+                trace.append((yield outputs))
+        run_simulation(dut, generator(), **kwargs)
+        return trace
+
+    def test_interpreted(self):
+        # Migen's simulator (interpreted, full comb re-evaluation) is the reference.
+        self.assertEqual(self.run_trace(migen_run_simulation), self.run_trace())
+
+    def test_compiled(self):
+        self.assertEqual(self.run_trace(), self.run_trace(compiled=True))
+
+    def test_compact(self):
+        reference = self.run_trace()
+        self.assertEqual(reference, self.run_trace(compact=True))
+        self.assertEqual(reference, self.run_trace(compact=True, compiled=True))
+
+    def test_comb_propagation(self):
+        class DUT(Module):
+            def __init__(self):
+                self.i = Signal(8)
+                self.x = x = [Signal(8, name="x{}".format(n)) for n in range(8)]
+                # Declared in reverse order of dependencies.
+                for n in reversed(range(1, 8)):
+                    self.comb += x[n].eq(x[n - 1] + 1)
+                self.comb += x[0].eq(self.i)
+
+        def generator(dut):
+            for i in range(16):
+                yield dut.i.eq(i)
+                # Driven by comb logic: overridden on the next propagation.
+                yield dut.x[3].eq(0)
+                yield
+                self.assertEqual((yield dut.x[3]), i + 3)
+                self.assertEqual((yield dut.x[7]), i + 7)
+
+        for compiled, compact in [(False, False), (True, False), (False, True), (True, True)]:
+            dut = DUT()
+            with Simulator(dut, generator(dut), compiled=compiled, compact=compact) as sim:
+                # One group per target, in topological order.
+                self.assertEqual(len(sim.comb_graph.statements), 8)
+                for n, statements in enumerate(sim.comb_graph.statements):
+                    self.assertEqual(list(list_targets(statements)), [dut.x[n]])
+                sim.run()
+
+    def test_vcd(self):
+        class DUT(Module):
+            def __init__(self):
+                self.counter = Signal(8, name="counter")
+                self.sync += self.counter.eq(self.counter + 1)
+
+        def generator(dut, extra):
+            for i in range(16):
+                yield extra.eq(i)
+                yield
+
+        with tempfile.TemporaryDirectory() as d:
+            # All signals, including the ones only used by generators.
+            dut   = DUT()
+            extra = Signal(8, name="extra")
+            run_simulation(dut, generator(dut, extra), vcd_name=os.path.join(d, "all.vcd"))
+            values = parse_vcd(os.path.join(d, "all.vcd"))
+            self.assertEqual([v for t, v in values["extra"]], list(range(16)))
+            self.assertEqual([v for t, v in values["counter"][:4]], [0, 1, 2, 3])
+
+            # Allow-list.
+            dut   = DUT()
+            extra = Signal(8, name="extra")
+            run_simulation(dut, generator(dut, extra), vcd_name=os.path.join(d, "filtered.vcd"),
+                vcd_signals=["count*"])
+            values = parse_vcd(os.path.join(d, "filtered.vcd"))
+            self.assertEqual(list(values.keys()), ["counter"])
+
+    def test_vcd_depth(self):
+        def generator():
+            for i in range(4):
+                yield
+
+        def build(n):
+            # The depth does not depend on the stack of the caller creating the design.
+            return HierarchyTop() if n == 0 else build(n - 1)
+
+        with tempfile.TemporaryDirectory() as d:
+            for depth, expected in [(0, {"top"}), (1, {"top", "node"}), (2, {"top", "node", "leaf"})]:
+                for n in [0, 4]:
+                    filename = os.path.join(d, "depth.vcd")
+                    run_simulation(build(n), generator(), vcd_name=filename, vcd_depth=depth)
+                    names = set(parse_vcd(filename).keys()) - {"sys_clk", "sys_rst"}
+                    self.assertEqual(names, expected)
+
+    def test_lxw(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.run_trace(vcd_name=os.path.join(d, "trace.vcd"))
+            self.run_trace(vcd_name=os.path.join(d, "trace.lxw"))
+            lxw2vcd(os.path.join(d, "trace.lxw"), os.path.join(d, "converted.vcd"))
+            self.assertEqual(
+                parse_vcd(os.path.join(d, "trace.vcd")),
+                parse_vcd(os.path.join(d, "converted.vcd")))
+
+            # Small chunks, seek.
+            dut    = SimDUT()
+            values = []
+            def generator():
+                for i in range(64):
+                    yield dut.c.eq(i)
+                    yield
+                    values.append((yield dut.c))
+            with Simulator(dut, generator()) as sim:
+                sim.vcd = LXWWriter(os.path.join(d, "chunked.lxw"), chunk_size=64)
+                sim.vcd.init([dut.c])
+                sim.run()
+            with LXWReader(os.path.join(d, "chunked.lxw")) as reader:
+                self.assertGreater(len(reader.chunks), 4)
+                self.assertEqual(reader.signals[0]["width"], 4)
+                for i in range(64):
+                    self.assertEqual(reader.values_at(10*(i + 1))[0], values[i])
+
+    def test_fork(self):
+        class DUT(Module):
+            def __init__(self):
+                self.inc   = Signal(8)
+                self.count = Signal(16)
+                self.sync += self.count.eq(self.count + self.inc)
+
+        def reset(dut):
+            yield dut.inc.eq(1)
+            for i in range(8):
+                yield
+
+        def job(dut, inc):
+            def generator():
+                yield dut.inc.eq(inc)
+                for i in range(16):
+                    yield
+                return (yield dut.count)
+            return generator
+
+        # Reference: reset and job simulated from scratch (forked jobs start on the clock cycle
+        # following the end of the simulation).
+        references = []
+        for inc in range(4):
+            dut = DUT()
+            def generator():
+                yield from reset(dut)
+                yield
+                references.append((yield from job(dut, inc)()))
+            run_simulation(dut, generator())
+
+        for compiled, compact in [(False, False), (True, True)]:
+            dut = DUT()
+            with Simulator(dut, reset(dut), compiled=compiled, compact=compact) as sim:
+                sim.run()
+                for processes in [1, 2]:
+                    results = sim.fork([job(dut, inc) for inc in range(4)], processes=processes)
+                    self.assertEqual(results, [[r] for r in references])
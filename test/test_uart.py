@@ -0,0 +1,129 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import unittest
+import random
+
+from migen import *
+
+from litex.soc.interconnect import wishbone
+from litex.soc.cores.uart import *
+
+# Helpers ------------------------------------------------------------------------------------------
+
+class Stream2WishboneDUT(Module):
+    def __init__(self, clk_freq=1e6, **kwargs):
+        self.submodules.bridge = Stream2Wishbone(clk_freq=clk_freq, **kwargs)
+        self.submodules.sram   = wishbone.SRAM(4096, bus=self.bridge.wishbone)
+
+
+def command(cmd, length, address, datas=[], length_width=8):
+    r = [cmd] + list(length.to_bytes(length_width//8, "big")) + list(address.to_bytes(4, "big"))
+    for data in datas:
+        r += list(data.to_bytes(4, "big"))
+    return r
+
+# TestStream2Wishbone ------------------------------------------------------------------------------
+
+class TestStream2Wishbone(unittest.TestCase):
+    def bridge_test(self, n, length_width=8, sink_rand=0, source_rand=0, **kwargs):
+        # Write n words, read them back, return the cycles of the read bursts (from the command to
+        # the last byte).
+        prng    = random.Random(42)
+        datas   = [prng.randrange(2**32) for i in range(n)]
+        burst   = 2**length_width - 1
+        results = []
+        cycles  = [0]
+        stream  = []
+        for i in range(0, n, burst):
+            stream += command(CMD_WRITE_BURST_INCR, min(burst, n - i), 0x10 + i, datas[i:i + burst],
+                length_width)
+        reads = []
+        for i in range(0, n, burst):
+            reads.append(command(CMD_READ_BURST_INCR, min(burst, n - i), 0x10 + i,
+                length_width=length_width))
+        dut = Stream2WishboneDUT(length_width=length_width, **kwargs)
+
+        def sender(sink):
+            for byte in stream:
+                while prng.randrange(100) < sink_rand:
+                    yield
+                yield sink.valid.eq(1)
+                yield sink.data.eq(byte)
+                yield
+                while not (yield sink.ready):
+                    yield
+                yield sink.valid.eq(0)
+            # Commands of the reads sent after the end of the previous read (as the host does).
+            for read in reads:
+                expected = len(results) + 4*min(burst, n - len(results)//4)
+                for byte in read:
+                    yield sink.valid.eq(1)
+                    yield sink.data.eq(byte)
+                    yield
+                    while not (yield sink.ready):
+                        yield
+                yield sink.valid.eq(0)
+                while len(results) < expected:
+                    yield
+                    cycles[0] += 1
+
+        def receiver(source):
+            while len(results) < 4*n:
+                yield source.ready.eq(prng.randrange(100) >= source_rand)
+                yield
+                if (yield source.valid) and (yield source.ready):
+                    results.append((yield source.data))
+
+        run_simulation(dut, [sender(dut.bridge.sink), receiver(dut.bridge.source)])
+        self.assertEqual(results, [b for data in datas for b in data.to_bytes(4, "big")])
+        return cycles[0]
+
+    def test_bridge(self):
+        self.bridge_test(64)
+
+    def test_bridge_random(self):
+        self.bridge_test(64, sink_rand=50, source_rand=50, fifo_depth=2)
+
+    def test_bridge_length_width(self):
+        # Bursts of more than 255 words.
+        self.bridge_test(300, length_width=16)
+        # Length bytes counted past the data bytes.
+        self.bridge_test(16, length_width=40)
+        self.bridge_test(16, length_width=64)
+
+    def test_bridge_read_throughput(self):
+        # A byte per cycle on the source: reads prefetched while the words are sent.
+        cycles = self.bridge_test(128)
+        self.assertLessEqual(cycles, 4*128 + 8)
+
+    def test_bridge_timeout(self):
+        dut = Stream2WishboneDUT(clk_freq=1e4)
+
+        def generator(sink, source):
+            # Incomplete command, aborted.
+            for byte in command(CMD_WRITE_BURST_INCR, 1, 0)[:4]:
+                yield sink.valid.eq(1)
+                yield sink.data.eq(byte)
+                yield
+            yield sink.valid.eq(0)
+            for i in range(int(100e-3*1e4) + 16):
+                yield
+            # Read.
+            yield source.ready.eq(1)
+            for byte in command(CMD_READ_BURST_INCR, 1, 0):
+                yield sink.valid.eq(1)
+                yield sink.data.eq(byte)
+                yield
+            yield sink.valid.eq(0)
+            n = 0
+            while n < 4:
+                if (yield source.valid):
+                    n += 1
+                yield
+            self.assertEqual((yield source.valid), 0)
+
+        run_simulation(dut, generator(dut.bridge.sink, dut.bridge.source))
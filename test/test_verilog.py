@@ -0,0 +1,172 @@
+#
+# This file is part of LiteX.
+#
+# Copyright (c) 2026 Enjoy-Digital <www.enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import unittest
+import tempfile
+import os
+from unittest import mock
+
+from migen import *
+from migen.fhdl import tracer
+
+from litex.gen.fhdl import verilog
+from litex.gen.fhdl.hierarchy import VerilogModule, separate_submodules
+
+
+class VerilogDUT(Module):
+    def __init__(self, width=8):
+        self.i = Signal(width, name="i")
+        self.o = Signal(width, name="o")
+        self.count = count = Signal(width, name="count")
+        self.sync += count.eq(count + self.i)
+        self.comb += self.o.eq(count ^ self.i)
+        mem  = Memory(width, 4, init=[1, 2, 3, 4], name="mem")
+        port = mem.get_port()
+        self.specials += mem, port
+        self.comb += port.adr.eq(self.i)
+
+
+class HierarchyLeaf(Module):
+    def __init__(self, i):
+        self.o = Signal(8, name="o")
+        self.sync += self.o.eq(self.o + i)
+
+
+class HierarchyChild(Module):
+    def __init__(self, i):
+        self.o = Signal(8, name="o")
+        self.submodules.leaf = VerilogModule("leaf")(HierarchyLeaf(i))
+        mem  = Memory(8, 4, init=[1, 2, 3, 4], name="mem")
+        port = mem.get_port()
+        self.specials += mem, port
+        self.comb += port.adr.eq(i)
+        self.comb += self.o.eq(port.dat_r ^ self.leaf.o)
+
+
+class HierarchyDUT(Module):
+    def __init__(self):
+        self.i = Signal(8, name="i")
+        self.o = Signal(8, name="o")
+        self.submodules.child = HierarchyChild(self.i)
+        mem  = Memory(8, 4, init=[5, 6, 7, 8], name="mem")
+        port = mem.get_port()
+        self.specials += mem, port
+        self.comb += port.adr.eq(self.i)
+        self.sync += self.o.eq(self.child.o + port.dat_r)
+
+
+def new_dut(**kwargs):
+    # Instance numbers of the backtraces are part of the names: start from a fresh tracer, as a new
+    # build process would.
+    tracer.name_to_idx.clear()
+    tracer.classname_to_objs.clear()
+    return VerilogDUT(**kwargs)
+
+
+class TestVerilog(unittest.TestCase):
+    def convert(self, dut, cache_dir):
+        ios = {dut.i, dut.o}
+        return verilog.convert(dut, ios, cache_dir=cache_dir), ios
+
+    def test_cache(self):
+        def content(source):
+            # Skip the banner (generation date).
+            return source[source.index("module"):]
+
+        with tempfile.TemporaryDirectory() as d:
+            reference, _ = self.convert(new_dut(), None)
+
+            # Miss: converted and stored.
+            # (Same variable names: the names of the signals follow the backtraces.)
+            dut = new_dut()
+            r, ios = self.convert(dut, d)
+            first = dut
+            self.assertEqual(content(r.main_source), content(reference.main_source))
+            self.assertEqual(len([e for e in os.listdir(d) if e.endswith(".pickle")]), 1)
+
+            # Hit: same source, names and data files for the signals of a new instance.
+            dut = new_dut()
+            cached, ios = self.convert(dut, d)
+            self.assertEqual(cached.main_source, r.main_source)
+            self.assertEqual(cached.data_files, r.data_files)
+            for name in ["i", "o", "count"]:
+                self.assertEqual(cached.ns.get_name(getattr(dut, name)), name)
+                self.assertEqual(cached.ns.get_name(getattr(dut, name)),
+                    r.ns.get_name(getattr(first, name)))
+            self.assertEqual(dut.o.direction, "output")
+            self.assertEqual(len(os.listdir(d)), 1)
+
+            # Changed design: miss.
+            changed, _ = self.convert(new_dut(width=9), d)
+            self.assertNotEqual(content(changed.main_source), content(r.main_source))
+            self.assertEqual(len(os.listdir(d)), 2)
+
+            # Unchanged outputs are not rewritten (data files are written in the current directory).
+            cwd = os.getcwd()
+            os.chdir(d)
+            try:
+                cached.write("top.v")
+                os.utime("top.v", ns=(0, 0))
+                cached.write("top.v")
+                self.assertEqual(os.stat("top.v").st_mtime_ns, 0)
+            finally:
+                os.chdir(cwd)
+
+    def test_cache_banner(self):
+        def banner(revision):
+            def generated_banner(line_comment="//"):
+                r  = line_comment + "-"*80 + "\n"
+                r += line_comment + " Auto-generated by Migen & LiteX ({})\n".format(revision)
+                r += line_comment + "-"*80 + "\n"
+                return r
+            return generated_banner
+
+        with tempfile.TemporaryDirectory() as d:
+            for revision in ["first", "second"]:
+                with mock.patch.object(verilog, "generated_banner", banner(revision)), \
+                     mock.patch("litex.gen.fhdl.cache.generated_banner", banner(revision)):
+                    if revision == "second":
+                        # Hit: not lowered/printed again.
+                        with mock.patch.object(verilog, "lower_complex_slices", side_effect=AssertionError):
+                            r, _ = self.convert(new_dut(), d)
+                    else:
+                        r, _ = self.convert(new_dut(), d)
+                # Banner of the hit regenerated, not the stored one.
+                self.assertEqual(r.main_source.split("\n")[1],
+                    "// Auto-generated by Migen & LiteX ({})".format(revision))
+                self.assertEqual(r.main_source.count("Auto-generated"), 1)
+            self.assertEqual(len(os.listdir(d)), 1)
+
+    def test_hierarchy(self):
+        dut = HierarchyDUT()
+        separate_submodules(dut, ["child"])
+        r = verilog.convert(dut, {dut.i, dut.o})
+        self.assertEqual(set(r.data_files.keys()),
+            {"mem.init", "mem_1.init", "top_child.v", "top_child_leaf.v"})
+
+        # Instances, connected to the names of the signals in the parent.
+        child_o = r.ns.get_name(dut.child.o)
+        self.assertNotEqual(child_o, "o")
+        self.assertIn("top_child child(\n\t.i(i),\n\t.o({}),\n\t.sys_clk(sys_clk),\n"
+            "\t.sys_rst(sys_rst)\n);".format(child_o), r.main_source)
+        child = r.data_files["top_child.v"]
+        self.assertIn("module top_child(\n\tinput wire [7:0] i,\n\toutput wire [7:0] o,", child)
+        self.assertIn("top_child_leaf leaf(", child)
+        self.assertIn("module top_child_leaf(", r.data_files["top_child_leaf.v"])
+
+        # Data files of the modules renamed when they clash with the ones of the parent.
+        self.assertIn("$readmemh(\"mem.init\", mem);", r.main_source)
+        self.assertIn("$readmemh(\"mem_1.init\", mem);", child)
+        self.assertEqual(r.data_files["mem_1.init"], "1\n2\n3\n4\n")
+
+        # Signals driven on both sides of a module boundary.
+        class DUT(Module):
+            def __init__(self):
+                self.o = Signal(name="o")
+                self.submodules.leaf = VerilogModule()(HierarchyLeaf(self.o))
+                self.sync += self.leaf.o.eq(0)
+        with self.assertRaises(ValueError):
+            verilog.convert(DUT())
@@ -5,6 +5,7 @@
 # SPDX-License-Identifier: BSD-2-Clause
 
 import unittest
+import random
 
 from migen import *
 
@@ -56,3 +57,273 @@ class TestWishbone(unittest.TestCase):
 
         dut = DUT()
         run_simulation(dut, generator(dut))
+
+# Bursts -------------------------------------------------------------------------------------------
+
+def burst_access(bus, adr, datas=None, length=None, burst=True, results=None):
+    # Incrementing burst of writes (datas) or reads (length) from adr. Appends the read datas and
+    # the number of cycles of the access to results.
+    n = length if datas is None else len(datas)
+    yield bus.cyc.eq(1)
+    yield bus.stb.eq(1)
+    yield bus.we.eq(datas is not None)
+    yield bus.sel.eq(2**len(bus.sel) - 1)
+    yield bus.bte.eq(wishbone.BTE_BURST_LINEAR)
+    reads  = []
+    cycles = 0
+    i      = 0
+    while i < n:
+        yield bus.adr.eq(adr + i)
+        if datas is not None:
+            yield bus.dat_w.eq(datas[i])
+        if burst:
+            yield bus.cti.eq(wishbone.CTI_BURST_END if i == (n - 1) else
+                wishbone.CTI_BURST_INCREMENTING)
+        yield
+        cycles += 1
+        if (yield bus.ack):
+            reads.append((yield bus.dat_r))
+            i += 1
+            if not burst:
+                # Classic accesses: cyc/stb deasserted between the accesses.
+                yield bus.cyc.eq(0)
+                yield bus.stb.eq(0)
+                yield
+                cycles += 1
+                yield bus.cyc.eq(1)
+                yield bus.stb.eq(1)
+    yield bus.cyc.eq(0)
+    yield bus.stb.eq(0)
+    yield bus.cti.eq(wishbone.CTI_BURST_NONE)
+    yield
+    if results is not None:
+        results.append((reads, cycles))
+
+
+class TestWishboneBurst(unittest.TestCase):
+    def check(self, dut, master, n, adr=0, data_width=32, min_throughput=None,
+        min_write_throughput=None):
+        # Write n words with a burst, read them back with a burst (and with classic accesses),
+        # return the read throughput (words per cycle).
+        prng    = random.Random(42)
+        datas   = [prng.randrange(2**data_width) for i in range(n)]
+        results = []
+        def generator():
+            yield from burst_access(master, adr, datas=datas, results=results)
+            yield from burst_access(master, adr, length=n, results=results)
+            yield from burst_access(master, adr, length=n, burst=False, results=results)
+        run_simulation(dut, generator())
+        (_, write_cycles), (reads, read_cycles), (classic_reads, classic_cycles) = results
+        self.assertEqual(reads, datas)
+        self.assertEqual(classic_reads, datas)
+        throughput = n/read_cycles
+        if min_throughput is not None:
+            self.assertGreaterEqual(throughput, min_throughput)
+            if min_write_throughput is None:
+                min_write_throughput = min_throughput
+            self.assertGreaterEqual(n/write_cycles, min_write_throughput)
+        self.assertGreater(throughput, n/classic_cycles)
+        return throughput
+
+    def test_sram(self):
+        class DUT(Module):
+            def __init__(self):
+                self.submodules.sram = wishbone.SRAM(1024, burst=True)
+        dut = DUT()
+        self.check(dut, dut.sram.bus, 64, min_throughput=0.9)
+
+    def test_interconnect(self):
+        # Two masters, burst over two slaves.
+        class DUT(Module):
+            def __init__(self):
+                self.masters = [wishbone.Interface() for i in range(2)]
+                self.srams   = [wishbone.SRAM(1024, burst=True) for i in range(2)]
+                self.submodules += self.srams
+                self.submodules.interconnect = wishbone.InterconnectShared(self.masters, [
+                    (lambda a: a[8] == 0, self.srams[0].bus),
+                    (lambda a: a[8] == 1, self.srams[1].bus)])
+        dut = DUT()
+        self.check(dut, dut.masters[1], 64, adr=0xe0, min_throughput=0.9)
+
+        # Concurrent bursts of the masters.
+        dut     = DUT()
+        datas   = [[i*256 + j for j in range(32)] for i in range(2)]
+        results = [[], []]
+        def generator(n, master):
+            yield from burst_access(master, 0x80*n, datas=datas[n])
+            for i in range(16):
+                yield
+            yield from burst_access(master, 0x80*(1 - n), length=32, results=results[n])
+        run_simulation(dut, [generator(0, dut.masters[0]), generator(1, dut.masters[1])])
+        self.assertEqual(results[0][0][0], datas[1])
+        self.assertEqual(results[1][0][0], datas[0])
+
+    def test_downconverter(self):
+        class DUT(Module):
+            def __init__(self):
+                self.master = wishbone.Interface(data_width=64)
+                self.submodules.sram = wishbone.SRAM(1024, burst=True)
+                self.submodules.converter = wishbone.Converter(self.master, self.sram.bus)
+        dut = DUT()
+        # 2 slave accesses per access.
+        self.check(dut, dut.master, 32, data_width=64, min_throughput=0.45)
+
+        # Classic accesses of the master are classic on the slave, bursts are bursts.
+        dut  = DUT()
+        ctis = [[], []]
+        def generator(master):
+            yield from burst_access(master, 0, length=4, burst=False)
+            yield from burst_access(master, 0, datas=list(range(4)))
+            yield from burst_access(master, 0, length=4)
+        @passive
+        def monitor(bus):
+            while True:
+                if (yield bus.cyc) and (yield bus.stb) and (yield bus.ack):
+                    ctis[(yield dut.master.cti) != wishbone.CTI_BURST_NONE].append((yield bus.cti))
+                yield
+        run_simulation(dut, [generator(dut.master), monitor(dut.sram.bus)])
+        self.assertEqual(ctis[0], [wishbone.CTI_BURST_NONE]*8)
+        self.assertEqual(ctis[1], 2*([wishbone.CTI_BURST_INCREMENTING]*7 + [wishbone.CTI_BURST_END]))
+
+    def test_upconverter(self):
+        class DUT(Module):
+            def __init__(self):
+                self.master = wishbone.Interface(data_width=32)
+                self.submodules.sram = wishbone.SRAM(1024, bus=wishbone.Interface(64), burst=True)
+                self.submodules.converter = wishbone.Converter(self.master, self.sram.bus)
+        dut = DUT()
+        self.check(dut, dut.master, 64, adr=1, min_throughput=0.9)
+
+    def test_cache(self):
+        class DUT(Module):
+            def __init__(self):
+                self.master = wishbone.Interface(data_width=32)
+                self.submodules.sram  = wishbone.SRAM(4096, bus=wishbone.Interface(128), burst=True)
+                self.submodules.cache = wishbone.Cache(64, self.master, self.sram.bus)
+        dut = DUT()
+        # Bursts of 64 words in a 64 words cache: reads hit (write hits are single accesses).
+        self.check(dut, dut.master, 64, min_throughput=0.9, min_write_throughput=0.45)
+
+        # Evictions/refills.
+        dut     = DUT()
+        prng    = random.Random(42)
+        datas   = [prng.randrange(2**32) for i in range(256)]
+        results = []
+        def generator(master):
+            yield from burst_access(master, 0, datas=datas, results=results)
+            yield from burst_access(master, 0, length=256, results=results)
+        run_simulation(dut, generator(dut.master))
+        self.assertEqual(results[1][0], datas)
+
+# Crossbar -----------------------------------------------------------------------------------------
+
+class CrossbarDUT(Module):
+    def __init__(self, **kwargs):
+        self.masters = [wishbone.Interface() for i in range(3)]
+        self.srams   = [wishbone.SRAM(1024) for i in range(2)]
+        self.submodules += self.srams
+        self.submodules.crossbar = wishbone.Crossbar(self.masters, [
+            (lambda a: a[8] == 0, self.srams[0].bus),
+            (lambda a: a[8] == 1, self.srams[1].bus)], **kwargs)
+
+
+class SlowSlaveCrossbarDUT(Module):
+    def __init__(self, **kwargs):
+        self.masters = [wishbone.Interface() for i in range(2)]
+        self.slave   = wishbone.Interface()
+        self.submodules.crossbar = wishbone.Crossbar(self.masters, [
+            (lambda a: a[8] == 0, self.slave)], **kwargs)
+
+    @passive
+    def slave_generator(self, delays):
+        # Acks each access (dat_r: its address) after its delay, unless aborted (cyc deasserted).
+        bus    = self.slave
+        delays = iter(delays)
+        while True:
+            yield bus.ack.eq(0)
+            yield
+            if not ((yield bus.cyc) and (yield bus.stb)):
+                continue
+            adr = (yield bus.adr)
+            for i in range(next(delays, 1)):
+                yield
+                if not (yield bus.cyc):
+                    break
+            else:
+                yield bus.dat_r.eq(adr)
+                yield bus.ack.eq(1)
+                yield
+
+
+class TestWishboneCrossbar(unittest.TestCase):
+    def access_cycles(self, dut):
+        # Cycles of a single read access.
+        cycles = []
+        def generator(master):
+            yield master.adr.eq(0x100)
+            yield master.we.eq(0)
+            yield master.cyc.eq(1)
+            yield master.stb.eq(1)
+            yield
+            n = 1
+            while not (yield master.ack):
+                yield
+                n += 1
+            cycles.append(n)
+            yield master.cyc.eq(0)
+            yield master.stb.eq(0)
+            yield
+        run_simulation(dut, generator(dut.masters[0]))
+        return cycles[0]
+
+    def concurrent_accesses(self, dut):
+        # Concurrent accesses of the masters, to both slaves.
+        prng    = random.Random(42)
+        datas   = [[prng.randrange(2**32) for j in range(16)] for i in range(3)]
+        results = [[], [], []]
+        def generator(n, master):
+            adrs = [(j%2)*0x100 + n*0x10 + j for j in range(16)]
+            for adr, data in zip(adrs, datas[n]):
+                yield from master.write(adr, data)
+            for adr in adrs:
+                results[n].append((yield from master.read(adr)))
+        run_simulation(dut, [generator(n, dut.masters[n]) for n in range(3)])
+        self.assertEqual(results, datas)
+
+    def test_crossbar(self):
+        reference = self.access_cycles(CrossbarDUT())
+        for request_stages in range(3):
+            for response_stages in range(3):
+                kwargs = dict(register=True,
+                    request_stages  = request_stages,
+                    response_stages = response_stages)
+                dut = CrossbarDUT(**kwargs)
+                self.assertEqual(dut.crossbar.latency, request_stages + response_stages)
+                self.assertIn("Added latency  : {} cycle(s)".format(dut.crossbar.latency),
+                    dut.crossbar.get_report())
+                self.assertEqual(self.access_cycles(CrossbarDUT(**kwargs)),
+                    reference + dut.crossbar.latency)
+
+                self.concurrent_accesses(dut)
+
+    def timeout_accesses(self, dut):
+        # Access of a master timed out on the slave (acked late), then accesses of the masters.
+        results = []
+        def generator():
+            yield from dut.masters[0].read(0x10)
+            results.append((yield from dut.masters[1].read(0x20)))
+            results.append((yield from dut.masters[0].read(0x30)))
+        run_simulation(dut, [generator(), dut.slave_generator([40])])
+        self.assertEqual(results, [0x20, 0x30])
+
+    def test_crossbar_timeout(self):
+        for request_stages in range(3):
+            for response_stages in range(3):
+                dut = SlowSlaveCrossbarDUT(timeout_cycles=16,
+                    request_stages  = request_stages,
+                    response_stages = response_stages)
+                self.timeout_accesses(dut)
+
+    def test_crossbar_stages(self):
+        with self.assertRaises(ValueError):
+            CrossbarDUT(request_stages=3)